@@ -0,0 +1,218 @@
+"""Baked asset pack: every image and sound effect, pre-scaled, in raw form.
+
+    python assetpack.py            bake images/ and sound/ into assets.pack
+
+The game asks for assets by key through image() and sound(), each with a
+function that builds the asset from the loose files. With a pack, the
+surface is made straight from the memory-mapped pixels (no PNG or MP3
+decoding, no rescaling, one open file); without one, or for keys the pack
+does not have, the build function runs as before. Baking runs all asset
+loaders once with recording on, so the pack holds exactly what they make.
+Each entry records the size and mtime of the file it was made from; an
+entry whose file has changed since is ignored (with a warning) and the
+asset is built from the loose file. Re-bake after changing anything in
+images/ or sound/.
+"""
+import mmap
+import os
+import struct
+import sys
+import time
+import weakref
+import pygame
+
+from settings import ASSET_PACK
+
+# File layout (little endian), version 2:
+#   HEADER   "BUNP", version, entry count
+#   MIXER    frequency, sample size, channels the sounds were baked for
+#   INDEX    per entry: u16 key length, utf-8 key, ENTRY
+#   DATA     raw blobs, each starting on a 16 byte boundary: images as
+#            BGRA rows (the usual display format), sounds as mixer samples
+MAGIC = b"BUNP"
+VERSION = 2
+HEADER = struct.Struct("<4sHI")
+MIXER = struct.Struct("<iii")
+ENTRY = struct.Struct("<BBHHQQqQ")  # kind, alpha, width, height, offset, length, source mtime_ns, source size
+KEY_LENGTH = struct.Struct("<H")
+KIND_IMAGE, KIND_SOUND = 0, 1
+ALIGN = 16
+
+_pack = {
+    "path": ASSET_PACK,  # None = always use the loose files
+    "opened": False,
+    "index": {},  # key -> ENTRY fields
+    "fresh": {},  # source file -> whether the pack is up to date with it
+    "mixer": None,
+    "view": None,
+    "recording": None,  # key -> Surface / Sound while baking
+    "loaded": weakref.WeakValueDictionary(),  # key -> live Surface / Sound (memory.py)
+}
+
+
+def use_pack(path):
+    """Switch to another pack file, or to loose files only with None."""
+    _pack.update(path=path, opened=False, index={}, fresh={}, mixer=None, view=None)
+
+
+def _open():
+    _pack["opened"] = True
+    path = _pack["path"]
+    if not path or not os.path.exists(path):
+        return
+    try:
+        with open(path, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count = HEADER.unpack_from(mm, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"not a version {VERSION} asset pack")
+        pos = HEADER.size
+        mixer = MIXER.unpack_from(mm, pos)
+        pos += MIXER.size
+        index = {}
+        for _ in range(count):
+            (n,) = KEY_LENGTH.unpack_from(mm, pos)
+            key = bytes(mm[pos + KEY_LENGTH.size:pos + KEY_LENGTH.size + n]).decode("utf-8")
+            pos += KEY_LENGTH.size + n
+            index[key] = ENTRY.unpack_from(mm, pos)
+            pos += ENTRY.size
+    except Exception as e:
+        print(f"[ASSETS] Ignoring pack {path}: {e}")
+        return
+    _pack.update(index=index, mixer=mixer, view=memoryview(mm))
+    print(f"[ASSETS] Using {path} ({len(index)} assets)")
+
+
+def source_file(key: str) -> str:
+    # Keys are "path" or "path@variant"
+    return key.split("@", 1)[0]
+
+
+def _source_stat(path: str) -> tuple:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return (0, 0)
+    return (st.st_mtime_ns, st.st_size)
+
+
+def _entry(key: str, kind: int):
+    if _pack["recording"] is not None:
+        return None  # baking: always build from the loose files
+    if not _pack["opened"]:
+        _open()
+    entry = _pack["index"].get(key)
+    if entry is None or entry[0] != kind:
+        return None
+    source = source_file(key)
+    fresh = _pack["fresh"].get(source)
+    if fresh is None:
+        stat = _source_stat(source)
+        # a missing file cannot be loaded either, so the baked copy stays
+        fresh = _pack["fresh"][source] = stat == (0, 0) or stat == tuple(entry[6:])
+        if not fresh:
+            print(f"[ASSETS] {source} changed since {_pack['path']} was baked; "
+                  f"loading it from disk (re-bake with python assetpack.py)")
+    return entry if fresh else None
+
+
+def image(key: str, build, alpha: bool = True) -> pygame.Surface:
+    """The image baked under `key`, else build() (which may raise)."""
+    entry = _entry(key, KIND_IMAGE)
+    if entry is not None:
+        _, _, w, h, offset, length, _, _ = entry
+        surf = pygame.image.frombuffer(_pack["view"][offset:offset + length], (w, h), "BGRA")
+        # convert() copies into display format, so nothing keeps the map alive
+        surf = surf.convert_alpha() if alpha else surf.convert()
+    else:
+        surf = build()
+        if _pack["recording"] is not None:
+            _pack["recording"][key] = (KIND_IMAGE, alpha, surf)
+    _pack["loaded"][key] = surf
+    return surf
+
+
+def sound(key: str, build) -> pygame.mixer.Sound:
+    """The sound baked under `key` if the mixer runs at the baked format, else build()."""
+    entry = _entry(key, KIND_SOUND)
+    if entry is not None and pygame.mixer.get_init() == _pack["mixer"]:
+        _, _, _, _, offset, length, _, _ = entry
+        snd = pygame.mixer.Sound(buffer=_pack["view"][offset:offset + length])
+    else:
+        snd = build()
+        if _pack["recording"] is not None:
+            _pack["recording"][key] = (KIND_SOUND, False, snd)
+    _pack["loaded"][key] = snd
+    return snd
+
+
+def get_loaded() -> dict:
+    """Every asset image() and sound() made that is still in use, by key."""
+    return dict(_pack["loaded"].items())
+
+
+def load_everything():
+    # Every asset loader the game has; baking records what they build.
+    import assets
+    import game
+    import main
+    import sfx
+    import world
+
+    assets.clear_asset_cache()
+    for theme in world.THEME_FOLDERS:
+        assets.get_theme(theme)
+    assets.get_collision_masks()
+    game.load_game_assets()
+    game.make_bunny(pygame.Rect(0, 0, 1, 1))
+    main.load_menu_assets()
+    sfx.SoundPool()
+
+
+def bake(path: str = ASSET_PACK) -> int:
+    """Write every asset the game loads into `path`; returns its size in bytes."""
+    _pack["recording"] = recorded = {}
+    try:
+        load_everything()
+    finally:
+        _pack["recording"] = None
+
+    blobs = []
+    for key, (kind, alpha, asset) in recorded.items():
+        if kind == KIND_IMAGE:
+            data = pygame.image.tobytes(asset, "BGRA")
+            w, h = asset.get_size()
+        else:
+            data = asset.get_raw()
+            w = h = 0
+        blobs.append((key.encode("utf-8"), kind, alpha, w, h, _source_stat(source_file(key)), data))
+
+    index_size = HEADER.size + MIXER.size + sum(KEY_LENGTH.size + len(k) + ENTRY.size for k, *_ in blobs)
+    offset = -index_size % ALIGN + index_size
+    index = [HEADER.pack(MAGIC, VERSION, len(blobs)), MIXER.pack(*(pygame.mixer.get_init() or (0, 0, 0)))]
+    for key, kind, alpha, w, h, stat, data in blobs:
+        index.append(KEY_LENGTH.pack(len(key)) + key + ENTRY.pack(kind, alpha, w, h, offset, len(data), *stat))
+        offset += len(data) + (-len(data) % ALIGN)
+
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(b"".join(index))
+        f.write(bytes(-f.tell() % ALIGN))
+        for *_, data in blobs:
+            f.write(data)
+            f.write(bytes(-len(data) % ALIGN))
+        size = f.tell()
+    os.replace(tmp, path)
+    use_pack(_pack["path"])  # reopen on next use
+    return size
+
+
+if __name__ == "__main__":
+    # The game modules import "assetpack", not this __main__ copy of it
+    import assetpack
+    from session import init_headless
+    init_headless()
+    t0 = time.perf_counter()
+    out = sys.argv[1] if len(sys.argv) > 1 else ASSET_PACK
+    size = assetpack.bake(out)
+    print(f"[ASSETS] Baked {out}: {size / 1e6:.1f} MB in {time.perf_counter() - t0:.1f}s")
@@ -0,0 +1,210 @@
+import os
+import pygame
+import assetpack
+from settings import (WIDTH, HEIGHT, PLAYER_WIDTH, PLAYER_HEIGHT, FOX_WIDTH, FOX_HEIGHT)
+
+# theme name -> (background, [PropAsset, ...]); filled on first use
+_themes = {}
+_fox_images = []
+_collision_masks = {}
+# (id(image), size) -> (image, resized copy), for the current render scale
+_scaled = {"scale": None, "images": {}}
+
+TRAP_RECT_SIZE = (40, 40)  # see the traps in generate_room
+
+
+def load_png(path: str, variant: str = "", scale=None) -> pygame.Surface:
+    """`path` after convert_alpha() and `scale(img)`, if given.
+
+    Comes from the asset pack when it was baked there (as "path@variant");
+    raises like pygame.image.load when it cannot be loaded.
+    """
+    def build():
+        img = pygame.image.load(path).convert_alpha()
+        return scale(img) if scale else img
+    return assetpack.image(f"{path}@{variant}" if variant else path, build)
+
+
+def safe_load_png(path: str):
+    try:
+        return load_png(path)
+    except:
+        return None
+
+
+def scale_to_max(img: pygame.Surface, max_w: int, max_h: int) -> pygame.Surface:
+    w, h = img.get_size()
+    if w == 0 or h == 0:
+        return img
+    scale = min(max_w / w, max_h / h)
+    new_size = (max(1, int(w * scale)), max(1, int(h * scale)))
+    return pygame.transform.smoothscale(img, new_size)
+
+
+def get_scaled(img: pygame.Surface, scale: float, size=None) -> pygame.Surface:
+    """`img` resized by `scale` (or to `size`), made once per image and size.
+
+    The cache only holds one render scale; a new scale starts it over.
+    """
+    if size is None:
+        if scale == 1:
+            return img
+        size = (max(1, round(img.get_width() * scale)), max(1, round(img.get_height() * scale)))
+    elif img.get_size() == size:
+        return img
+    if scale != _scaled["scale"]:
+        _scaled["scale"] = scale
+        _scaled["images"].clear()
+    key = (id(img), size)
+    hit = _scaled["images"].get(key)
+    if hit is None:
+        hit = _scaled["images"][key] = (img, pygame.transform.smoothscale(img, size))
+    return hit[1]
+
+
+class PropAsset:
+    """A tree/bush/rock image plus everything collision needs to know about it.
+
+    The bounding rect and footprints are measured once when the theme is
+    loaded; every obstacle placed with this prop shares this object.
+    """
+
+    def __init__(self, name: str, img: pygame.Surface, with_mask: bool = False):
+        self.name = name
+        self.img = img
+        self.width, self.height = img.get_size()
+        # Opaque part of the image ("tree" hitbox), relative to the top-left.
+        self.bbox = img.get_bounding_rect()
+        # Bottom-centred footprint used for other kinds of obstacles.
+        fw = int(self.width * 0.70)
+        fh = int(self.height * 0.45)
+        self.footprint = pygame.Rect(self.width // 2 - fw // 2, self.height - fh, fw, fh)
+        self.mask = pygame.mask.from_surface(img) if with_mask else None
+
+    def get_size(self):
+        return self.width, self.height
+
+    def get_coll_rect(self, x: int, y: int, kind: str = "tree") -> pygame.Rect:
+        local = self.bbox if kind == "tree" else self.footprint
+        return local.move(x, y)
+
+    def get_mask(self) -> pygame.mask.Mask:
+        if self.mask is None:
+            self.mask = pygame.mask.from_surface(self.img)
+        return self.mask
+
+
+def _load_theme(theme: str):
+    theme_path = os.path.join("images", theme)
+
+    bg_image = None
+    props = []
+
+    # Scan the chosen folder
+    if os.path.exists(theme_path):
+        for filename in sorted(os.listdir(theme_path)):
+            if filename.endswith(".png"):
+                full_path = os.path.join(theme_path, filename)
+
+                if filename.endswith("_bg.png"):
+                    # It's a background; kept at full size and scaled
+                    # to the canvas when drawn (see get_scaled)
+                    img = safe_load_png(full_path)
+                    if img:
+                        bg_image = img
+                else:
+                    # It's a tree/bush/rock -> Scale it so it fits
+                    size = 150 if theme == "meadow" else 100
+                    try:
+                        img = load_png(full_path, f"max{size}", lambda i: scale_to_max(i, max_w=size, max_h=size))
+                    except:
+                        continue
+                    props.append(PropAsset(filename, img, with_mask=True))
+    if not bg_image:
+        bg_image = pygame.Surface((WIDTH, HEIGHT))
+        bg_image.fill((34, 139, 34))  # fallback
+
+    return bg_image, props
+
+
+def get_theme(theme: str):
+    # Returns (background, [PropAsset, ...]). Images are loaded, scaled and
+    # measured once per theme; all rooms of that theme share them.
+    if theme not in _themes:
+        _themes[theme] = _load_theme(theme)
+    return _themes[theme]
+
+
+def iter_cached_surfaces():
+    """(name, surface) for every theme image and scaled copy cached here."""
+    for theme, (bg, props) in _themes.items():
+        yield f"{theme} background", bg
+        for prop in props:
+            yield f"{theme}/{prop.name}", prop.img
+    keys = {id(surf): key for key, surf in assetpack.get_loaded().items()}
+    for (_, size), (img, scaled) in _scaled["images"].items():
+        yield f"{keys.get(id(img), 'image')} at {size[0]}x{size[1]}", scaled
+
+
+def get_prop(theme: str, name: str):
+    for prop in get_theme(theme)[1]:
+        if prop.name == name:
+            return prop
+    return None
+
+
+def get_fox_images():
+    # Fox walk frames, scaled x2 like they are drawn.
+    if not _fox_images:
+        fox_files = sorted(os.listdir("images/fox"))
+        for f in fox_files:
+            _fox_images.append(load_png(os.path.join("images/fox", f), "x2", lambda img: pygame.transform.scale(
+                img, (img.get_width() * 2, img.get_height() * 2))))
+    return _fox_images
+
+
+def hitbox_mask(sprite: pygame.Surface, hitbox_size) -> pygame.mask.Mask:
+    # Mask of the sprite drawn centred on a hitbox, cut to the hitbox, so the
+    # mask lines up with the hitbox rect's top-left corner.
+    w, h = hitbox_size
+    mask = pygame.mask.Mask((w, h))
+    sw, sh = sprite.get_size()
+    mask.draw(pygame.mask.from_surface(sprite), (w // 2 - sw // 2, h // 2 - sh // 2))
+    return mask
+
+
+def get_collision_masks() -> dict:
+    """Pixel masks for precise collision, all aligned with the entity's hitbox rect.
+
+    "bunny": one mask, the union of every frame the bunny is drawn with (left,
+             right and the four diagonals), so the animation can never
+             push the bunny into a prop
+    "fox":   {(frame, direction): mask} with direction 1 = right, -1 = left
+    "trap":  mask of the trap picture inside its 40x40 rect
+    """
+    if not _collision_masks:
+        from bunny import Bunny  # bunny.py loads its frames through this module
+        sprite = Bunny((0, 0), (int(PLAYER_WIDTH * 1.5), PLAYER_HEIGHT))  # as game.make_bunny
+        bunny = pygame.mask.Mask((PLAYER_WIDTH, PLAYER_HEIGHT))
+        for frames in (sprite.frames_right, sprite.frames_left, sprite.diag_ur, sprite.diag_dr,
+                       sprite.diag_ul, sprite.diag_dl):
+            for frame in frames:
+                bunny.draw(hitbox_mask(frame, (PLAYER_WIDTH, PLAYER_HEIGHT)), (0, 0))
+
+        fox = {}
+        for i, img in enumerate(get_fox_images()):
+            fox[(i, 1)] = hitbox_mask(img, (FOX_WIDTH, FOX_HEIGHT))
+            fox[(i, -1)] = hitbox_mask(pygame.transform.flip(img, True, False), (FOX_WIDTH, FOX_HEIGHT))
+
+        trap_img = load_png("images/trap.png", "35x35", lambda i: pygame.transform.scale(i, (35, 35)))
+
+        _collision_masks["bunny"] = bunny
+        _collision_masks["fox"] = fox
+        _collision_masks["trap"] = hitbox_mask(trap_img, TRAP_RECT_SIZE)
+    return _collision_masks
+
+
+def clear_asset_cache():
+    _themes.clear()
+    _fox_images.clear()
+    _collision_masks.clear()
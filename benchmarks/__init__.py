@@ -0,0 +1,14 @@
+import time
+
+from session import init_headless
+from stress import percentile
+
+
+def time_frames(step, frames: int) -> list:
+    # Run step() `frames` times and return the frame times in milliseconds.
+    times = []
+    for _ in range(frames):
+        t0 = time.perf_counter()
+        step()
+        times.append((time.perf_counter() - t0) * 1000.0)
+    return times
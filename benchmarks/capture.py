@@ -0,0 +1,70 @@
+"""What recording costs the frame loop: saving inline against FrameCapture.
+
+Draws a crowded room each frame and captures the window, either with
+pygame.image.save in the loop or through capture.FrameCapture with each
+worker and format. Reports the frame time and how many frames were kept.
+
+    python -m benchmarks.capture
+"""
+import os
+import shutil
+import statistics
+import tempfile
+
+import pygame
+
+import display
+import session
+from benchmarks import init_headless, percentile, time_frames
+from capture import FrameCapture
+from game import load_game_assets, make_bunny, draw_world
+
+ROOM = {"foxes": 50, "obstacles": 30, "carrots": 20, "traps": 10}
+FRAMES = 120
+
+
+def main():
+    init_headless()
+    display.open_display((1280, 720), 1.0)
+    assets = load_game_assets()
+    game = session.new_session(seed=3, room_options=ROOM, fox_frame_count=len(assets["fox_images"]))
+    room = session.current_room(game)
+    bunny = make_bunny(game["player"])
+    out = tempfile.mkdtemp(prefix="capture-bench-")
+
+    def draw():
+        draw_world(display.get_canvas(), room, game, assets, bunny, 0.0)
+        display.present()
+
+    def inline():
+        draw()
+        inline.n += 1
+        pygame.image.save(pygame.display.get_surface(), os.path.join(out, f"inline_{inline.n}.png"))
+    inline.n = 0
+
+    draw()
+    print(f"{'mode':>16} {'mean ms':>8} {'p99':>7} {'kept':>6}")
+    times = time_frames(draw, FRAMES)
+    print(f"{'none':>16} {statistics.mean(times):>8.2f} {percentile(times, 99):>7.2f} {'-':>6}")
+    times = time_frames(inline, FRAMES)
+    print(f"{'inline png':>16} {statistics.mean(times):>8.2f} {percentile(times, 99):>7.2f} {FRAMES:>6}")
+
+    for worker in ("process", "thread"):
+        for fmt in ("png", "raw"):
+            cap_dir = os.path.join(out, f"{worker}-{fmt}")
+            cap = FrameCapture(cap_dir, pygame.display.get_surface(), fmt=fmt, worker=worker)
+
+            def captured():
+                draw()
+                cap.grab(pygame.display.get_surface())
+
+            times = time_frames(captured, FRAMES)
+            cap.close()
+            kept = cap.get_stats()["captured"]
+            print(f"{worker + ' ' + fmt:>16} {statistics.mean(times):>8.2f} "
+                  f"{percentile(times, 99):>7.2f} {kept:>6}")
+    shutil.rmtree(out, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
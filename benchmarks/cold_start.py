@@ -0,0 +1,67 @@
+"""Cold asset loading: loose PNG/MP3 files against the baked asset pack.
+
+Every run is a fresh interpreter that loads every asset the game uses
+(assetpack.load_everything) and reports the time it took and the read
+syscalls it made (Linux /proc/self/io). Bakes assets.pack first if needed.
+
+    python -m benchmarks.cold_start [runs]
+"""
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+RUNS = 5
+
+
+def _read_syscalls() -> int:
+    try:
+        with open("/proc/self/io") as f:
+            return int(next(line for line in f if line.startswith("syscr")).split()[1])
+    except OSError:
+        return -1
+
+
+def child(source: str):
+    import assetpack
+    from session import init_headless
+    init_headless()
+    if source == "loose":
+        assetpack.use_pack(None)
+    reads = _read_syscalls()
+    t0 = time.perf_counter()
+    assetpack.load_everything()
+    elapsed = (time.perf_counter() - t0) * 1000.0
+    print(elapsed, _read_syscalls() - reads)
+
+
+def run(source: str) -> tuple:
+    out = subprocess.run([sys.executable, "-m", "benchmarks.cold_start", "--child", source],
+                         capture_output=True, text=True, check=True,
+                         env=dict(os.environ, PYGAME_HIDE_SUPPORT_PROMPT="1"))
+    ms, reads = out.stdout.strip().splitlines()[-1].split()
+    return float(ms), int(reads)
+
+
+def main():
+    import assetpack
+    from settings import ASSET_PACK
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else RUNS
+    if not os.path.exists(ASSET_PACK):
+        from session import init_headless
+        init_headless()
+        assetpack.bake(ASSET_PACK)
+
+    print(f"{'source':>8} {'mean ms':>8} {'min ms':>7} {'read syscalls':>14}")
+    for source in ("loose", "pack"):
+        results = [run(source) for _ in range(runs)]
+        times = [ms for ms, _ in results]
+        print(f"{source:>8} {statistics.mean(times):>8.1f} {min(times):>7.1f} {results[-1][1]:>14}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2 and sys.argv[1] == "--child":
+        child(sys.argv[2])
+    else:
+        main()
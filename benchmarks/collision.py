@@ -0,0 +1,43 @@
+"""Frame cost of pixel-accurate collision against plain rects.
+
+Runs the same seeded, bot-driven session with PRECISE_COLLISION off and on
+for rooms with more and more props and foxes.
+
+    python -m benchmarks.collision
+"""
+import statistics
+
+import session
+from benchmarks import init_headless, percentile, time_frames
+from bot import ScriptedPlayer
+
+OBSTACLES = (5, 30, 80)
+FOXES = 40
+FRAMES = 600
+DT = 1 / 60
+
+
+def run(obstacles: int, precise: bool) -> list:
+    session.PRECISE_COLLISION = precise
+    game = session.new_session(seed=7, room_options={"foxes": FOXES, "obstacles": obstacles})
+    player = ScriptedPlayer()
+    session.step_session(game, 0, DT)  # build the room outside the timing
+
+    def step():
+        session.step_session(game, player.get_buttons(game), DT)
+
+    return time_frames(step, FRAMES)
+
+
+def main():
+    init_headless()
+    print(f"{'props':>6} {'rect ms':>8} {'p99':>6} {'mask ms':>8} {'p99':>6}")
+    for obstacles in OBSTACLES:
+        rect_times = run(obstacles, False)
+        mask_times = run(obstacles, True)
+        print(f"{obstacles:>6} {statistics.mean(rect_times):>8.3f} {percentile(rect_times, 99):>6.2f}"
+              f" {statistics.mean(mask_times):>8.3f} {percentile(mask_times, 99):>6.2f}")
+
+
+if __name__ == "__main__":
+    main()
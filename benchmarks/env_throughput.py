@@ -0,0 +1,51 @@
+"""Env-steps per second for BunnyEnv, VecBunnyEnv and ProcessVecEnv.
+
+Every env gets random button presses.
+
+    python -m benchmarks.env_throughput [envs] [steps]
+"""
+import multiprocessing as mp
+import sys
+import time
+import numpy as np
+
+from env import ACTION_COUNT, BunnyEnv, VecBunnyEnv, ProcessVecEnv
+
+
+def steps_per_second(env, count: int, steps: int) -> float:
+    rng = np.random.default_rng(0)
+    env.reset()
+    t0 = time.perf_counter()
+    for _ in range(steps):
+        env.step(rng.integers(ACTION_COUNT, size=count))
+    return count * steps / (time.perf_counter() - t0)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    steps = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+
+    single = BunnyEnv(seed=0)
+    single.reset()
+    rng = np.random.default_rng(0)
+    t0 = time.perf_counter()
+    for _ in range(steps):
+        _, _, terminated, truncated, _ = single.step(rng.integers(ACTION_COUNT))
+        if terminated or truncated:
+            single.reset()
+    print(f"BunnyEnv              1 env : {steps / (time.perf_counter() - t0):>8.0f} steps/s")
+
+    vec = VecBunnyEnv(count)
+    print(f"VecBunnyEnv         {count:>3} envs: {steps_per_second(vec, count, steps):>8.0f} steps/s")
+
+    workers = mp.cpu_count()
+    procs = ProcessVecEnv(count, workers=workers)
+    try:
+        rate = steps_per_second(procs, count, steps)
+    finally:
+        procs.close()
+    print(f"ProcessVecEnv       {count:>3} envs: {rate:>8.0f} steps/s ({len(procs.sizes)} workers, {workers} cores)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Frame time of the fox update with 10/100/1000 foxes.
+
+Compares the old per-fox loop from run_game with the batched
+foxes.update_foxes. Run from the repository root:
+
+    python -m benchmarks.fox_update
+"""
+import random
+import statistics
+import pygame
+
+from benchmarks import init_headless, time_frames, percentile
+from foxes import update_foxes, FOX_ANIM_DELAY
+from pathfinding import a_star
+from settings import WIDTH, HEIGHT, BLOCK_SIZE, FOX_SPEED, FOX_WIDTH, FOX_HEIGHT
+from world import generate_room, move_with_collision, reset_world
+
+FOX_COUNTS = (10, 100, 1000)
+FRAMES = 60
+DT = 1.0 / 60
+FRAME_COUNT = 4
+
+
+def legacy_update(room, player, dt):
+    # The loop run_game used before the batched update (without the hit handling).
+    for i, fox in enumerate(room["foxes"]):
+        if len(room["fox_paths"][i]) <= 1 or random.random() < 0.1:
+            room["fox_paths"][i] = a_star(
+                fox.center, player.center, room["blocks"], BLOCK_SIZE)
+
+        if room["fox_paths"][i] and len(room["fox_paths"][i]) > 1:
+            next_pos = room["fox_paths"][i][1]
+            dx = (next_pos[0] - fox.centerx) / max(1, abs(next_pos[0] - fox.centerx)) * FOX_SPEED * dt
+            dy = (next_pos[1] - fox.centery) / max(1, abs(next_pos[1] - fox.centery)) * FOX_SPEED * dt
+            move_with_collision(fox, room["blocks"], dx, dy)
+            room["fox_directions"][i] = 1 if dx > 0 else (-1 if dx < 0 else room["fox_directions"][i])
+        else:
+            fdx = (FOX_SPEED * dt) if fox.x < player.x else (-FOX_SPEED * dt)
+            fdy = (FOX_SPEED * dt) if fox.y < player.y else (-FOX_SPEED * dt)
+            move_with_collision(fox, room["blocks"], fdx, fdy)
+            room["fox_directions"][i] = 1 if fdx > 0 else (-1 if fdx < 0 else room["fox_directions"][i])
+
+        room["fox_anim_timer"][i] += dt
+        if room["fox_anim_timer"][i] >= FOX_ANIM_DELAY:
+            room["fox_anim_timer"][i] = 0.0
+            room["fox_frames"][i] = (room["fox_frames"][i] + 1) % FRAME_COUNT
+
+        fox.colliderect(player)
+
+
+def make_room(count: int, seed: int):
+    reset_world()
+    random.seed(seed)
+    room = generate_room((0, 0))
+    rng = random.Random(seed)
+    room["foxes"] = [pygame.Rect(rng.randint(40, WIDTH - 80), rng.randint(40, HEIGHT - 80),
+                                 FOX_WIDTH, FOX_HEIGHT) for _ in range(count)]
+    room["fox_frames"] = [0] * count
+    room["fox_directions"] = [1] * count
+    room["fox_paths"] = [[] for _ in range(count)]
+    room["fox_anim_timer"] = [0.0] * count
+    room["fox_ids"] = list(range(count))
+    room["next_id"] = count + len(room["carrots"])
+    room["carrot_ids"] = list(range(count, room["next_id"]))
+    return room
+
+
+def main():
+    init_headless()
+    player = pygame.Rect(WIDTH // 2, HEIGHT // 2, 70, 70)
+
+    print(f"{'foxes':>6} {'impl':>8} {'mean ms':>9} {'p50 ms':>8} {'p95 ms':>8}")
+    for count in FOX_COUNTS:
+        for name in ("legacy", "batched"):
+            room = make_room(count, seed=count)
+            random.seed(count)
+            if name == "legacy":
+                times = time_frames(lambda: legacy_update(room, player, DT), FRAMES)
+            else:
+                times = time_frames(lambda: update_foxes(room, player, DT, FRAME_COUNT), FRAMES)
+            print(f"{count:>6} {name:>8} {statistics.mean(times):>9.3f} "
+                  f"{percentile(times, 50):>8.3f} {percentile(times, 95):>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Resident audio memory: decoded Sound objects against streamed music.
+
+Before music.py, sound/menu.mp3 was loaded as a pygame.mixer.Sound, which
+keeps the whole decoded track in RAM. Now every background track is
+streamed through pygame.mixer.music.
+
+    python -m benchmarks.music_memory
+"""
+import os
+import time
+import pygame
+
+import music
+from benchmarks import init_headless
+
+
+def rss_bytes():
+    # Resident set size on Linux; None elsewhere.
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def mb(value) -> str:
+    return "n/a" if value is None else f"{value / 2 ** 20:.1f}"
+
+
+def main():
+    init_headless()
+    if not pygame.mixer.get_init():
+        pygame.mixer.init()
+
+    print(f"{'track':>9} {'file MB':>8} {'Sound MB':>9} {'Sound RSS+':>11} {'stream RSS+':>12}")
+    for name, (path, _) in music.TRACKS.items():
+        if not os.path.exists(path):
+            print(f"{name:>9}  missing {path}")
+            continue
+
+        before = rss_bytes()
+        sound = pygame.mixer.Sound(path)
+        decoded = len(sound.get_raw())
+        sound_rss = None if before is None else rss_bytes() - before
+        del sound
+
+        before = rss_bytes()
+        music._start(name)
+        time.sleep(0.5)  # let the mixer decode a few buffers
+        stream_rss = None if before is None else rss_bytes() - before
+        music.stop_music()
+
+        print(f"{name:>9} {mb(os.path.getsize(path)):>8} {mb(decoded):>9}"
+              f" {mb(sound_rss):>11} {mb(stream_rss):>12}")
+
+
+if __name__ == "__main__":
+    main()
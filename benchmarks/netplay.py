@@ -0,0 +1,131 @@
+"""Co-op over loopback: a server and bot clients, each its own process.
+
+Runs the server with FOXES foxes per room and CLIENTS wandering bots for
+SECONDS, then prints what the server and each client reported: tick time,
+bandwidth, delta vs full snapshot sizes, and snapshots a client could not
+decode. The last client drops LOSS of its snapshots on purpose.
+
+    python -m benchmarks.netplay [clients] [foxes]
+    python -m benchmarks.netplay --check
+
+--check runs a server and a client in this process instead and makes sure
+every snapshot the client decodes (full, delta, delta against an older
+baseline after lost packets, full again after the client lost its
+baselines) equals what the server encoded, and that picking up a carrot
+is sent as one removal.
+"""
+import os
+import socket
+import subprocess
+import sys
+import time
+
+CLIENTS = 3
+FOXES = 20
+SECONDS = 15
+LOSS = 0.2
+SNAPSHOT_GAP = 12  # --check: steps of lost snapshots, within the server's history
+HISTORY_STEPS = 120  # --check: steps until baselines the client lost are too old
+
+
+def free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def server(port: int, foxes: int, seconds: float):
+    from netplay import CoopServer
+    from session import init_headless
+    init_headless()
+    CoopServer(port, seed=1, room_options={"foxes": foxes}).run(seconds)
+
+
+def check():
+    import random
+    from netplay import CoopServer, CoopClient, MSG_INPUT, encode_delta, room_fields, wander_buttons
+    from session import init_headless
+    from triggers import collect_carrot
+    from world import find_room
+    init_headless()
+    port = free_port()
+    server = CoopServer(port, seed=1, room_options={"foxes": FOXES, "carrots": 6})
+    client = CoopClient("127.0.0.1", port)
+    rng = random.Random(1)
+    bot = {}
+    checked = 0
+
+    def run(steps):
+        nonlocal checked
+        for _ in range(steps):
+            client.send(MSG_INPUT, wander_buttons(rng, bot))
+            server.step()
+            if client.poll():
+                sent = next(iter(server.clients.values()))["history"][client.tick][1]
+                if client.states != sent:
+                    sys.exit(f"[NET] snapshot {client.tick} decoded wrong:\n  sent {sent}\n  got  {client.states}")
+                checked += 1
+
+    run(60)
+    if client.stats["full"] < 1 or client.stats["snapshots"] <= client.stats["full"]:
+        sys.exit(f"[NET] expected a full snapshot and deltas: {client.stats}")
+
+    # every snapshot lost for a while: deltas come against an older baseline
+    client.loss = 1.0
+    run(SNAPSHOT_GAP)
+    client.loss = 0.0
+    run(30)
+    if client.stats["undecodable"]:
+        sys.exit(f"[NET] deltas after lost snapshots were undecodable: {client.stats}")
+
+    # the client forgets its baselines: it waits for the server to send a full one
+    full = client.stats["full"]
+    client.history.clear()
+    run(HISTORY_STEPS)
+    if client.stats["full"] == full:
+        sys.exit(f"[NET] no full snapshot after the client lost its baselines: {client.stats}")
+
+    # a pickup removes one carrot and leaves every other id alone
+    room = find_room(client.coords, server.rooms)
+    before = room_fields(room)
+    collect_carrot(room, room["carrots"][0])
+    _, updates, removals = encode_delta(room_fields(room), before)
+    if (updates, removals) != (0, 1):
+        sys.exit(f"[NET] a pickup sent {updates} updates and {removals} removals")
+    run(30)
+
+    client.sock.close()
+    server.sock.close()
+    print(f"[NET] round trip OK: {checked} snapshots checked, {client.stats}")
+
+
+def main():
+    clients = int(sys.argv[1]) if len(sys.argv) > 1 else CLIENTS
+    foxes = int(sys.argv[2]) if len(sys.argv) > 2 else FOXES
+    port = free_port()
+    env = dict(os.environ, PYGAME_HIDE_SUPPORT_PROMPT="1")
+    procs = [subprocess.Popen([sys.executable, "-m", "benchmarks.netplay", "--server", str(port), str(foxes)],
+                              stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, env=env)]
+    time.sleep(1.0)
+    for i in range(clients):
+        args = [sys.executable, "main.py", "--join", f"127.0.0.1:{port}", "--bot",
+                "--seconds", str(SECONDS - 2)]
+        if i == clients - 1:
+            args += ["--loss", str(LOSS)]
+        procs.append(subprocess.Popen(args, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, env=env))
+
+    print(f"{clients} bots ({LOSS:.0%} loss on the last one), {foxes} foxes per room, {SECONDS}s")
+    for proc in procs[1:] + procs[:1]:
+        out, _ = proc.communicate()
+        for line in out.splitlines():
+            if line.startswith("[NET]") and not line.startswith("[NET] Player"):
+                print(line)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--check":
+        check()
+    elif len(sys.argv) > 3 and sys.argv[1] == "--server":
+        server(int(sys.argv[2]), int(sys.argv[3]), SECONDS)
+    else:
+        main()
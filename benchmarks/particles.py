@@ -0,0 +1,52 @@
+"""Frame cost of the particle pool at a steady particle count.
+
+Every frame emits enough particles of all kinds to replace the ones that
+died, then updates and draws the pool onto a window-sized surface.
+
+    python -m benchmarks.particles
+"""
+import statistics
+
+import pygame
+
+from benchmarks import init_headless, percentile, time_frames
+from particles import EFFECTS, ParticlePool
+from settings import WIDTH, HEIGHT, FPS
+
+COUNTS = (1000, 4000, 8000)
+FRAMES = 600
+DT = 1 / 60
+
+
+def run(count: int) -> list:
+    pool = ParticlePool(capacity=count, seed=0)
+    target = pygame.Surface((WIDTH, HEIGHT))
+    kinds = list(EFFECTS)
+    frame = [0]
+
+    def step():
+        frame[0] += 1
+        kind = kinds[frame[0] % len(kinds)]
+        pool.emit(kind, (WIDTH / 2, HEIGHT / 2), count - pool.count)
+        pool.update(DT)
+        target.fill((0, 0, 0))
+        pool.draw(target)
+
+    for _ in range(60):  # fill the pool first
+        step()
+    return time_frames(step, FRAMES)
+
+
+def main():
+    init_headless()
+    budget = 1000 / FPS
+    print(f"{'particles':>10} {'mean ms':>8} {'p50':>6} {'p99':>6} {'of frame':>9}")
+    for count in COUNTS:
+        times = run(count)
+        mean = statistics.mean(times)
+        print(f"{count:>10} {mean:>8.2f} {percentile(times, 50):>6.2f} {percentile(times, 99):>6.2f} "
+              f"{mean / budget * 100:>8.0f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Sprite drawing: one blit per sprite against the RenderQueue.
+
+Both draw the obstacles, traps, carrots, bunny and foxes of the same
+crowded room onto a window-sized surface. The per-sprite loop is the draw
+code game.draw_world had before the render queue.
+
+    python -m benchmarks.render
+"""
+import math
+import statistics
+
+import pygame
+
+import session
+from benchmarks import init_headless, percentile, time_frames
+from game import load_game_assets, make_bunny, queue_sprites
+from render import RenderQueue
+from settings import WIDTH, HEIGHT
+
+ROOMS = ({"foxes": 10, "obstacles": 5, "carrots": 5, "traps": 5},
+         {"foxes": 200, "obstacles": 30, "carrots": 50, "traps": 20},
+         {"foxes": 1000, "obstacles": 80, "carrots": 200, "traps": 100})
+FRAMES = 300
+
+
+def draw_sprites_loop(WIN, room, session_, assets, bunny, shake=(0, 0)):
+    cx, cy = shake
+    player = session_["player"]
+    for ob in room.get("obstacles", []):
+        WIN.blit(ob["img"], ob["draw_rect"].move(cx, cy))
+
+    trap_img = assets["trap_img"]
+    for trap in room.get("traps", []):
+        rect = trap_img.get_rect(
+            center=(trap.centerx + cx, trap.centery + cy))
+        WIN.blit(trap_img, rect)
+
+    carrot_img = assets["carrot_img"]
+    for carrot in room["carrots"]:
+        offset = math.sin(pygame.time.get_ticks() * 0.005) * 5
+        rect = carrot_img.get_rect(
+            center=(carrot.centerx + cx, carrot.centery + cy + offset))
+        WIN.blit(carrot_img, rect)
+
+    base_center = player.center
+    bunny.set_pos((base_center[0] + cx, base_center[1] + cy))
+    bunny.draw(WIN)
+    bunny.set_pos(base_center)
+
+    fox_images = assets["fox_images"]
+    for i, fox in enumerate(room["foxes"]):
+        img = fox_images[room["fox_frames"][i]]
+        if room["fox_directions"][i] == -1:
+            img = pygame.transform.flip(img, True, False)
+        rect = img.get_rect(
+            center=(fox.centerx + cx, fox.centery + cy))
+        WIN.blit(img, rect)
+
+
+def draw_sprites_queue(WIN, room, session_, assets, bunny, queue, shake=(0, 0)):
+    queue_sprites(queue, room, session_, assets, bunny, shake)
+    queue.flush(WIN)
+
+
+def main():
+    init_headless()
+    pygame.display.set_mode((WIDTH, HEIGHT))
+    assets = load_game_assets()
+    WIN = pygame.Surface((WIDTH, HEIGHT))
+    print(f"{'foxes':>6} {'sprites':>8} {'loop ms':>8} {'p99':>6} {'queue ms':>9} {'p99':>6} {'speedup':>8}")
+    for options in ROOMS:
+        game = session.new_session(seed=3, room_options=options, fox_frame_count=len(assets["fox_images"]))
+        room = session.current_room(game)
+        bunny = make_bunny(game["player"])
+        # half the foxes face left, so the loop pays for its flips
+        room["fox_directions"] = [-1 if i % 2 else 1 for i in range(len(room["foxes"]))]
+        queue = RenderQueue()
+
+        loop = time_frames(lambda: draw_sprites_loop(WIN, room, game, assets, bunny, (2, -1)), FRAMES)
+        queued = time_frames(lambda: draw_sprites_queue(WIN, room, game, assets, bunny, queue, (2, -1)), FRAMES)
+        a, b = statistics.mean(loop), statistics.mean(queued)
+        print(f"{len(room['foxes']):>6} {queue.last_blits:>8} {a:>8.2f} {percentile(loop, 99):>6.2f} "
+              f"{b:>9.2f} {percentile(queued, 99):>6.2f} {a / b:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""Frame cost (draw + upscale to the window) at different render scales.
+
+Draws the same crowded room and HUD into the canvas and presents it in a
+1280x720 window, for each internal render resolution.
+
+    python -m benchmarks.resolution
+"""
+import statistics
+
+import display
+import session
+from benchmarks import init_headless, percentile, time_frames
+from game import load_game_assets, make_bunny, draw_world, draw_hud
+from ui import load_font
+
+SCALES = (1.0, 0.75, 0.5)
+ROOM = {"foxes": 200, "obstacles": 30, "carrots": 50, "traps": 20}
+FRAMES = 300
+
+
+def main():
+    init_headless()
+    print(f"{'scale':>6} {'canvas':>10} {'mean ms':>8} {'p50':>6} {'p99':>6}")
+    for scale in SCALES:
+        display.open_display((1280, 720), scale)
+        assets = load_game_assets()
+        game = session.new_session(seed=3, room_options=ROOM, fox_frame_count=len(assets["fox_images"]))
+        room = session.current_room(game)
+        bunny = make_bunny(game["player"])
+
+        def frame():
+            WIN = display.get_canvas()
+            draw_world(WIN, room, game, assets, bunny, 0.0)
+            draw_hud(WIN, load_font(30), room, game)
+            display.present()
+
+        frame()  # fills the scaled-image caches
+        times = time_frames(frame, FRAMES)
+        w, h = display.get_canvas().get_size()
+        print(f"{scale:>6} {f'{w}x{h}':>10} {statistics.mean(times):>8.2f} "
+              f"{percentile(times, 50):>6.2f} {percentile(times, 99):>6.2f}")
+
+
+if __name__ == "__main__":
+    main()
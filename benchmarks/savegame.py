@@ -0,0 +1,52 @@
+"""Save and resume time of a world with hundreds of explored rooms.
+
+    python -m benchmarks.savegame [rooms]
+"""
+import os
+import sys
+import tempfile
+import time
+
+import world
+from benchmarks import init_headless
+from savegame import save_game, load_game
+from session import new_session, current_room
+
+
+def main():
+    rooms = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    init_headless()
+
+    session = new_session(seed=3)
+    side = int(rooms ** 0.5) + 1
+    for i in range(rooms):
+        session["coords"] = (i % side, i // side)
+        current_room(session)
+    session["coords"] = (0, 0)
+
+    path = os.path.join(tempfile.mkdtemp(), "bench.bunsave")
+    t0 = time.perf_counter()
+    save_game(path, session)
+    first_save = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    save_game(path, session)
+    t1 = time.perf_counter()
+    load_game(path)
+    t2 = time.perf_counter()
+    current_room(session)  # decodes one room (and loads its theme images)
+    t3 = time.perf_counter()
+    session["coords"] = (1, 0)
+    current_room(session)
+    t4 = time.perf_counter()
+
+    print(f"rooms: {len(world.room_data) + len(world.room_loader.__self__.index)}, "
+          f"file: {os.path.getsize(path) / 1024:.1f} KiB")
+    print(f"first save:        {first_save * 1000:8.2f} ms")
+    print(f"save:              {(t1 - t0) * 1000:8.2f} ms")
+    print(f"resume (index):    {(t2 - t1) * 1000:8.2f} ms")
+    print(f"first room:        {(t3 - t2) * 1000:8.2f} ms")
+    print(f"next room:         {(t4 - t3) * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""Cost of the per-frame portal/trap/carrot checks as item counts grow.
+
+Compares the old linear scans from run_game with triggers.TriggerGrid.
+
+    python -m benchmarks.triggers
+"""
+import random
+import statistics
+import pygame
+
+from benchmarks import time_frames
+from settings import WIDTH, HEIGHT
+from triggers import TriggerGrid
+
+COUNTS = (10, 100, 1000, 10000)
+FRAMES = 2000
+
+
+def main():
+    rng = random.Random(1)
+    player = pygame.Rect(WIDTH // 2, HEIGHT // 2, 70, 70)
+
+    print(f"{'items':>6} {'linear us':>10} {'grid us':>10}")
+    for count in COUNTS:
+        carrots = [pygame.Rect(rng.randint(80, WIDTH - 80), rng.randint(120, HEIGHT - 80), 16, 16)
+                   for _ in range(count)]
+        traps = [pygame.Rect(rng.randint(60, WIDTH - 100), rng.randint(100, HEIGHT - 100), 40, 40)
+                 for _ in range(count)]
+        grid = TriggerGrid()
+        for rect in carrots:
+            grid.add("carrot", rect)
+        for rect in traps:
+            grid.add("trap", rect)
+
+        def linear():
+            for trap in traps:
+                if player.colliderect(trap):
+                    break
+            for carrot in carrots[:]:
+                player.colliderect(carrot)
+
+        def broad_phase():
+            grid.query(player, "trap")
+            grid.query(player, "carrot")
+
+        linear_us = statistics.mean(time_frames(linear, FRAMES)) * 1000.0
+        grid_us = statistics.mean(time_frames(broad_phase, FRAMES)) * 1000.0
+        print(f"{count:>6} {linear_us:>10.2f} {grid_us:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+from foxes import nav_blocked
+from pathfinding import a_star
+from session import current_room, BTN_LEFT, BTN_RIGHT, BTN_UP, BTN_DOWN, BTN_DASH
+from settings import BLOCK_SIZE
+
+REPLAN_FRAMES = 15  # frames between A* re-plans
+DEADZONE = 6  # pixels; closer than this counts as "on target" for an axis
+STUCK_FRAMES = 90  # give up on a carrot after this many frames without progress
+
+
+class ScriptedPlayer:
+    """Computer-controlled bunny: walks to the nearest carrot, otherwise to a portal.
+
+    Produces the same button bitmask as session.read_keyboard(), so it can drive
+    step_session() anywhere a human would.
+    """
+
+    def __init__(self, portal_side="right", dash=True):
+        self.portal_side = portal_side
+        self.dash = dash
+        self.path = []
+        self.frames_since_plan = REPLAN_FRAMES
+        self.last_coords = None
+        self.last_target = None
+        self.skipped = set()  # carrots that could not be reached in this room
+        self.best_distance = None
+        self.stuck_frames = 0
+
+    def get_target(self, session):
+        room = current_room(session)
+        player = session["player"]
+        carrots = [c for c in room["carrots"] if c.center not in self.skipped]
+        if carrots:
+            nearest = min(carrots, key=lambda c: (c.centerx - player.centerx) ** 2
+                          + (c.centery - player.centery) ** 2)
+            return nearest.center
+        return room["portals"][self.portal_side].center
+
+    def track_progress(self, session, target):
+        player = session["player"]
+        distance = abs(target[0] - player.centerx) + abs(target[1] - player.centery)
+        if self.best_distance is None or distance < self.best_distance - 2:
+            self.best_distance = distance
+            self.stuck_frames = 0
+            return
+        self.stuck_frames += 1
+        if self.stuck_frames >= STUCK_FRAMES:
+            self.skipped.add(target)
+            self.best_distance = None
+            self.stuck_frames = 0
+            self.frames_since_plan = REPLAN_FRAMES
+
+    def get_buttons(self, session) -> int:
+        if session["is_transitioning"]:
+            return 0
+
+        room = current_room(session)
+        player = session["player"]
+        if session["coords"] != self.last_coords:
+            self.skipped.clear()
+            self.best_distance = None
+            self.stuck_frames = 0
+
+        target = self.get_target(session)
+        if target != self.last_target:
+            self.best_distance = None
+            self.stuck_frames = 0
+            self.last_target = target
+        self.track_progress(session, target)
+
+        self.frames_since_plan += 1
+        if self.frames_since_plan >= REPLAN_FRAMES or session["coords"] != self.last_coords:
+            self.path = a_star(player.center, target, room["blocks"], BLOCK_SIZE, nav_blocked(room))
+            self.frames_since_plan = 0
+            self.last_coords = session["coords"]
+
+        # Follow the path while it is more than one cell away, then go straight in.
+        waypoint = self.path[1] if len(self.path) > 1 else target
+
+        buttons = 0
+        dx = waypoint[0] - player.centerx
+        dy = waypoint[1] - player.centery
+        if dx < -DEADZONE:
+            buttons |= BTN_LEFT
+        elif dx > DEADZONE:
+            buttons |= BTN_RIGHT
+        if dy < -DEADZONE:
+            buttons |= BTN_UP
+        elif dy > DEADZONE:
+            buttons |= BTN_DOWN
+
+        if self.dash and buttons and session["dash_cooldown"] <= 0:
+            buttons |= BTN_DASH
+        return buttons
@@ -1,4 +1,6 @@
 import os, pygame
+import assetpack
+from assets import load_png
 
 def diagonalize(src, max_shift, upward):
     w,h = src.get_size()
@@ -20,17 +22,21 @@ class Bunny:
     def __init__(self, pos, white_square_size=(32,32)):
         self.pos = pygame.math.Vector2(pos)
         files = ["idle.png","run1.png","run2.png"]
+        size = "%dx%d" % tuple(white_square_size)
         base = []
         for name in files:
             path = os.path.join("images","bunny", name)
-            img = pygame.image.load(path).convert_alpha()
-            img = pygame.transform.scale(img, white_square_size)
-            base.append(img)
+            base.append(load_png(path, size, lambda i: pygame.transform.scale(i, white_square_size)))
         self.frames_right = base
         self.frames_left = [pygame.transform.flip(i, True, False) for i in base]
         max_shift = max(1, white_square_size[0]//6)
-        self.diag_ur = [diagonalize(f, max_shift, upward=True) for f in base]
-        self.diag_dr = [diagonalize(f, max_shift, upward=False) for f in base]
+        # diagonalize is slow (pixel by pixel), so the asset pack has these too
+        self.diag_ur = [assetpack.image(f"images/bunny/{name}@{size}_ur",
+                                        lambda f=f: diagonalize(f, max_shift, upward=True)) for name, f in zip(files, base)]
+        self.diag_dr = [assetpack.image(f"images/bunny/{name}@{size}_dr",
+                                        lambda f=f: diagonalize(f, max_shift, upward=False)) for name, f in zip(files, base)]
+        self.diag_ul = [pygame.transform.flip(f, True, False) for f in self.diag_ur]
+        self.diag_dl = [pygame.transform.flip(f, True, False) for f in self.diag_dr]
         self.direction = "right"; self.frame=0; self.timer=0; self.delay=120
         self.velocity = pygame.math.Vector2(0,0)
 
@@ -55,7 +61,8 @@ class Bunny:
             self.frame = 0; self.timer = 0
         self.pos += self.velocity * (dt/1000.0)
 
-    def draw(self, surf):
+    def get_sprite(self):
+        # (image, top-left) of the current frame, centred on pos
         if self.direction in ("right","left"):
             frames = self.frames_right if self.direction=="right" else self.frames_left
         elif self.direction == "ur":
@@ -63,9 +70,12 @@ class Bunny:
         elif self.direction == "dr":
             frames = self.diag_dr
         elif self.direction == "ul":
-            frames = [pygame.transform.flip(f, True, False) for f in self.diag_ur]
+            frames = self.diag_ul
         else: # dl
-            frames = [pygame.transform.flip(f, True, False) for f in self.diag_dr]
+            frames = self.diag_dl
         img = frames[self.frame]
-        rect = img.get_rect(center=(int(self.pos.x), int(self.pos.y)))
-        surf.blit(img, rect)
\ No newline at end of file
+        w, h = img.get_size()
+        return img, (int(self.pos.x) - w // 2, int(self.pos.y) - h // 2)
+
+    def draw(self, surf):
+        surf.blit(*self.get_sprite())
@@ -0,0 +1,145 @@
+"""Gameplay capture without stalling the frame loop.
+
+grab() copies the shown frame into a free slot of a ring of preallocated
+buffers (shared memory) and returns; a worker thread or process encodes
+the slots to disk and hands them back. When every slot is still waiting to
+be encoded the frame is dropped instead of waiting. Output is a PNG
+sequence (frame_000000.png, ...) or one raw stream, for example:
+
+    ffmpeg -f rawvideo -pixel_format bgr0 -video_size 1280x720 -framerate 60 -i frames.raw out.mp4
+
+(bgr0 with the usual display format; the fourth byte is unused.)
+"""
+import multiprocessing as mp
+import os
+import queue
+import threading
+import time
+from multiprocessing import shared_memory
+import numpy as np
+import pygame
+
+CAPTURE_SLOTS = 8
+FORMATS = ("png", "raw")
+
+
+def channel_order(surface: pygame.Surface) -> tuple:
+    # Byte offsets of red, green and blue in one of the surface's pixels
+    return tuple(mask.bit_length() // 8 - 1 for mask in surface.get_masks()[:3])
+
+
+def _encode_loop(shm_name: str, shape, slots: int, order, fmt: str, out_dir: str,
+                 jobs, done):
+    # Runs in the worker: (slot, frame number) in, slot back out when written.
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        ring = np.ndarray((slots,) + tuple(shape), dtype=np.uint32, buffer=shm.buf)
+        h, w = shape
+        # a new run replaces the last one's frames, as it does with the PNGs
+        raw = open(os.path.join(out_dir, "frames.raw"), "wb") if fmt == "raw" else None
+        try:
+            while True:
+                job = jobs.get()
+                if job is None:
+                    break
+                slot, number = job
+                if raw:
+                    raw.write(ring[slot].data)
+                else:
+                    rgb = ring[slot].view(np.uint8).reshape(h, w, 4)[:, :, list(order)]
+                    surf = pygame.image.frombuffer(rgb.tobytes(), (w, h), "RGB")
+                    pygame.image.save(surf, os.path.join(out_dir, f"frame_{number:06d}.png"))
+                done.put(slot)
+        finally:
+            if raw:
+                raw.close()
+            del ring
+    finally:
+        shm.close()
+
+
+class FrameCapture:
+    """Ring of `slots` frame buffers plus one encoder ("process" or "thread").
+
+    A process encodes without holding the game's GIL; a thread needs no
+    second interpreter but shares the GIL with the frame loop.
+    get_stats() counts captured, dropped (ring full) and skipped (window
+    size changed) frames and the time grab() took per frame, which is all
+    the frame loop pays.
+    """
+
+    def __init__(self, out_dir: str, surface: pygame.Surface, fmt: str = "png", worker: str = "process",
+                 slots: int = CAPTURE_SLOTS):
+        # surface: what grab() will be given (normally the window); frames
+        # of another size are skipped
+        if fmt not in FORMATS:
+            raise ValueError(f"capture format must be one of {FORMATS}")
+        os.makedirs(out_dir, exist_ok=True)
+        w, h = surface.get_size()
+        self.size = (w, h)
+        order = channel_order(surface)
+        self.out_dir = out_dir
+        self.shm = shared_memory.SharedMemory(create=True, size=slots * w * h * 4)
+        self.ring = np.ndarray((slots, h, w), dtype=np.uint32, buffer=self.shm.buf)
+        self.free = list(range(slots))
+        self.frame = 0
+        self.stats = {"captured": 0, "dropped": 0, "skipped": 0}
+        self.grab_ms = [0.0, 0.0]  # total, worst
+
+        if worker == "process":
+            ctx = mp.get_context("spawn")
+            self.jobs, self.done = ctx.Queue(), ctx.Queue()
+            self.worker = ctx.Process(target=_encode_loop, daemon=True, args=(
+                self.shm.name, (h, w), slots, order, fmt, out_dir, self.jobs, self.done))
+        else:
+            self.jobs, self.done = queue.Queue(), queue.Queue()
+            self.worker = threading.Thread(target=_encode_loop, daemon=True, args=(
+                self.shm.name, (h, w), slots, order, fmt, out_dir, self.jobs, self.done))
+        self.worker.start()
+        print(f"[CAPTURE] {fmt} frames {w}x{h} to {out_dir} ({slots} slots, {worker} encoder)")
+
+    def grab(self, surface: pygame.Surface) -> bool:
+        """Queue a copy of `surface` for encoding; False if it was dropped."""
+        t0 = time.perf_counter()
+        self.frame += 1
+        try:
+            return self._grab(surface)
+        finally:
+            ms = (time.perf_counter() - t0) * 1000.0
+            self.grab_ms[0] += ms
+            self.grab_ms[1] = max(self.grab_ms[1], ms)
+
+    def _grab(self, surface: pygame.Surface) -> bool:
+        while True:
+            try:
+                self.free.append(self.done.get_nowait())
+            except queue.Empty:
+                break
+        if surface.get_size() != self.size:
+            self.stats["skipped"] += 1
+            return False
+        if not self.free:
+            self.stats["dropped"] += 1
+            return False
+
+        slot = self.free.pop()
+        # pixels2d is indexed [x][y]; its transpose walks memory row by row
+        np.copyto(self.ring[slot], pygame.surfarray.pixels2d(surface).T)
+        self.jobs.put((slot, self.frame))
+        self.stats["captured"] += 1
+        return True
+
+    def get_stats(self) -> dict:
+        stats = dict(self.stats)
+        stats["grab_ms_mean"] = round(self.grab_ms[0] / self.frame, 3) if self.frame else 0.0
+        stats["grab_ms_max"] = round(self.grab_ms[1], 3)
+        return stats
+
+    def close(self):
+        # Let the encoder finish what it has, then free the ring.
+        self.jobs.put(None)
+        self.worker.join()
+        del self.ring
+        self.shm.close()
+        self.shm.unlink()
+        print(f"[CAPTURE] {self.get_stats()}")
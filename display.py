@@ -0,0 +1,91 @@
+import pygame
+from settings import WIDTH, HEIGHT, RENDER_SCALE
+
+# Everything is laid out in world coordinates (WIDTH x HEIGHT) and drawn
+# into a canvas at the internal render resolution: the window's size, fitted
+# to the world's aspect ratio, times the render scale. present() puts the
+# canvas in the window with one scaling blit, letterboxed. Until
+# open_display() is called (stress test, replay, benchmarks) the scale is 1.
+_display = {
+    "render_scale": RENDER_SCALE,
+    "window_size": None,
+    "scale": 1.0,    # canvas pixels per world pixel
+    "canvas": None,
+    "area": None,    # where the canvas goes in the window
+    "target": None,  # window subsurface of that area
+}
+
+
+def open_display(window_size=(WIDTH, HEIGHT), render_scale=RENDER_SCALE) -> pygame.Surface:
+    pygame.display.set_mode(window_size, pygame.RESIZABLE)
+    _display["render_scale"] = render_scale
+    _display["window_size"] = None
+    return get_canvas()
+
+
+def _sync():
+    # Rebuild the canvas when the window was resized.
+    window = pygame.display.get_surface()
+    size = window.get_size()
+    if size == _display["window_size"]:
+        return
+    fit = min(size[0] / WIDTH, size[1] / HEIGHT)
+    area = pygame.Rect(0, 0, max(1, round(WIDTH * fit)), max(1, round(HEIGHT * fit)))
+    area.center = (size[0] // 2, size[1] // 2)
+    scale = fit * _display["render_scale"]
+    canvas_size = (max(1, round(WIDTH * scale)), max(1, round(HEIGHT * scale)))
+
+    window.fill((0, 0, 0))  # letterbox bars
+    target = window.subsurface(area)
+    # At full resolution the game draws straight into the window.
+    canvas = target if canvas_size == area.size else pygame.Surface(canvas_size)
+    _display.update(window_size=size, scale=scale, area=area, canvas=canvas, target=target)
+    print(f"[DISPLAY] Window {size[0]}x{size[1]}, rendering at {canvas_size[0]}x{canvas_size[1]}")
+
+
+def get_canvas() -> pygame.Surface:
+    """The surface to draw the next frame on (replaced when the window is resized)."""
+    _sync()
+    return _display["canvas"]
+
+
+def get_scale() -> float:
+    return _display["scale"]
+
+
+def get_surfaces() -> dict:
+    """The window and the canvas (None before open_display), by name."""
+    return {"window": pygame.display.get_surface(), "canvas": _display["canvas"]}
+
+
+def set_render_scale(render_scale: float):
+    _display["render_scale"] = render_scale
+    _display["window_size"] = None
+
+
+def present(surface=None):
+    """Show the canvas (or a saved copy of it) in the window and flip."""
+    if surface is None:
+        surface = _display["canvas"]
+    if pygame.display.get_surface().get_size() != _display["window_size"]:
+        # Resized since get_canvas(): a frame drawn straight into the old
+        # window is lost, anything else is scaled into the new one.
+        lost = surface is _display["target"]
+        _sync()
+        if lost:
+            return
+    target = _display["target"]
+    if surface is not target:
+        if surface.get_size() == target.get_size():
+            target.blit(surface, (0, 0))
+        else:
+            pygame.transform.scale(surface, target.get_size(), target)
+    pygame.display.flip()
+
+
+def to_world(pos):
+    # Window pixel (e.g. a mouse position) -> world coordinates
+    area = _display["area"]
+    if area is None:
+        return pos
+    return ((pos[0] - area.x) * WIDTH / area.width, (pos[1] - area.y) * HEIGHT / area.height)
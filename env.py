@@ -0,0 +1,188 @@
+import multiprocessing as mp
+import numpy as np
+
+from foxes import nav_blocked
+from session import init_headless, new_session, step_session, current_room
+import settings
+from settings import WIDTH, HEIGHT, FPS, BLOCK_SIZE, LIVES_START
+
+# Actions are the session's button bitmask: BTN_LEFT | BTN_UP | BTN_DASH ...
+ACTION_COUNT = 32
+
+NEAREST = 8  # foxes and carrots in the observation, closest first
+GRID_W, GRID_H = WIDTH // BLOCK_SIZE, HEIGHT // BLOCK_SIZE
+# player x, y, score, lives, dash ready, invulnerable, transitioning,
+# NEAREST x (dx, dy, present) for foxes and carrots, then the blocked grid
+OBS_SIZE = 7 + 2 * NEAREST * 3 + GRID_W * GRID_H
+
+REWARDS = {"carrot": 1.0, "trap": -1.0, "fox_hit": -1.0, "won": 5.0, "lost": -5.0}
+
+
+def _nearest(rects, px: float, py: float) -> np.ndarray:
+    # (NEAREST, 3) rows of dx, dy (scaled to the screen) and a present flag
+    out = np.zeros((NEAREST, 3), dtype=np.float32)
+    if rects:
+        centers = np.array([r.center for r in rects], dtype=np.float32)
+        delta = (centers - (px, py)) / (WIDTH, HEIGHT)
+        order = np.argsort((delta ** 2).sum(axis=1))[:NEAREST]
+        out[:len(order), :2] = delta[order]
+        out[:len(order), 2] = 1.0
+    return out
+
+
+def observe(session) -> np.ndarray:
+    """Flat float32 vector of what the player can see (see OBS_SIZE)."""
+    room = current_room(session)
+    player = session["player"]
+    px, py = player.center
+
+    grid = np.zeros((GRID_H, GRID_W), dtype=np.float32)
+    for x, y in nav_blocked(room):
+        grid[y, x] = 1.0
+
+    head = np.array([
+        px / WIDTH, py / HEIGHT,
+        session["score"] / settings.TARGET_SCORE, session["lives"] / LIVES_START,
+        float(session["dash_cooldown"] <= 0), float(session["invuln_timer"] > 0),
+        float(session["is_transitioning"]),
+    ], dtype=np.float32)
+    return np.concatenate([head, _nearest(room["foxes"], px, py).ravel(),
+                           _nearest(room["carrots"], px, py).ravel(), grid.ravel()])
+
+
+class BunnyEnv:
+    """One headless game with a gym-style reset()/step() API.
+
+    step(action) takes a button bitmask (0..ACTION_COUNT-1), advances one
+    frame of 1/FPS seconds and returns (obs, reward, terminated, truncated,
+    info); info["events"] lists what happened that frame. Every env keeps
+    its rooms in its own dict, so any number can run in one process.
+    """
+
+    def __init__(self, seed=None, room_options=None, max_steps: int = 60 * FPS):
+        init_headless()
+        self.room_options = room_options
+        self.max_steps = max_steps
+        self.rng = np.random.default_rng(seed)
+        self.session = None
+        self.steps = 0
+
+    def reset(self, seed=None):
+        if seed is None:
+            seed = int(self.rng.integers(2 ** 32))
+        self.session = new_session(seed, self.room_options, rooms={})
+        self.steps = 0
+        return observe(self.session), {"seed": seed}
+
+    def step(self, action: int):
+        events = step_session(self.session, int(action), 1 / FPS)
+        self.steps += 1
+        reward = sum(REWARDS.get(ev, 0.0) for ev in events)
+        terminated = self.session["state"] != "PLAYING"
+        truncated = not terminated and self.steps >= self.max_steps
+        info = {"events": events, "score": self.session["score"], "state": self.session["state"]}
+        return observe(self.session), reward, terminated, truncated, info
+
+
+class VecBunnyEnv:
+    """Many BunnyEnvs stepped together in this process.
+
+    reset() returns an (n, OBS_SIZE) array; step(actions) returns stacked
+    obs, rewards, terminated and truncated arrays plus a list of infos. An
+    env that finishes is reset straight away; its last observation is in
+    info["final_obs"].
+    """
+
+    def __init__(self, count: int, seed: int = 0, first: int = 0, **env_kwargs):
+        # env i is seeded with (seed, i), so a ProcessVecEnv with the same seed
+        # plays exactly the same games
+        self.envs = [BunnyEnv([seed, i], **env_kwargs) for i in range(first, first + count)]
+
+    def __len__(self):
+        return len(self.envs)
+
+    def reset(self):
+        return np.stack([env.reset()[0] for env in self.envs])
+
+    def step(self, actions):
+        obs = np.empty((len(self.envs), OBS_SIZE), dtype=np.float32)
+        rewards = np.empty(len(self.envs), dtype=np.float32)
+        terminated = np.empty(len(self.envs), dtype=bool)
+        truncated = np.empty(len(self.envs), dtype=bool)
+        infos = []
+        for i, (env, action) in enumerate(zip(self.envs, actions)):
+            o, rewards[i], terminated[i], truncated[i], info = env.step(action)
+            if terminated[i] or truncated[i]:
+                info["final_obs"] = o
+                o = env.reset()[0]
+            obs[i] = o
+            infos.append(info)
+        return obs, rewards, terminated, truncated, infos
+
+    def close(self):
+        pass
+
+
+def _worker(conn, count: int, seed: int, first: int, env_kwargs: dict):
+    envs = VecBunnyEnv(count, seed, first, **env_kwargs)
+    while True:
+        cmd, data = conn.recv()
+        if cmd == "reset":
+            conn.send(envs.reset())
+        elif cmd == "step":
+            conn.send(envs.step(data))
+        else:
+            break
+    conn.close()
+
+
+class ProcessVecEnv:
+    """VecBunnyEnv split over worker processes, one slice of envs each.
+
+    Same API as VecBunnyEnv. All workers step in parallel; the results are
+    joined in env order.
+    """
+
+    def __init__(self, count: int, workers=None, seed: int = 0, **env_kwargs):
+        workers = max(1, min(count, workers or mp.cpu_count()))
+        sizes = [count // workers + (i < count % workers) for i in range(workers)]
+        ctx = mp.get_context("spawn")  # a fresh pygame per worker
+        self.sizes = sizes
+        self.conns = []
+        self.procs = []
+        first = 0
+        for size in sizes:
+            parent, child = ctx.Pipe()
+            proc = ctx.Process(target=_worker, args=(child, size, seed, first, env_kwargs), daemon=True)
+            first += size
+            proc.start()
+            child.close()
+            self.conns.append(parent)
+            self.procs.append(proc)
+
+    def __len__(self):
+        return sum(self.sizes)
+
+    def reset(self):
+        for conn in self.conns:
+            conn.send(("reset", None))
+        return np.concatenate([conn.recv() for conn in self.conns])
+
+    def step(self, actions):
+        start = 0
+        for conn, size in zip(self.conns, self.sizes):
+            conn.send(("step", list(actions[start:start + size])))
+            start += size
+        results = [conn.recv() for conn in self.conns]
+        obs, rewards, terminated, truncated = (np.concatenate([r[k] for r in results]) for k in range(4))
+        infos = [info for r in results for info in r[4]]
+        return obs, rewards, terminated, truncated, infos
+
+    def close(self):
+        for conn in self.conns:
+            try:
+                conn.send(("close", None))
+            except (BrokenPipeError, OSError):
+                pass
+        for proc in self.procs:
+            proc.join(timeout=5)
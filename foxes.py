@@ -0,0 +1,137 @@
+import random
+import numpy as np
+from pathfinding import a_star, blocked_cells
+import settings
+from settings import BLOCK_SIZE
+from world import move_with_collision
+
+# Only animation speed (not fox movement)
+FOX_ANIM_DELAY = 0.12  # seconds per frame (bigger = slower)
+
+
+def nav_blocked(room) -> set:
+    # Blocked A* cells are cached on the room the first time a fox needs them.
+    blocked = room.get("nav_blocked")
+    if blocked is None:
+        blocked = blocked_cells(room["blocks"], BLOCK_SIZE)
+        room["nav_blocked"] = blocked
+    return blocked
+
+
+def block_array(room) -> np.ndarray:
+    arr = room.get("block_array")
+    if arr is None or len(arr) != len(room["blocks"]):
+        arr = np.array([tuple(b) for b in room["blocks"]],
+                       dtype=np.int64).reshape(-1, 4)
+        room["block_array"] = arr
+    return arr
+
+
+def update_foxes(room, player, dt: float, frame_count: int, rng=random,
+                 masks=None, shapes=None) -> int:
+    """Advance every fox in the room by one frame.
+
+    Movement, animation and the player-contact test run as array math over
+    all foxes at once; only foxes whose move would touch a block go through
+    move_with_collision. With masks (assets.get_collision_masks) and the
+    room's block shapes, props and the player are hit pixel-accurately, but
+    only for the foxes the rect tests picked out. Returns the index of the
+    first fox touching the player, or -1.
+    """
+    foxes = room["foxes"]
+    n = len(foxes)
+    if n == 0:
+        return -1
+
+    paths = room["fox_paths"]
+    blocked = nav_blocked(room)
+
+    # ---------------- PATH LOOKUP (per fox) ----------------
+    rects = np.empty((n, 4), dtype=np.int64)
+    targets = np.zeros((n, 2), dtype=np.int64)
+    has_path = np.zeros(n, dtype=bool)
+    for i, fox in enumerate(foxes):
+        if len(paths[i]) <= 1 or rng.random() < 0.1:
+            paths[i] = a_star(fox.center, player.center,
+                              room["blocks"], BLOCK_SIZE, blocked)
+        if len(paths[i]) > 1:
+            targets[i] = paths[i][1]
+            has_path[i] = True
+        rects[i] = (fox.x, fox.y, fox.width, fox.height)
+
+    x, y, w, h = rects[:, 0], rects[:, 1], rects[:, 2], rects[:, 3]
+    step = settings.FOX_SPEED * dt
+
+    # ---------------- DIRECTION ----------------
+    # With a path: head for the next waypoint. Without: chase the player directly.
+    dx = np.where(has_path, np.sign(targets[:, 0] - (x + w // 2)) * step,
+                  np.where(x < player.x, step, -step))
+    dy = np.where(has_path, np.sign(targets[:, 1] - (y + h // 2)) * step,
+                  np.where(y < player.y, step, -step))
+
+    directions = np.array(room["fox_directions"], dtype=np.int64)
+    directions = np.where(dx > 0, 1, np.where(dx < 0, -1, directions))
+    room["fox_directions"][:] = directions.tolist()
+
+    # ---------------- MOVEMENT ----------------
+    # int() truncates towards zero, same as move_with_collision.
+    mx = np.trunc(dx).astype(np.int64)
+    my = np.trunc(dy).astype(np.int64)
+    nx, ny = x + mx, y + my
+
+    # Swept box of each move; a fox whose box overlaps no block moves freely.
+    blocks = block_array(room)
+    sx0, sx1 = np.minimum(x, nx), np.maximum(x, nx) + w
+    sy0, sy1 = np.minimum(y, ny), np.maximum(y, ny) + h
+    bx, by = blocks[:, 0], blocks[:, 1]
+    bw, bh = blocks[:, 2], blocks[:, 3]
+    near = ((sx0[:, None] < (bx + bw)[None, :]) & (bx[None, :] < sx1[:, None])
+            & (sy0[:, None] < (by + bh)[None, :]) & (by[None, :] < sy1[:, None])).any(axis=1)
+
+    frames = room["fox_frames"]
+    fox_masks = masks["fox"] if masks else None
+    for i in np.flatnonzero(near).tolist():
+        fox = foxes[i]
+        mask = fox_masks[(frames[i], directions[i])] if fox_masks else None
+        move_with_collision(fox, room["blocks"], dx[i], dy[i], mask, shapes)
+        nx[i], ny[i] = fox.x, fox.y
+    for i in np.flatnonzero(~near).tolist():
+        foxes[i].topleft = (int(nx[i]), int(ny[i]))
+
+    # ---------------- ANIMATION ----------------
+    timers = np.array(room["fox_anim_timer"], dtype=np.float64) + dt
+    frames = np.array(room["fox_frames"], dtype=np.int64)
+    roll = timers >= FOX_ANIM_DELAY
+    timers[roll] = 0.0
+    frames[roll] = (frames[roll] + 1) % frame_count
+    room["fox_anim_timer"][:] = timers.tolist()
+    room["fox_frames"][:] = frames.tolist()
+
+    # ---------------- PLAYER CONTACT ----------------
+    return _first_touching(room, player, nx, ny, w, h, masks)
+
+
+def touching_fox(room, player, masks=None) -> int:
+    """Index of the first fox touching the player without moving any, or -1.
+
+    For a second player in a room whose foxes were already updated this frame.
+    """
+    if not room["foxes"]:
+        return -1
+    rects = np.array([tuple(fox) for fox in room["foxes"]], dtype=np.int64)
+    return _first_touching(room, player, rects[:, 0], rects[:, 1], rects[:, 2], rects[:, 3], masks)
+
+
+def _first_touching(room, player, x, y, w, h, masks) -> int:
+    foxes = room["foxes"]
+    touching = ((x < player.right) & (player.x < x + w)
+                & (y < player.bottom) & (player.y < y + h))
+    fox_masks = masks["fox"] if masks else None
+    for i in np.flatnonzero(touching).tolist():
+        if not masks:
+            return i
+        fox = foxes[i]
+        fox_mask = fox_masks[(room["fox_frames"][i], room["fox_directions"][i])]
+        if fox_mask.overlap(masks["bunny"], (player.x - fox.x, player.y - fox.y)):
+            return i
+    return -1
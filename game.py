@@ -1,573 +1,473 @@
 from bunny import Bunny
-from world import generate_room, move_with_collision, portal_transition, reset_world
-from ui import draw_text_outline, ImageButton, safe_load_png, scale_to_width
+from session import new_session, step_session, current_room, read_keyboard
+from replay import Recorder, recording_path
+from profiler import SessionProfiler, profile_path, game_tag
+from memory import memory_report, format_report, log_line
+from savegame import save_game, load_game, release_save
+from assets import get_fox_images, get_scaled, load_png
+from sfx import SoundPool
+from particles import ParticlePool
+from render import RenderQueue, LAYER_PROPS, LAYER_ITEMS, LAYER_ACTORS, LAYER_EFFECTS
+from music import play_music, stop_music, pause_music, unpause_music, handle_music_event, FADE_MS
+from ui import draw_text_outline, draw_bg, load_font, load_button, ImageButton, wait_events, REDRAW_EVENTS
+from display import get_canvas, get_scale, present
+import settings
 from settings import (
-    WIDTH, HEIGHT, FPS,
+    WIDTH, HEIGHT, FPS, IDLE_TIMEOUT_MS,
     PLAYER_WIDTH, PLAYER_HEIGHT, PLAYER_SPEED,
-    FOX_SPEED, LIVES_START, TARGET_SCORE,
     WHITE, BLACK,
     HIT_FLASH_DURATION, HIT_FLASH_MAX_ALPHA,
     SHAKE_DURATION_FOX, SHAKE_INTENSITY_FOX,
     SHAKE_DURATION_TRAP, SHAKE_INTENSITY_TRAP,
-    INVINCIBILITY_DURATION, KNOCKBACK_PIXELS,
-    DASH_SPEED, DASH_DURATION, DASH_COOLDOWN,
-    SPEED_BOOST_SCORE_1, SPEED_BOOST_MULT_1, CARROT_SIZE
+    CARROT_SIZE
 )
 import pygame
 import random
 import math
 import os
-from heapq import heappush, heappop
-from settings import WIDTH, HEIGHT, BLOCK_SIZE
-
-
-def a_star(start, goal, obstacles, cell_size):
-    def heuristic(a, b):
-        return abs(a[0] - b[0]) + abs(a[1] - b[1])
-
-    def get_neighbors(pos):
-        x, y = pos
-        neighbors = [(x+1, y), (x-1, y), (x, y+1), (x, y-1)]
-        return [
-            n for n in neighbors
-            if 0 <= n[0] < (WIDTH // cell_size)
-            and 0 <= n[1] < (HEIGHT // cell_size)
-            and not any(ob.colliderect(
-                pygame.Rect(n[0]*cell_size, n[1] *
-                            cell_size, cell_size, cell_size)
-            ) for ob in obstacles)
-        ]
-
-    start_cell = (int(start[0] // cell_size), int(start[1] // cell_size))
-    goal_cell = (int(goal[0] // cell_size), int(goal[1] // cell_size))
-
-    frontier = []
-    heappush(frontier, (0, start_cell))
-    came_from = {start_cell: None}
-    cost_so_far = {start_cell: 0}
-
-    while frontier:
-        _, current = heappop(frontier)
-        if current == goal_cell:
-            break
-        for neighbor in get_neighbors(current):
-            new_cost = cost_so_far[current] + 1
-            if neighbor not in cost_so_far or new_cost < cost_so_far[neighbor]:
-                cost_so_far[neighbor] = new_cost
-                priority = new_cost + heuristic(goal_cell, neighbor)
-                heappush(frontier, (priority, neighbor))
-                came_from[neighbor] = current
-
-    if goal_cell not in came_from:
-        return []
-
-    path = []
-    current = goal_cell
-    while current != start_cell:
-        path.append((current[0] * cell_size + cell_size // 2,
-                     current[1] * cell_size + cell_size // 2))
-        current = came_from[current]
-    path.reverse()
-    return path
-
-
-def _knockback(player: pygame.Rect, source_center, blocks, pixels: int):
-    sx, sy = source_center
-    px, py = player.centerx, player.centery
-    vx, vy = (px - sx), (py - sy)
-
-    if vx == 0 and vy == 0:
-        vx = random.choice([-1, 1])
-        vy = random.choice([-1, 1])
-
-    length = math.hypot(vx, vy)
-    nx, ny = vx / length, vy / length
-    move_with_collision(player, blocks, nx * pixels, ny * pixels)
-
-
-def run_game(WIN: pygame.Surface, FONT: pygame.font.Font, END_FONT: pygame.font.Font) -> str:
-    clock = pygame.time.Clock()
-
-    suspense_music = "sound/suspense.mp3"
-
-    # ---------------- GAME MUSIC ----------------
-    try:
-        if not pygame.mixer.get_init():
-            pygame.mixer.init()
 
-        pygame.mixer.music.load("sound/jazz.mp3")
-        pygame.mixer.music.set_volume(0.5)
-        pygame.mixer.music.play(-1)  # loop forever
-    except Exception as e:
-        print("[AUDIO] Game music failed:", e)
-    # --------------------------------------------
-
-    # ✅ ONLY animation speed (not fox movement)
-    FOX_ANIM_DELAY = 0.12  # seconds per frame (bigger = slower)
 
+def load_game_assets() -> dict:
     # Foxes
-    fox_files = sorted(os.listdir("images/fox"))
-    fox_images = [pygame.image.load(os.path.join(
-        "images/fox", f)).convert_alpha() for f in fox_files]
-    scale_factor = 2
-    fox_images = [
-        pygame.transform.scale(
-            img, (int(img.get_width() * scale_factor), int(img.get_height() * scale_factor)))
-        for img in fox_images
-    ]
+    fox_images = get_fox_images()
 
     # Carrots
-    carrot_img = pygame.image.load("images/carrot.png").convert_alpha()
-    carrot_img = pygame.transform.scale(carrot_img, (120, 100))
+    carrot_img = load_png("images/carrot.png", "120x100", lambda img: pygame.transform.scale(img, (120, 100)))
 
     # Traps
-    trap_img = pygame.image.load("images/trap.png").convert_alpha()
-    trap_img = pygame.transform.scale(trap_img, (35, 35))
+    trap_img = load_png("images/trap.png", "35x35", lambda img: pygame.transform.scale(img, (35, 35)))
 
-    # ---------------- SOUND EFFECTS ----------------
-    try:
-        if not pygame.mixer.get_init():
-            pygame.mixer.init()
+    # Foxes walking left, flipped once here instead of every frame
+    fox_images_left = [pygame.transform.flip(img, True, False) for img in fox_images]
 
-        carrot_sound = pygame.mixer.Sound("sound/chew.mp3")
-        carrot_sound.set_volume(0.7)
-
-        beartrap_sound = pygame.mixer.Sound("sound/beartrap.mp3")
-        beartrap_sound.set_volume(0.8)
-
-        foxkill_sound = pygame.mixer.Sound("sound/foxkill.mp3")
-        foxkill_sound.set_volume(0.8)
-
-        portal_sound = pygame.mixer.Sound("sound/portal.mp3")
-        portal_sound.set_volume(0.9)
+    # Back-to-menu button
+    back_img = load_button("images/back_button.png", 260)
+
+    return {"fox_images": fox_images, "fox_images_left": fox_images_left,
+            "carrot_img": carrot_img, "trap_img": trap_img, "back_img": back_img}
+
+
+def make_bunny(player: pygame.Rect) -> Bunny:
+    return Bunny(player.center, white_square_size=(
+        int(PLAYER_WIDTH * 1.5 * 1.0), int(PLAYER_HEIGHT * 1.0)))
+
+
+def _view(rect: pygame.Rect, scale: float, ox: float, oy: float) -> pygame.Rect:
+    # World rect -> canvas rect
+    return pygame.Rect(round(rect.x * scale + ox), round(rect.y * scale + oy),
+                       round(rect.width * scale), round(rect.height * scale))
+
+
+def draw_world(WIN: pygame.Surface, room, session, assets, bunny: Bunny,
+               pulse_timer: float, shake=(0, 0), queue=None):
+    # Sprites go through a RenderQueue; pass one in to add more (particles)
+    # and flush it yourself, otherwise they are drawn before returning.
+    # Positions are world coordinates, scaled to the canvas (display.py).
+    scale = get_scale()
+    cx, cy = shake[0] * scale, shake[1] * scale
+
+    if room.get("bg_image"):
+        draw_bg(WIN, room["bg_image"])
+    else:
+        WIN.fill(room["color"])
+
+    # DRAW PORTAL GLOW (Keep this so portals are visible!)
+    pulse_val = (math.sin(pulse_timer) + 1) / 2
+    glow_color = (0, 200 + int(55 * pulse_val),
+                  200 + int(55 * pulse_val))
+
+    for p_rect in room["portals"].values():
+        glow_rect = p_rect.inflate(
+            int(10 * pulse_val), int(10 * pulse_val))
+        pygame.draw.ellipse(WIN, WHITE, _view(glow_rect, scale, cx, cy))
+        pygame.draw.ellipse(WIN, glow_color, _view(p_rect, scale, cx, cy))
+
+    for block in room["blocks"]:
+        if block.width == WIDTH or block.height == HEIGHT:
+            b = _view(block, scale, cx, cy)
+            pygame.draw.rect(WIN, (30, 30, 30), b)
+        elif room["theme"] == "trees":
+            pygame.draw.rect(WIN, (80, 50, 20),
+                             (b.centerx - round(10 * scale), b.centery, round(20 * scale), round(40 * scale)))
+            pygame.draw.circle(WIN, (20, 100, 20),
+                               (b.centerx, b.centery), round(40 * scale))
+        elif room["theme"] == "rocks":
+            pygame.draw.rect(WIN, (100, 100, 100), b, border_radius=10)
+        # other blocks belong to props, which are drawn as images
+
+    own_queue = queue is None
+    if own_queue:
+        queue = RenderQueue()
+    queue_sprites(queue, room, session, assets, bunny, shake)
+    if own_queue:
+        queue.flush(WIN)
+
+
+def queue_sprites(queue: RenderQueue, room, session, assets, bunny: Bunny, shake=(0, 0)):
+    # Obstacles, traps, carrots, the bunny and the foxes, as render queue
+    # entries. Images come from the per-size cache in assets.get_scaled.
+    scale = get_scale()
+    cx, cy = shake[0] * scale, shake[1] * scale
+
+    props = []
+    for ob in room.get("obstacles", []):
+        r = ob["draw_rect"]
+        props.append((get_scaled(ob["img"], scale), (round(r.x * scale + cx), round(r.y * scale + cy))))
+    queue.extend(LAYER_PROPS, props)
+
+    trap_img = get_scaled(assets["trap_img"], scale)
+    tx, ty = cx - trap_img.get_width() // 2, cy - trap_img.get_height() // 2
+    queue.extend(LAYER_ITEMS, [(trap_img, (round(trap.centerx * scale + tx), round(trap.centery * scale + ty)))
+                               for trap in room.get("traps", [])])
+
+    carrot_img = get_scaled(assets["carrot_img"], scale)
+    bob = math.sin(pygame.time.get_ticks() * 0.005) * 5 * scale
+    kx, ky = cx - carrot_img.get_width() // 2, cy - carrot_img.get_height() // 2 + bob
+    queue.extend(LAYER_ITEMS, [(carrot_img, (round(carrot.centerx * scale + kx), round(carrot.centery * scale + ky)))
+                               for carrot in room["carrots"]])
+
+    blink_hide = False
+    if session["invuln_timer"] > 0:
+        blink_hide = (pygame.time.get_ticks() // 100) % 2 == 0
+
+    if not blink_hide:
+        img = get_scaled(bunny.get_sprite()[0], scale)
+        x, y = bunny.get_pos()
+        queue.add(img, (round(x * scale + cx) - img.get_width() // 2,
+                        round(y * scale + cy) - img.get_height() // 2), LAYER_ACTORS)
+
+    right = [get_scaled(img, scale) for img in assets["fox_images"]]
+    left = [get_scaled(img, scale) for img in assets["fox_images_left"]]
+    for fox, frame, direction in zip(room["foxes"], room["fox_frames"], room["fox_directions"]):
+        img = left[frame] if direction == -1 else right[frame]
+        w, h = img.get_size()
+        queue.add(img, (round(fox.centerx * scale + cx) - w // 2, round(fox.centery * scale + cy) - h // 2),
+                  LAYER_ACTORS)
+
+
+def draw_overlays(WIN: pygame.Surface, session, hit_flash_timer: float):
+    if hit_flash_timer > 0:
+        strength = hit_flash_timer / HIT_FLASH_DURATION
+        alpha = int(HIT_FLASH_MAX_ALPHA * strength)
+        flash = pygame.Surface(WIN.get_size(), pygame.SRCALPHA)
+        flash.fill((255, 0, 0, alpha))
+        WIN.blit(flash, (0, 0))
+
+    if session["transition_alpha"] > 0:
+        o = pygame.Surface(WIN.get_size())
+        o.set_alpha(session["transition_alpha"])
+        o.fill((0, 0, 0))
+        WIN.blit(o, (0, 0))
+
+
+def draw_hud(WIN: pygame.Surface, FONT: pygame.font.Font, room, session):
+    ui = f"Lives: {session['lives']} | Score: {session['score']}/{settings.TARGET_SCORE} | Location: {room['name']}"
+    draw_text_outline(WIN, ui, FONT, WHITE, BLACK,
+                      pos=(30, 30), outline_thickness=2)
+
+    if session["speed_boost"] > 1.0:
+        draw_text_outline(WIN, "SNEAKERS ACTIVE", FONT, (0, 255, 0), BLACK, pos=(
+            30, 60), outline_thickness=2)
+
+    dash_cooldown = session["dash_cooldown"]
+    if dash_cooldown <= 0:
+        draw_text_outline(WIN, "DASH READY (SPACE)", FONT, (255, 255, 255), BLACK, pos=(
+            30, 90), outline_thickness=2)
+    else:
+        draw_text_outline(WIN, f"DASH COOLDOWN: {dash_cooldown:.1f}s", FONT, (
+            200, 200, 200), BLACK, pos=(30, 90), outline_thickness=2)
+
+
+def run_game(record_dir=None, save_path=None, capture=None, profile_dir=None,
+             profile_mode="sample", memory_log=None) -> str:
+    # Draws on display.get_canvas(), fetched every frame since a window
+    # resize replaces it.
+    # record_dir: when set, every session's input is saved there for replay.py
+    # save_path: leaving a running game saves it there, and the next
+    # run_game resumes from it
+    # capture: a capture.FrameCapture that gets every game frame shown
+    # profile_dir: when set, every session is profiled into it (profiler.py)
+    # memory_log: seconds between memory log lines (memory.py); F9 always
+    # prints the full memory report
+    # With profile_dir or memory_log, leaving also prints the sound, particle
+    # and render queue counters
+    clock = pygame.time.Clock()
 
-        win_sound = pygame.mixer.Sound("sound/win.mp3")
-        win_sound.set_volume(0.9)
+    assets = load_game_assets()
 
+    # ---------------- SOUND EFFECTS ----------------
+    # Reserved channels with priorities: fox hit > trap > carrot > portal
+    sounds = SoundPool()
+    # ---------------------------------------------
 
-    except Exception as e:
-        print("[AUDIO] Carrot sound failed:", e)
-        carrot_sound = None
-        beartrap_sound = None
-        foxkill_sound = None
-        portal_sound = None
-        win_sound = None
+    # ---------------- PARTICLES ----------------
+    # One fixed-size pool for every effect, drawn with a single blits call
+    particles = ParticlePool()
+    # ---------------------------------------------
 
+    # ---------------- RENDER QUEUE ----------------
+    # Sprites of all kinds, drawn with one Surface.blits per layer
+    queue = RenderQueue()
     # ---------------------------------------------
 
     # Back-to-menu button
-    BACK_IMG = scale_to_width(safe_load_png(
-        "images/back_button.png"), 260, smooth=False)
-    back_btn = ImageButton(BACK_IMG, (WIDTH // 2, HEIGHT // 2 + 200))
-
-    while True:
-        reset_world()
-
-        player = pygame.Rect(WIDTH // 2, HEIGHT // 2,
-                             PLAYER_WIDTH, PLAYER_HEIGHT)
-        bunny = Bunny(player.center, white_square_size=(
-            int(PLAYER_WIDTH * 1.5 * 1.0), int(PLAYER_HEIGHT * 1.0)))
-
-        current_coords = (0, 0)
-        score = 0
-        lives = LIVES_START
-        state = "PLAYING"
-        pulse_timer = 0.0
-
-        # effects
-        hit_flash_timer = 0.0
-        shake_timer = 0.0
-        shake_intensity = 0
-
-        # trap + invincibility
-        trap_cooldown = 0.0
-        invuln_timer = 0.0
-
-        # dash + speed boost
-        dash_timer = 0.0
-        dash_cooldown = 0.0
-        speed_boost = 1.0
-
-        # room transition fade
-        transition_alpha = 0
-        is_transitioning = False
-        transition_phase = "out"
-        pending_portal_side = None
-
+    back_btn = ImageButton(assets["back_img"], (WIDTH // 2, HEIGHT // 2 + 200))
+
+    def leave_game(session):
+        # Keep a running game so the next run_game can resume it.
+        if save_path and session["state"] == "PLAYING":
+            try:
+                save_game(save_path, session)
+                print(f"[SAVE] Saved game to {save_path}")
+            except Exception as e:
+                print(f"[SAVE] Saving failed: {e}")
+
+    def forget_save():
+        release_save()  # Windows cannot delete a file that is still mapped
+        if save_path and os.path.exists(save_path):
+            try:
+                os.remove(save_path)
+            except Exception as e:
+                print(f"[SAVE] Removing the save failed: {e}")
+
+    recorder = None  # None = first session of this run_game, False = not recording
+    profiler = None
+    next_memory_log = 0
+    try:
         while True:
-            dt = clock.tick(FPS) / 1000.0
-            dt_ms = dt * 1000.0
-
-            if state == "PLAYING" and not is_transitioning:
-                pulse_timer += dt * 5.0
-
-            room = generate_room(current_coords)
-
-            # timers decay
-            if hit_flash_timer > 0:
-                hit_flash_timer = max(0.0, hit_flash_timer - dt)
-            if shake_timer > 0:
-                shake_timer = max(0.0, shake_timer - dt)
-            if trap_cooldown > 0:
-                trap_cooldown = max(0.0, trap_cooldown - dt)
-            if invuln_timer > 0:
-                invuln_timer = max(0.0, invuln_timer - dt)
-            if dash_timer > 0:
-                dash_timer = max(0.0, dash_timer - dt)
-            if dash_cooldown > 0:
-                dash_cooldown = max(0.0, dash_cooldown - dt)
-
-            # ---------------- EVENTS ----------------
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.mixer.music.stop()
-                    if win_sound:
-                        win_sound.stop()
-                    return "quit"
-
-                if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
-                    if not is_transitioning:
-                        if state == "PLAYING":
-                            state = "PAUSED"
-                            pygame.mixer.music.pause()
-                            if win_sound:
-                                win_sound.stop()
-                        elif state == "PAUSED":
-                            state = "PLAYING"
-                            pygame.mixer.music.unpause()
-
-                if state == "PAUSED" and event.type == pygame.KEYDOWN and event.key in (pygame.K_RETURN, pygame.K_KP_ENTER):
-                    state = "RESTART"
-                    break
-
-                if state == "PAUSED" and back_btn.clicked(event):
-                    pygame.mixer.music.stop()
-                    if win_sound:
-                        win_sound.stop()
-                    return "menu"
-
-            if state == "RESTART":
-                break
-
-            # ---------------- UPDATE ----------------
-            ix = iy = 0.0
-
-            if state == "PLAYING" and not is_transitioning:
-                keys = pygame.key.get_pressed()
-
-                if keys[pygame.K_a] or keys[pygame.K_LEFT]:
-                    ix = -1.0
-                if keys[pygame.K_d] or keys[pygame.K_RIGHT]:
-                    ix = 1.0
-                if keys[pygame.K_w] or keys[pygame.K_UP]:
-                    iy = -1.0
-                if keys[pygame.K_s] or keys[pygame.K_DOWN]:
-                    iy = 1.0
-
-                if keys[pygame.K_SPACE] and dash_cooldown <= 0 and (ix != 0.0 or iy != 0.0):
-                    dash_timer = DASH_DURATION
-                    dash_cooldown = DASH_COOLDOWN
-
-                speed_boost = SPEED_BOOST_MULT_1 if score >= SPEED_BOOST_SCORE_1 else 1.0
-
-                final_speed = (DASH_SPEED if dash_timer >
-                               0 else PLAYER_SPEED) * speed_boost
-                move_with_collision(
-                    player, room["blocks"], ix * final_speed * dt, iy * final_speed * dt)
-
-                for side, p_rect in room["portals"].items():
-                    if player.colliderect(p_rect):
-                        if portal_sound:
-                            portal_sound.play()   # 🔊 PORTAL SOUND
-                        is_transitioning = True
-                        transition_phase = "out"
-                        transition_alpha = 0
-                        pending_portal_side = side
+            if recorder:
+                recorder.close()
+            if profiler:
+                profiler.close()
+            if save_path and os.path.exists(save_path) and recorder is None:
+                try:
+                    session = load_game(save_path)
+                    print(f"[SAVE] Resumed {save_path}")
+                except Exception as e:
+                    print(f"[SAVE] Could not resume {save_path}: {e}")
+                    session = new_session(fox_frame_count=len(assets["fox_images"]))
+                # A resumed game cannot be replayed from its seed, so it is not recorded.
+                recorder = False
+            else:
+                session = new_session(fox_frame_count=len(assets["fox_images"]))
+                recorder = Recorder(recording_path(record_dir, session["seed"]), session) if record_dir else False
+            if profile_dir:
+                profiler = SessionProfiler(profile_path(profile_dir, session["seed"]), profile_mode)
+            player = session["player"]
+            bunny = make_bunny(player)
+            particles.clear()
+            play_music("game")
+
+            paused = False
+            pause_drawn = False  # the pause screen is static; draw it once
+            restart = False
+            pulse_timer = 0.0
+
+            # effects
+            hit_flash_timer = 0.0
+            shake_timer = 0.0
+            shake_intensity = 0
+
+            while True:
+                dt_ms = min(clock.tick(FPS), 65535)
+                dt = dt_ms / 1000.0
+                if profiler:
+                    profiler.set_tag(game_tag(session, paused))
+
+                if session["state"] == "PLAYING" and not paused and not session["is_transitioning"]:
+                    pulse_timer += dt * 5.0
+
+                if memory_log and pygame.time.get_ticks() >= next_memory_log:
+                    next_memory_log = pygame.time.get_ticks() + memory_log * 1000
+                    print(log_line(memory_report(session, {"game": assets, "bunny": bunny})))
+
+                # timers decay
+                if hit_flash_timer > 0:
+                    hit_flash_timer = max(0.0, hit_flash_timer - dt)
+                if shake_timer > 0:
+                    shake_timer = max(0.0, shake_timer - dt)
+
+                # ---------------- EVENTS ----------------
+                # While the pause screen is up, sleep until input arrives.
+                resumed = False
+                pending = wait_events(IDLE_TIMEOUT_MS) if paused and pause_drawn else pygame.event.get()
+                for event in pending:
+                    if event.type in REDRAW_EVENTS:
+                        pause_drawn = False
+
+                    handle_music_event(event)
+
+                    if event.type == pygame.QUIT:
+                        stop_music()
+                        sounds.stop("win")
+                        leave_game(session)
+                        return "quit"
+
+                    if event.type == pygame.KEYDOWN and event.key == pygame.K_F9:
+                        print(format_report(memory_report(session, {"game": assets, "bunny": bunny})))
+
+                    if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
+                        if not session["is_transitioning"] and session["state"] == "PLAYING":
+                            if not paused:
+                                paused = True
+                                pause_drawn = False
+                                pause_music()
+                                sounds.stop("win")
+                            else:
+                                paused = False
+                                resumed = True
+                                unpause_music()
+                                clock.tick()  # the time spent paused is not a game frame
+
+                    if paused and event.type == pygame.KEYDOWN and event.key in (pygame.K_RETURN, pygame.K_KP_ENTER):
+                        restart = True
                         break
 
-                # TRAPS
-                if invuln_timer <= 0 and trap_cooldown <= 0:
-                    for trap in room.get("traps", []):
-                        if player.colliderect(trap):
-
-                            if beartrap_sound:
-                                beartrap_sound.play()   # 🔊 BEAR TRAP SOUND
-
-                            lives -= 1
-
-                            hit_flash_timer = max(
-                                hit_flash_timer, HIT_FLASH_DURATION)
-                            shake_timer = max(shake_timer, SHAKE_DURATION_TRAP)
-                            shake_intensity = max(
-                                shake_intensity, SHAKE_INTENSITY_TRAP)
-
-                            invuln_timer = INVINCIBILITY_DURATION
-                            _knockback(player, trap.center,
-                                       room["blocks"], KNOCKBACK_PIXELS)
-
-                            trap_cooldown = 0.6
-
-                            if lives <= 0:
-                                state = "LOST"
-                                pygame.mixer.music.stop()
-                                try:
-                                    pygame.mixer.music.load(suspense_music)
-                                    pygame.mixer.music.play(-1)
-                                except Exception as e:
-                                    print("[AUDIO] Suspense music failed:", e)
-                            break
-
-                # fox AI
-                for i, fox in enumerate(room["foxes"]):
-                    if len(room["fox_paths"][i]) <= 1 or random.random() < 0.1:
-                        room["fox_paths"][i] = a_star(
-                            fox.center, player.center, room["blocks"], BLOCK_SIZE)
-
-                    if room["fox_paths"][i] and len(room["fox_paths"][i]) > 1:
-                        next_pos = room["fox_paths"][i][1]
-                        dx = (next_pos[0] - fox.centerx) / max(1,
-                                                               abs(next_pos[0] - fox.centerx)) * FOX_SPEED * dt
-                        dy = (next_pos[1] - fox.centery) / max(1,
-                                                               abs(next_pos[1] - fox.centery)) * FOX_SPEED * dt
-                        move_with_collision(fox, room["blocks"], dx, dy)
-                        direction = 1 if dx > 0 else (-1 if dx <
-                                                      0 else room["fox_directions"][i])
-                        room["fox_directions"][i] = direction
-                    else:
-                        fdx = (FOX_SPEED *
-                               dt) if fox.x < player.x else (-FOX_SPEED * dt)
-                        fdy = (FOX_SPEED *
-                               dt) if fox.y < player.y else (-FOX_SPEED * dt)
-                        move_with_collision(fox, room["blocks"], fdx, fdy)
-                        direction = 1 if fdx > 0 else (-1 if fdx <
-                                                       0 else room["fox_directions"][i])
-                        room["fox_directions"][i] = direction
-
-                    # ✅ SLOW FOX IMAGE SWITCHING (NOT SPEED)
-                    room["fox_anim_timer"][i] += dt
-                    if room["fox_anim_timer"][i] >= FOX_ANIM_DELAY:
-                        room["fox_anim_timer"][i] = 0.0
-                        room["fox_frames"][i] = (
-                            room["fox_frames"][i] + 1) % len(fox_images)
-
-                    if invuln_timer <= 0 and fox.colliderect(player):
-
-                        if foxkill_sound:
-                            foxkill_sound.play()   # 🔊 FOX HIT SOUND
-
-                        lives -= 1
+                    if paused and back_btn.clicked(event):
+                        # the menu fades its own music in over this one
+                        sounds.stop("win")
+                        leave_game(session)
+                        return "menu"
 
+                if restart:
+                    forget_save()
+                    break
+
+                if paused and pause_drawn:
+                    continue
+
+                # ---------------- UPDATE ----------------
+                # dt of the frame that unpauses is the pause wait; step from the next one
+                events = []
+                if not paused and not resumed and session["state"] == "PLAYING":
+                    buttons = read_keyboard()
+                    if recorder:
+                        recorder.add(buttons, dt_ms)
+                    events = step_session(session, buttons, dt)
+
+                for ev in events:
+                    if ev == "portal":
+                        sounds.play("portal")   # 🔊 PORTAL SOUND
+                        particles.emit("portal", player.center, 80)
+                    elif ev == "trap":
+                        sounds.play("trap")   # 🔊 BEAR TRAP SOUND
+                        particles.emit("trap", session["event_at"]["trap"].pop(0), 60,
+                                       direction=-math.pi / 2, spread=math.pi)
+                        hit_flash_timer = max(hit_flash_timer, HIT_FLASH_DURATION)
+                        shake_timer = max(shake_timer, SHAKE_DURATION_TRAP)
+                        shake_intensity = max(shake_intensity, SHAKE_INTENSITY_TRAP)
+                    elif ev == "fox_hit":
+                        sounds.play("fox_hit")   # 🔊 FOX HIT SOUND
                         hit_flash_timer = HIT_FLASH_DURATION
                         shake_timer = SHAKE_DURATION_FOX
                         shake_intensity = SHAKE_INTENSITY_FOX
-
-                        invuln_timer = INVINCIBILITY_DURATION
-                        _knockback(player, fox.center,
-                                   room["blocks"], KNOCKBACK_PIXELS)
-
-                        room["foxes"].append(
-                            pygame.Rect(
-                                random.randint(100, 300),
-                                random.randint(100, 300),
-                                fox.width,
-                                fox.height
-                            )
-                        )
-                        room["fox_frames"].append(0)
-                        room["fox_directions"].append(1)
-                        room["fox_paths"].append([])
-                        room["fox_anim_timer"].append(0.0)  # ✅ NEW
-
-                        if lives <= 0:
-                            state = "LOST"
-                            pygame.mixer.music.stop()
-                            try:
-                                pygame.mixer.music.load(suspense_music)
-                                pygame.mixer.music.play(-1)
-                            except Exception as e:
-                                print("[AUDIO] Suspense music failed:", e)
+                    elif ev == "carrot":
+                        sounds.play("carrot")   # 🔊 PLAY SOUND HERE
+                        particles.emit("carrot", session["event_at"]["carrot"].pop(0), 40,
+                                       direction=-math.pi / 2, spread=math.pi * 0.8)
+                    elif ev == "won":
+                        forget_save()
+                        stop_music(FADE_MS)
+                        sounds.play("win")
+                    elif ev == "lost":
+                        forget_save()
+                        play_music("suspense")  # fades over from the game music
+
+                room = current_room(session)
+
+                ix, iy = session["move"] if not paused else (0.0, 0.0)
+                bunny.set_velocity((ix * PLAYER_SPEED, iy * PLAYER_SPEED))
+                bunny.update(dt_ms)
+                bunny.set_pos(player.center)
+
+                if not paused:
+                    if session["dash_timer"] > 0 and (ix or iy):
+                        # trail streams out behind the bunny
+                        particles.emit("dash", player.center, 4, direction=math.atan2(-iy, -ix), spread=1.0)
+                    particles.update(dt)
+
+                # ---------------- SHAKE OFFSET ----------------
+                cx = cy = 0
+                if shake_timer > 0 and shake_intensity > 0:
+                    cx = random.randint(-shake_intensity, shake_intensity)
+                    cy = random.randint(-shake_intensity, shake_intensity)
+
+                # ---------------- DRAW ----------------
+                WIN = get_canvas()
+                FONT, END_FONT = load_font(30), load_font(80)
+                draw_world(WIN, room, session, assets, bunny, pulse_timer, (cx, cy), queue)
+                scale = get_scale()
+                queue.extend(LAYER_EFFECTS, particles.get_blits((cx * scale, cy * scale), scale))
+                queue.flush(WIN)
+                draw_overlays(WIN, session, hit_flash_timer)
+                draw_hud(WIN, FONT, room, session)
+
+                if paused:
+                    overlay = pygame.Surface(WIN.get_size())
+                    overlay.set_alpha(180)
+                    overlay.fill((0, 0, 0))
+                    WIN.blit(overlay, (0, 0))
+
+                    draw_text_outline(WIN, "PAUSED", END_FONT, WHITE, BLACK,
+                                      center=(WIDTH // 2, HEIGHT // 2 - 60), outline_thickness=4)
+                    draw_text_outline(WIN, "ESC = Resume", FONT, WHITE, BLACK,
+                                      center=(WIDTH // 2, HEIGHT // 2 + 20), outline_thickness=2)
+                    draw_text_outline(WIN, "ENTER = Reset game", FONT, WHITE, BLACK,
+                                      center=(WIDTH // 2, HEIGHT // 2 + 60), outline_thickness=2)
+
+                    back_btn.draw(WIN)
+                    present()
+                    pause_drawn = True
+                    continue
+
+                if session["state"] in ("WON", "LOST"):
+                    overlay = pygame.Surface(WIN.get_size())
+                    overlay.set_alpha(200)
+                    overlay.fill((0, 0, 0))
+                    WIN.blit(overlay, (0, 0))
+
+                    msg = "YOU LOST LIL BRO" if session["state"] == "LOST" else "YOU WON CHAMP"
+                    draw_text_outline(WIN, msg, END_FONT, WHITE, BLACK,
+                                      center=(WIDTH // 2, HEIGHT // 2), outline_thickness=4)
+                    draw_text_outline(WIN, "Press ENTER to restart", FONT, WHITE, BLACK,
+                                      center=(WIDTH // 2, HEIGHT // 2 + 90), outline_thickness=2)
+
+                    back_btn.draw(WIN)
+                    end_screen = WIN.copy()
+                    present()
+
+                    # Nothing moves on the end screen: sleep until input arrives.
+                    if profiler:
+                        profiler.set_tag(session["state"])
+                    while True:
+                        for event in wait_events(IDLE_TIMEOUT_MS):
+                            handle_music_event(event)
+                            if event.type in REDRAW_EVENTS:
+                                get_canvas()  # picks up a new window size
+                                present(end_screen)
+                            if event.type == pygame.QUIT:
+                                stop_music()
+                                return "quit"
+                            if back_btn.clicked(event):
+                                return "menu"
+                            if event.type == pygame.KEYDOWN and event.key in (pygame.K_RETURN, pygame.K_KP_ENTER):
+                                break
+                        else:
+                            continue
                         break
 
-                # carrots
-                for carrot in room["carrots"][:]:
-                    if player.colliderect(carrot):
-                        room["carrots"].remove(carrot)
-
-                        if carrot_sound:
-                            carrot_sound.play()   # 🔊 PLAY SOUND HERE
-
-                        score += 1
-                        if score >= TARGET_SCORE:
-                            state = "WON"
-                            pygame.mixer.music.stop()
-                            if win_sound:
-                                win_sound.play()
-
-            bunny.set_velocity((ix * PLAYER_SPEED, iy * PLAYER_SPEED))
-            bunny.update(dt_ms)
-            bunny.set_pos(player.center)
-
-            # ---------------- TRANSITION UPDATE ----------------
-            if is_transitioning and state == "PLAYING":
-                if transition_phase == "out":
-                    transition_alpha += 15
-                    if transition_alpha >= 255:
-                        transition_alpha = 255
-                        if pending_portal_side is not None:
-                            current_coords = portal_transition(
-                                pending_portal_side, current_coords, player)
-                        pending_portal_side = None
-                        transition_phase = "in"
-                else:
-                    transition_alpha -= 15
-                    if transition_alpha <= 0:
-                        transition_alpha = 0
-                        is_transitioning = False
-
-            # ---------------- SHAKE OFFSET ----------------
-            cx = cy = 0
-            if shake_timer > 0 and shake_intensity > 0:
-                cx = random.randint(-shake_intensity, shake_intensity)
-                cy = random.randint(-shake_intensity, shake_intensity)
-
-            # ---------------- DRAW ----------------
-            if room.get("bg_image"):
-                WIN.blit(room["bg_image"], (0, 0))
-            else:
-                WIN.fill(room["color"])
-
-            # DRAW PORTAL GLOW (Keep this so portals are visible!)
-            pulse_val = (math.sin(pulse_timer) + 1) / 2
-            glow_color = (0, 200 + int(55 * pulse_val),
-                          200 + int(55 * pulse_val))
-
-            for p_rect in room["portals"].values():
-                glow_rect = p_rect.inflate(
-                    int(10 * pulse_val), int(10 * pulse_val)).move(cx, cy)
-                pygame.draw.ellipse(WIN, WHITE, glow_rect)
-                pygame.draw.ellipse(WIN, glow_color, p_rect.move(cx, cy))
-
-            for block in room["blocks"]:
-                 if block.width == WIDTH or block.height == HEIGHT:
-                     b = block.move(cx, cy)
-                     pygame.draw.rect(WIN, (30, 30, 30), b)
-                 elif room["theme"] == "trees":
-                     pygame.draw.rect(WIN, (80, 50, 20),
-                                      (b.centerx - 10, b.centery, 20, 40))
-                     pygame.draw.circle(WIN, (20, 100, 20),
-                                        (b.centerx, b.centery), 40)
-                 elif room["theme"] == "rocks":
-                     pygame.draw.rect(WIN, (100, 100, 100), b, border_radius=10)
-                 else:
-                     pygame.draw.rect(WIN, (30, 30, 30), b)
-
-            for ob in room.get("obstacles", []):
-                WIN.blit(ob["img"], ob["draw_rect"].move(cx, cy))
-
-            for trap in room.get("traps", []):
-                rect = trap_img.get_rect(
-                    center=(trap.centerx + cx, trap.centery + cy))
-                WIN.blit(trap_img, rect)
-
-            for carrot in room["carrots"]:
-                offset = math.sin(pygame.time.get_ticks() * 0.005) * 5
-                rect = carrot_img.get_rect(
-                    center=(carrot.centerx + cx, carrot.centery + cy + offset))
-                WIN.blit(carrot_img, rect)
-
-            blink_hide = False
-            if invuln_timer > 0:
-                blink_hide = (pygame.time.get_ticks() // 100) % 2 == 0
-
-            if not blink_hide:
-                base_center = player.center
-                bunny.set_pos((base_center[0] + cx, base_center[1] + cy))
-                bunny.draw(WIN)
-                bunny.set_pos(base_center)
-
-            for i, fox in enumerate(room["foxes"]):
-                img = fox_images[room["fox_frames"][i]]
-                if room["fox_directions"][i] == -1:
-                    img = pygame.transform.flip(img, True, False)
-                rect = img.get_rect(
-                    center=(fox.centerx + cx, fox.centery + cy))
-                WIN.blit(img, rect)
-
-            if hit_flash_timer > 0:
-                strength = hit_flash_timer / HIT_FLASH_DURATION
-                alpha = int(HIT_FLASH_MAX_ALPHA * strength)
-                flash = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-                flash.fill((255, 0, 0, alpha))
-                WIN.blit(flash, (0, 0))
-
-            if transition_alpha > 0:
-                o = pygame.Surface((WIDTH, HEIGHT))
-                o.set_alpha(transition_alpha)
-                o.fill((0, 0, 0))
-                WIN.blit(o, (0, 0))
-
-            ui = f"Lives: {lives} | Score: {score}/{TARGET_SCORE} | Location: {room['name']}"
-            draw_text_outline(WIN, ui, FONT, WHITE, BLACK,
-                              pos=(30, 30), outline_thickness=2)
-
-            if speed_boost > 1.0:
-                draw_text_outline(WIN, "SNEAKERS ACTIVE", FONT, (0, 255, 0), BLACK, pos=(
-                    30, 60), outline_thickness=2)
-
-            if dash_cooldown <= 0:
-                draw_text_outline(WIN, "DASH READY (SPACE)", FONT, (255, 255, 255), BLACK, pos=(
-                    30, 90), outline_thickness=2)
-            else:
-                draw_text_outline(WIN, f"DASH COOLDOWN: {dash_cooldown:.1f}s", FONT, (
-                    200, 200, 200), BLACK, pos=(30, 90), outline_thickness=2)
-
-            if state == "PAUSED":
-                overlay = pygame.Surface((WIDTH, HEIGHT))
-                overlay.set_alpha(180)
-                overlay.fill((0, 0, 0))
-                WIN.blit(overlay, (0, 0))
-
-                draw_text_outline(WIN, "PAUSED", END_FONT, WHITE, BLACK,
-                                  center=(WIDTH // 2, HEIGHT // 2 - 60), outline_thickness=4)
-                draw_text_outline(WIN, "ESC = Resume", FONT, WHITE, BLACK,
-                                  center=(WIDTH // 2, HEIGHT // 2 + 20), outline_thickness=2)
-                draw_text_outline(WIN, "ENTER = Reset game", FONT, WHITE, BLACK,
-                                  center=(WIDTH // 2, HEIGHT // 2 + 60), outline_thickness=2)
-
-                back_btn.draw(WIN)
-                pygame.display.flip()
-                continue
-
-            if state in ("WON", "LOST"):
-                overlay = pygame.Surface((WIDTH, HEIGHT))
-                overlay.set_alpha(200)
-                overlay.fill((0, 0, 0))
-                WIN.blit(overlay, (0, 0))
-
-                msg = "YOU LOST LIL BRO" if state == "LOST" else "YOU WON CHAMP"
-                draw_text_outline(WIN, msg, END_FONT, WHITE, BLACK,
-                                  center=(WIDTH // 2, HEIGHT // 2), outline_thickness=4)
-                draw_text_outline(WIN, "Press ENTER to restart", FONT, WHITE, BLACK,
-                                  center=(WIDTH // 2, HEIGHT // 2 + 90), outline_thickness=2)
-
-                back_btn.draw(WIN)
-                pygame.display.flip()
-
-                while True:
-                    for event in pygame.event.get():
-                        if event.type == pygame.QUIT:
-                            pygame.mixer.music.stop()
-                            return "quit"
-                        if back_btn.clicked(event):
-                            pygame.mixer.music.stop()
-                            return "menu"
-                        if event.type == pygame.KEYDOWN and event.key in (pygame.K_RETURN, pygame.K_KP_ENTER):
-                            break
-                    else:
-                        clock.tick(30)
-                        continue
+                    clock.tick()  # start the next game with a fresh frame time
                     break
 
-                break
-
-            pygame.display.flip()
+                present()
+                if capture:
+                    capture.grab(pygame.display.get_surface())
+    finally:
+        if recorder:
+            recorder.close()
+        if profiler:
+            profiler.close()
+        if profile_dir or memory_log:
+            print("[AUDIO] Sound effects:", sounds.get_stats())
+            print("[FX] Particles:", particles.get_stats())
+            print("[FX] Render queue:", queue.get_stats())
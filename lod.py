@@ -0,0 +1,91 @@
+import math
+
+from foxes import FOX_ANIM_DELAY, nav_blocked
+import settings
+from settings import WIDTH, HEIGHT, BLOCK_SIZE
+from pursuit import get_routes, pursue
+from world import find_room
+
+# Level of detail for rooms the player is not in:
+#   current room   full update every frame (session.step_session)
+#   nearby rooms   explored rooms up to pursuit.PURSUIT_DEPTH portals away
+#                  get a coarse update every LOD_TICK: their foxes follow
+#                  the player from room to room (pursuit.pursue)
+#   other rooms    untouched; advanced in one go when they come in range
+#                  or the player walks in (advance_room)
+LOD_TICK = 0.25  # seconds between coarse updates of a nearby room
+ANALYTIC_AFTER = 1.0  # a room idle longer than this is jumped ahead analytically
+WANDER_SPEED_RATIO = 0.5  # of FOX_SPEED
+WANDER_TURN = 1.5  # seconds a wandering fox keeps its heading, on average
+SAFE_DISTANCE = 250  # jumped-ahead foxes land at least this far from the player
+
+def _animate(room, i: int, elapsed: float, frame_count: int):
+    timer = room["fox_anim_timer"][i] + elapsed
+    steps = int(timer // FOX_ANIM_DELAY)
+    room["fox_anim_timer"][i] = timer - steps * FOX_ANIM_DELAY
+    room["fox_frames"][i] = (room["fox_frames"][i] + steps) % frame_count
+
+
+def jump_ahead(room, elapsed: float, rng, frame_count: int, player=None):
+    """Advance a long-idle room by `elapsed` seconds without stepping it.
+
+    A wandering fox ends up about FOX_SPEED * WANDER_SPEED_RATIO *
+    sqrt(elapsed * WANDER_TURN) pixels from where it was, in a random
+    direction (a random walk). It is then moved to the nearest free grid
+    cell, away from the player.
+    """
+    blocked = nav_blocked(room)
+    spread = settings.FOX_SPEED * WANDER_SPEED_RATIO * math.sqrt(elapsed * WANDER_TURN)
+    cols, rows = WIDTH // BLOCK_SIZE, HEIGHT // BLOCK_SIZE
+    free = [(x, y) for x in range(cols) for y in range(rows) if (x, y) not in blocked]
+    if player is not None:
+        px, py = player.center
+        free = [(x, y) for x, y in free
+                if math.hypot((x + 0.5) * BLOCK_SIZE - px, (y + 0.5) * BLOCK_SIZE - py) >= SAFE_DISTANCE]
+    if not free:
+        return
+
+    for i, fox in enumerate(room["foxes"]):
+        angle = rng.uniform(0, 2 * math.pi)
+        distance = abs(rng.gauss(0, spread))
+        tx = fox.centerx + math.cos(angle) * distance
+        ty = fox.centery + math.sin(angle) * distance
+        cx, cy = min(free, key=lambda c: ((c[0] + 0.5) * BLOCK_SIZE - tx) ** 2
+                     + ((c[1] + 0.5) * BLOCK_SIZE - ty) ** 2)
+        fox.center = (int((cx + 0.5) * BLOCK_SIZE), int((cy + 0.5) * BLOCK_SIZE))
+        room["fox_directions"][i] = 1 if math.cos(angle) >= 0 else -1
+        room["fox_paths"][i] = []
+        _animate(room, i, elapsed, frame_count)
+
+
+def advance_room(room, now: float, rng, frame_count: int, player=None,
+                 coords=None, exit_side=None, rooms=None):
+    # Bring a room's foxes up to session time `now`; with an exit_side its
+    # foxes chase the player through that portal.
+    last = room.get("lod_time")
+    room["lod_time"] = now
+    if last is None:
+        return
+    elapsed = now - last
+    if elapsed > ANALYTIC_AFTER:
+        jump_ahead(room, elapsed, rng, frame_count, player)
+    elif elapsed > 0 and exit_side is not None:
+        pursue(room, coords, exit_side, elapsed, rooms)
+        for i in range(len(room["foxes"])):
+            _animate(room, i, elapsed, frame_count)
+
+
+def update_world(session, room):
+    """Per-frame LOD pass: call before the current room's full update."""
+    now = session["clock"]
+    rng = session["rng"]
+    frame_count = session["fox_frame_count"]
+    # The current room normally is up to date; after a portal it may have
+    # been idle for a long time and gets jumped ahead first.
+    advance_room(room, now, rng, frame_count, player=session["player"])
+
+    rooms = session.get("rooms")
+    for coords, exit_side in get_routes(session).items():
+        nearby = find_room(coords, rooms)
+        if "lod_time" not in nearby or now - nearby["lod_time"] >= LOD_TICK:
+            advance_room(nearby, now, rng, frame_count, coords=coords, exit_side=exit_side, rooms=rooms)
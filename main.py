@@ -1,155 +1,226 @@
+import argparse
 import pygame
 import sys
 import os
 
-from settings import WIDTH, HEIGHT, FPS, WHITE, BLACK
-from ui import ImageButton, safe_load_bg, safe_load_png, scale_to_width, draw_text_outline
+from settings import WIDTH, HEIGHT, WHITE, BLACK, IDLE_TIMEOUT_MS, RENDER_SCALE
+from ui import (ImageButton, safe_load_bg, load_button, draw_text_outline,
+                draw_bg, load_font, wait_events, REDRAW_EVENTS)
+from display import open_display, get_canvas, present
 from game import run_game
+from music import play_music, handle_music_event
+from netplay import PORT
 
 # States
 MENU = "menu"
 HOWTO = "howto"
 
+SAVE_PATH = os.path.join("saves", "autosave.bunsave")
 
-def main():
-    pygame.init()
-    pygame.font.init()
-
-    # ---------------- MENU MUSIC ----------------
-    try:
-        if not pygame.mixer.get_init():
-            pygame.mixer.init()
-
-        menu_music = pygame.mixer.Sound("sound/menu.mp3")
-        menu_music.set_volume(0.6)
-    except Exception as e:
-        print("[AUDIO] Menu music failed:", e)
-        menu_music = None
-    # --------------------------------------------
-
-    WIN = pygame.display.set_mode((WIDTH, HEIGHT))
-    pygame.display.set_caption("Bunnies Beta v1.0")
-
-    # Fonts (load from .ttf file)
-    def load_font(size):
-        try:
-            return pygame.font.Font("font.ttf", size)
-        except:
-            return pygame.font.SysFont(None, size, bold=True)
-
-    FONT = load_font(30)
-    BIG_FONT = load_font(48)
-    END_FONT = load_font(80)
 
+def load_menu_assets() -> dict:
     # Backgrounds
-    MENU_BG = safe_load_bg("images/menu_background.png", (30, 120, 80))
-    HOWTO_BG = safe_load_bg("images/howtoplay_background.png", (30, 120, 80))
+    menu_bg = safe_load_bg("images/menu_background.png", (30, 120, 80))
+    howto_bg = safe_load_bg("images/howtoplay_background.png", (30, 120, 80))
 
     # Buttons
     TARGET_BTN_WIDTH = 480
-    PLAY_IMG = scale_to_width(safe_load_png(
-        "images/play_button.png"), TARGET_BTN_WIDTH)
-    HOW_IMG = scale_to_width(safe_load_png(
-        "images/howtoplay_button.png"), TARGET_BTN_WIDTH)
-    QUIT_IMG = scale_to_width(safe_load_png(
-        "images/quit_button.png"), TARGET_BTN_WIDTH)
-
     BACK_BTN_WIDTH = 320
-    BACK_IMG = scale_to_width(safe_load_png(
-        "images/back_button.png"), BACK_BTN_WIDTH)
-
-    play_btn = ImageButton(PLAY_IMG, (WIDTH // 2, 470))
-    how_btn = ImageButton(HOW_IMG,  (WIDTH // 2, 565))
-    quit_btn = ImageButton(QUIT_IMG, (WIDTH // 2, 660))
-    back_btn = ImageButton(BACK_IMG, (WIDTH // 2, 620))
-
-    clock = pygame.time.Clock()
-    state = MENU
-
-    # ▶️ START menu music
-    if menu_music:
-        menu_music.play(loops=-1)
-
-    howto_lines = [
-        "Move: WASD or Arrow Keys",
-        "Go through portals at the edges to explore new areas",
-        "Collect carrots to increase your score",
-        "Foxes chase you — getting caught costs a life",
-        "Reach the target score to win",
-        "ESC pauses the game",
-        "ENTER while paused resets the game",
-        "SPACE = Dash (cooldown)",
-    ]
-
-    running = True
-    while running:
-        clock.tick(FPS)
-
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                running = False
-
-            if state == MENU:
-                if play_btn.clicked(event):
-                    if menu_music:
-                        menu_music.stop()   # 🔇 stop menu music during game
-
-                    result = run_game(WIN, FONT, END_FONT)
-
-                    if result == "quit":
-                        running = False
-                    else:
-                        state = MENU
-                        # ▶️ Restart menu music only if it's not already playing
-                        if menu_music and menu_music.get_num_channels() == 0:
-                            menu_music.play(loops=-1)
+    return {
+        "menu_bg": menu_bg,
+        "howto_bg": howto_bg,
+        "play_img": load_button("images/play_button.png", TARGET_BTN_WIDTH),
+        "how_img": load_button("images/howtoplay_button.png", TARGET_BTN_WIDTH),
+        "quit_img": load_button("images/quit_button.png", TARGET_BTN_WIDTH),
+        "back_img": load_button("images/back_button.png", BACK_BTN_WIDTH),
+    }
+
+
+def main(record_dir=None, window_size=(WIDTH, HEIGHT), render_scale=RENDER_SCALE,
+         capture_dir=None, capture_format="png", capture_worker="process",
+         profile_dir=None, profile_mode="sample", memory_log=None):
+    pygame.init()
+    pygame.font.init()
 
-                elif how_btn.clicked(event):
-                    state = HOWTO
-                    # ▶️ Ensure menu music is playing in HOWTO too
-                    if menu_music and menu_music.get_num_channels() == 0:
-                        menu_music.play(loops=-1)
+    # Resizable window; the game renders at render_scale of its size
+    open_display(window_size, render_scale)
+    pygame.display.set_caption("Bunnies Beta v1.0")
+
+    # Gameplay capture (see capture.py); frames after a resize are skipped
+    capture = None
+    if capture_dir:
+        from capture import FrameCapture
+        capture = FrameCapture(capture_dir, pygame.display.get_surface(),
+                               fmt=capture_format, worker=capture_worker)
 
-                elif quit_btn.clicked(event):
+    try:
+        menu = load_menu_assets()
+        play_btn = ImageButton(menu["play_img"], (WIDTH // 2, 470))
+        how_btn = ImageButton(menu["how_img"],  (WIDTH // 2, 565))
+        quit_btn = ImageButton(menu["quit_img"], (WIDTH // 2, 660))
+        back_btn = ImageButton(menu["back_img"], (WIDTH // 2, 620))
+
+        state = MENU
+
+        # ▶️ START menu music (streamed, see music.py)
+        play_music("menu")
+
+        howto_lines = [
+            "Move: WASD or Arrow Keys",
+            "Go through portals at the edges to explore new areas",
+            "Collect carrots to increase your score",
+            "Foxes chase you — getting caught costs a life",
+            "Reach the target score to win",
+            "ESC pauses the game",
+            "ENTER while paused resets the game",
+            "SPACE = Dash (cooldown)",
+            "Leaving a game saves it; PLAY continues where you left off",
+        ]
+
+        # Both screens are static: draw one when it changes (or the window needs
+        # repainting), then sleep in wait_events until the player does something.
+        drawn_state = None
+        running = True
+        while running:
+            # ----- DRAW -----
+            if state != drawn_state:
+                # Fonts come from load_font, which caches them per canvas size
+                WIN = get_canvas()
+                FONT, BIG_FONT = load_font(30), load_font(48)
+                if state == MENU:
+                    draw_bg(WIN, menu["menu_bg"])
+                    play_btn.draw(WIN)
+                    how_btn.draw(WIN)
+                    quit_btn.draw(WIN)
+
+                elif state == HOWTO:
+                    draw_bg(WIN, menu["howto_bg"])
+                    draw_text_outline(WIN, "HOW TO PLAY", BIG_FONT, WHITE, BLACK,
+                                      center=(WIDTH // 2, 120), outline_thickness=3)
+
+                    y = 220
+                    for line in howto_lines:
+                        draw_text_outline(WIN, line, FONT, WHITE, BLACK,
+                                          center=(WIDTH // 2, y), outline_thickness=2)
+                        y += 42
+
+                    back_btn.draw(WIN)
+
+                present()
+                drawn_state = state
+
+            for event in wait_events(IDLE_TIMEOUT_MS):
+                if event.type == pygame.QUIT:
                     running = False
 
-            elif state == HOWTO:
-                if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
-                    state = MENU
-                    # music should keep playing (no need to restart unless stopped)
-                    if menu_music and menu_music.get_num_channels() == 0:
-                        menu_music.play(loops=-1)
+                handle_music_event(event)
 
-                if back_btn.clicked(event):
-                    state = MENU
-                    if menu_music and menu_music.get_num_channels() == 0:
-                        menu_music.play(loops=-1)
+                if event.type in REDRAW_EVENTS:
+                    drawn_state = None
 
-        # ----- DRAW -----
-        if state == MENU:
-            WIN.blit(MENU_BG, (0, 0))
-            play_btn.draw(WIN)
-            how_btn.draw(WIN)
-            quit_btn.draw(WIN)
+                if state == MENU:
+                    if play_btn.clicked(event):
+                        # run_game fades the menu music over to the game music
+                        result = run_game(record_dir=record_dir, save_path=SAVE_PATH, capture=capture,
+                                          profile_dir=profile_dir, profile_mode=profile_mode,
+                                          memory_log=memory_log)
 
-        elif state == HOWTO:
-            WIN.blit(HOWTO_BG, (0, 0))
-            draw_text_outline(WIN, "HOW TO PLAY", BIG_FONT, WHITE, BLACK,
-                              center=(WIDTH // 2, 120), outline_thickness=3)
+                        if result == "quit":
+                            running = False
+                        else:
+                            state = MENU
+                            drawn_state = None  # the game drew over the menu
+                            play_music("menu")
 
-            y = 220
-            for line in howto_lines:
-                draw_text_outline(WIN, line, FONT, WHITE, BLACK,
-                                  center=(WIDTH // 2, y), outline_thickness=2)
-                y += 42
+                    elif how_btn.clicked(event):
+                        state = HOWTO
 
-            back_btn.draw(WIN)
+                    elif quit_btn.clicked(event):
+                        running = False
 
-        pygame.display.flip()
+                elif state == HOWTO:
+                    if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
+                        state = MENU
 
+                    if back_btn.clicked(event):
+                        state = MENU
+    finally:
+        # stops the encoder worker even when the game raises
+        if capture:
+            capture.close()
     pygame.quit()
     sys.exit()
 
 
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Bunnies")
+    parser.add_argument("--stress", action="store_true",
+                        help="run a scripted stress test instead of the game")
+    parser.add_argument("--foxes", type=int, default=200, help="stress: foxes per room")
+    parser.add_argument("--obstacles", type=int, default=30, help="stress: props per room")
+    parser.add_argument("--carrots", type=int, default=50, help="stress: carrots per room")
+    parser.add_argument("--traps", type=int, default=20, help="stress: traps per room")
+    parser.add_argument("--frames", type=int, default=1200, help="stress: frames to simulate")
+    parser.add_argument("--seed", type=int, default=1, help="stress/server: world seed")
+    parser.add_argument("--window", action="store_true", help="stress/replay/bot: show the window")
+    parser.add_argument("--no-render", action="store_true", help="stress: skip drawing")
+    parser.add_argument("--record", nargs="?", const="recordings", metavar="DIR",
+                        help="save every session's input to DIR (default: recordings)")
+    parser.add_argument("--size", default=f"{WIDTH}x{HEIGHT}", metavar="WxH",
+                        help="initial window size; the window can be resized")
+    parser.add_argument("--render-scale", type=float, default=RENDER_SCALE, metavar="S",
+                        help="internal render resolution as a fraction of the window (e.g. 0.5)")
+    parser.add_argument("--capture", metavar="DIR",
+                        help="save every game frame to DIR without slowing the game down")
+    parser.add_argument("--capture-format", choices=("png", "raw"), default="png",
+                        help="capture: PNG sequence or one raw BGRX stream")
+    parser.add_argument("--capture-worker", choices=("process", "thread"), default="process",
+                        help="capture: encode in a separate process or a thread")
+    parser.add_argument("--profile", nargs="?", const="profiles", metavar="DIR",
+                        help="profile every session into DIR (default: profiles)")
+    parser.add_argument("--profile-mode", choices=("sample", "cprofile"), default="sample",
+                        help="profile: collapsed stacks from a sampler, or cProfile pstats")
+    parser.add_argument("--memory", nargs="?", type=float, const=10.0, metavar="SECONDS",
+                        help="log memory use every SECONDS in game (default 10); F9 prints the full report")
+    parser.add_argument("--memory-trace", action="store_true",
+                        help="memory: also trace Python allocations per subsystem; "
+                             "several times slower, for measuring rather than playing")
+    parser.add_argument("--server", nargs="?", type=int, const=PORT, metavar="PORT",
+                        help=f"host a co-op world on loopback (default port {PORT})")
+    parser.add_argument("--join", metavar="HOST[:PORT]", help="play in a co-op world")
+    parser.add_argument("--bot", action="store_true", help="join: a bot plays (headless unless --window)")
+    parser.add_argument("--loss", type=float, default=0.0, metavar="FRACTION",
+                        help="join: throw away this fraction of snapshots, to test packet loss")
+    parser.add_argument("--seconds", type=float, help="server/join: stop after this long")
+    parser.add_argument("--replay", metavar="FILE",
+                        help="replay a recorded session at full speed (headless unless --window)")
+    return parser.parse_args(argv)
+
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    args = parse_args()
+    if args.memory_trace:
+        from memory import start_tracing
+        start_tracing()
+    if args.stress:
+        from stress import run_stress
+        run_stress(foxes=args.foxes, obstacles=args.obstacles, carrots=args.carrots,
+                   traps=args.traps, frames=args.frames, seed=args.seed,
+                   window=args.window, render=not args.no_render)
+    elif args.server is not None:
+        from netplay import run_server
+        run_server(args.server, seed=args.seed, seconds=args.seconds)
+    elif args.join:
+        from netplay import run_client
+        host, _, port = args.join.partition(":")
+        run_client(host, int(port or PORT), window=args.window or not args.bot, bot=args.bot,
+                   seconds=args.seconds, loss=args.loss)
+    elif args.replay:
+        from replay import replay
+        sys.exit(0 if replay(args.replay, window=args.window) else 1)
+    else:
+        w, h = (int(v) for v in args.size.lower().split("x"))
+        main(record_dir=args.record, window_size=(w, h), render_scale=args.render_scale,
+             capture_dir=args.capture, capture_format=args.capture_format,
+             capture_worker=args.capture_worker, profile_dir=args.profile,
+             profile_mode=args.profile_mode, memory_log=args.memory)
\ No newline at end of file
@@ -0,0 +1,213 @@
+"""Memory accounting: which assets, rooms and subsystems hold how much.
+
+    python main.py --memory [SECONDS] [--memory-trace]
+
+Pixels and sound samples live in SDL's allocations, which tracemalloc
+cannot see, so they are counted by size: width x height x bytes per pixel
+for every surface, length x rate x sample bytes x channels for every
+sound. Rooms are counted by what they own (rects, fox paths, nav grids);
+the theme images they draw are shared and counted once, as assets.
+With tracemalloc running (--memory-trace), Python allocations are summed
+per subsystem by the module whose line made them; allocations made inside
+library code count as "other". Tracing only the innermost frame keeps
+the cost down, but the game still runs several times slower with it on
+(update of the 200-fox stress test: 8 ms without, ~37 ms with, ~380 ms
+with 8 frames), so use it to take measurements, not to play.
+
+memory_report() gathers all of it; format_report() is the full dump (F9
+in game), log_line() the one line run_game prints every SECONDS, with any
+budget in settings.MEMORY_BUDGETS_MB that is exceeded.
+"""
+import os
+import sys
+import tracemalloc
+import numpy as np
+import pygame
+
+import assetpack
+import assets
+from display import get_surfaces
+from settings import MEMORY_BUDGETS_MB
+from world import room_data
+
+MB = 1024 * 1024
+TRACE_FRAMES = 1  # deeper tracebacks multiply the cost of every allocation
+GAME_DIR = os.path.dirname(os.path.abspath(__file__))
+# game module -> subsystem for tracemalloc; other game modules count as themselves
+SUBSYSTEMS = {
+    "world.py": "world", "session.py": "world", "lod.py": "world", "triggers.py": "world",
+    "foxes.py": "ai", "pathfinding.py": "ai", "pursuit.py": "ai", "bot.py": "ai",
+    "assets.py": "assets", "assetpack.py": "assets", "bunny.py": "assets",
+    "game.py": "render", "render.py": "render", "particles.py": "render",
+    "display.py": "render", "ui.py": "render",
+    "sfx.py": "audio", "music.py": "audio",
+    "replay.py": "io", "savegame.py": "io", "capture.py": "io",
+}
+
+
+def start_tracing():
+    # Every allocation after this is traced (and costs more); call it early
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(TRACE_FRAMES)
+
+
+def surface_bytes(surf: pygame.Surface) -> int:
+    if surf.get_parent() is not None:
+        return 0  # a subsurface shares its parent's pixels
+    return surf.get_width() * surf.get_height() * surf.get_bytesize()
+
+
+def sound_bytes(snd: pygame.mixer.Sound) -> int:
+    init = pygame.mixer.get_init()
+    if not init:
+        return 0
+    frequency, size, channels = init
+    return round(snd.get_length() * frequency) * (abs(size) // 8) * channels
+
+
+def _data_bytes(obj, seen: set) -> int:
+    # Size of a room's own data; images, masks and props are shared assets.
+    if id(obj) in seen or isinstance(obj, (pygame.Surface, pygame.mask.Mask)) or hasattr(obj, "__dict__"):
+        return 0
+    seen.add(id(obj))
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(_data_bytes(k, seen) + _data_bytes(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(_data_bytes(v, seen) for v in obj)
+    return size
+
+
+def _room_report(room) -> dict:
+    images = {id(room["bg_image"]): room["bg_image"]} if room.get("bg_image") else {}
+    for ob in room["obstacles"]:
+        images[id(ob["img"])] = ob["img"]
+    return {
+        "data": _data_bytes(room, set()),
+        "surfaces": sum(surface_bytes(img) for img in images.values()),
+        "foxes": len(room["foxes"]),
+        "carrots": len(room["carrots"]),
+        "traps": len(room["traps"]),
+        "obstacles": len(room["obstacles"]),
+        "path_points": sum(len(p) for p in room["fox_paths"]),
+    }
+
+
+def _traced() -> dict:
+    # subsystem -> bytes Python currently holds for it
+    totals = {}
+    for stat in tracemalloc.take_snapshot().statistics("traceback"):
+        owner = "other"
+        for frame in reversed(stat.traceback):  # innermost first
+            if os.path.isabs(frame.filename) and os.path.dirname(frame.filename) == GAME_DIR:
+                name = os.path.basename(frame.filename)
+                owner = SUBSYSTEMS.get(name, name[:-3])
+                break
+        totals[owner] = totals.get(owner, 0) + stat.size
+    return totals
+
+
+def memory_report(session=None, extra=None) -> dict:
+    """Bytes per asset, sound, room and (when tracing) subsystem.
+
+    session: whose rooms to count (the shared world without one)
+    extra:   name -> object holding more surfaces, e.g. the game's asset
+             dict or the Bunny; surfaces found there that are not already
+             counted are listed under that name
+    """
+    surfaces, sounds, seen = {}, {}, set()
+
+    def add(name, surf):
+        if surf is not None and id(surf) not in seen:
+            seen.add(id(surf))
+            surfaces[name] = surface_bytes(surf)
+
+    for key, asset in assetpack.get_loaded().items():
+        if isinstance(asset, pygame.Surface):
+            add(key, asset)
+        else:
+            sounds[key] = sound_bytes(asset)
+    for name, surf in assets.iter_cached_surfaces():
+        add(name, surf)
+    for name, surf in get_surfaces().items():
+        add(name, surf)
+
+    def walk(name, obj, depth=0):
+        if isinstance(obj, pygame.Surface):
+            add(name, obj)
+        elif depth < 3 and isinstance(obj, dict):
+            for k, v in obj.items():
+                walk(f"{name}.{k}", v, depth + 1)
+        elif depth < 3 and isinstance(obj, (list, tuple)):
+            for i, v in enumerate(obj):
+                walk(f"{name}[{i}]", v, depth + 1)
+        elif depth < 3 and hasattr(obj, "__dict__"):
+            walk(name, vars(obj), depth)
+    for name, obj in (extra or {}).items():
+        walk(name, obj)
+
+    rooms = session["rooms"] if session and session.get("rooms") is not None else room_data
+    room_reports = {coords: _room_report(room) for coords, room in rooms.items()}
+    entities = {"rooms": len(room_reports)}
+    for key in ("foxes", "carrots", "traps", "obstacles", "path_points"):
+        entities[key] = sum(r[key] for r in room_reports.values())
+
+    return {
+        "surfaces": surfaces,
+        "sounds": sounds,
+        "rooms": room_reports,
+        "entities": entities,
+        "traced": _traced() if tracemalloc.is_tracing() else {},
+    }
+
+
+def get_totals(report) -> dict:
+    return {
+        "surfaces": sum(report["surfaces"].values()),
+        "sounds": sum(report["sounds"].values()),
+        "rooms": sum(r["data"] for r in report["rooms"].values()),
+        "traced": sum(report["traced"].values()),
+    }
+
+
+def over_budget(report, budgets=MEMORY_BUDGETS_MB) -> list:
+    totals = get_totals(report)
+    return [f"{name} {totals[name] / MB:.1f}/{limit} MB"
+            for name, limit in budgets.items() if totals.get(name, 0) > limit * MB]
+
+
+def log_line(report) -> str:
+    totals = get_totals(report)
+    parts = [f"{name} {size / MB:.1f} MB" for name, size in totals.items()
+             if name != "traced" or report["traced"]]
+    line = "[MEMORY] " + ", ".join(parts) + " | " + " ".join(
+        f"{name} {count}" for name, count in report["entities"].items())
+    over = over_budget(report)
+    if over:
+        line += " | OVER BUDGET: " + ", ".join(over)
+    return line
+
+
+def format_report(report, top: int = 15) -> str:
+    def table(title, sizes):
+        rows = sorted(sizes.items(), key=lambda kv: -kv[1])
+        lines = [f"  {title}: {sum(sizes.values()) / MB:.2f} MB in {len(sizes)}"]
+        lines += [f"    {size / 1024:>9.1f} KB  {name}" for name, size in rows[:top]]
+        if len(rows) > top:
+            lines.append(f"    {sum(s for _, s in rows[top:]) / 1024:>9.1f} KB  ({len(rows) - top} more)")
+        return lines
+
+    lines = [log_line(report)]
+    lines += table("surfaces", report["surfaces"])
+    lines += table("sounds", report["sounds"])
+    lines.append(f"  rooms: {get_totals(report)['rooms'] / MB:.2f} MB own data")
+    for coords, room in sorted(report["rooms"].items()):
+        lines.append(f"    {str(coords):>10} data {room['data'] / 1024:7.1f} KB, "
+                     f"draws {room['surfaces'] / MB:5.2f} MB of images | "
+                     f"foxes {room['foxes']} carrots {room['carrots']} traps {room['traps']} "
+                     f"obstacles {room['obstacles']} path points {room['path_points']}")
+    if report["traced"]:
+        lines += table("traced (tracemalloc)", report["traced"])
+    return "\n".join(lines)
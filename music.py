@@ -0,0 +1,87 @@
+import pygame
+
+# Background tracks: (file, volume). They are streamed from disk through
+# pygame.mixer.music, so only the mixer's small decode buffer is resident,
+# never a whole decoded track.
+TRACKS = {
+    "menu": ("sound/menu.mp3", 0.6),
+    "game": ("sound/jazz.mp3", 0.5),
+    "suspense": ("sound/suspense.mp3", 0.5),
+}
+FADE_MS = 600  # fade out the old track, then fade in the new one over this long
+
+MUSIC_END = pygame.event.custom_type()
+
+_state = {"current": None, "pending": None, "paused": False}
+
+
+def _start(name: str):
+    path, volume = TRACKS[name]
+    _state["pending"] = None
+    _state["paused"] = False
+    try:
+        if not pygame.mixer.get_init():
+            pygame.mixer.init()
+        pygame.mixer.music.set_endevent(MUSIC_END)
+        pygame.mixer.music.load(path)
+        pygame.mixer.music.set_volume(volume)
+        pygame.mixer.music.play(-1, fade_ms=FADE_MS)
+        _state["current"] = name
+    except Exception as e:
+        print(f"[AUDIO] Music {name} failed:", e)
+        _state["current"] = None
+
+
+def play_music(name: str):
+    """Switch the background music to TRACKS[name].
+
+    The current track fades out and the new one fades in once it is gone
+    (see handle_music_event). Asking for the track that is already on keeps
+    it playing without a restart.
+    """
+    if name == _state["current"] and _state["pending"] is None:
+        if _state["paused"]:
+            unpause_music()
+        return
+    if _state["current"] is not None and pygame.mixer.get_init() and pygame.mixer.music.get_busy():
+        _state["pending"] = name
+        pygame.mixer.music.fadeout(FADE_MS)
+    else:
+        _start(name)
+
+
+def stop_music(fade_ms: int = 0):
+    _state["current"] = None
+    _state["pending"] = None
+    _state["paused"] = False
+    if not pygame.mixer.get_init():
+        return
+    if fade_ms > 0:
+        pygame.mixer.music.fadeout(fade_ms)
+    else:
+        pygame.mixer.music.stop()
+
+
+def pause_music():
+    if _state["current"] is not None and pygame.mixer.get_init():
+        pygame.mixer.music.pause()
+        _state["paused"] = True
+
+
+def unpause_music():
+    if _state["paused"] and pygame.mixer.get_init():
+        pygame.mixer.music.unpause()
+    _state["paused"] = False
+
+
+def handle_music_event(event) -> bool:
+    # Pass every event here; when a fade-out finishes, the next track starts.
+    if event.type != MUSIC_END:
+        return False
+    if _state["pending"] is not None:
+        _start(_state["pending"])
+    return True
+
+
+def current_track():
+    return _state["pending"] or _state["current"]
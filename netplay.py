@@ -0,0 +1,563 @@
+"""Local network co-op: one authoritative server, clients over UDP.
+
+    python main.py --server [PORT]                 host a shared world
+    python main.py --join HOST[:PORT]              play in it (a window)
+    python main.py --join HOST --bot               a bot plays, headless
+    python -m benchmarks.netplay                   server + bots on loopback
+
+The server runs the only simulation: one session per player, all in one
+world (new_session(rooms=...)), stepped FPS times a second. Per room, the
+first player stepped moves its foxes; the others are only tested against
+them (step_session(world=False)). Clients send their buttons and draw
+what the server sends back.
+
+Every SNAPSHOT_EVERY steps each client gets a snapshot of its own room:
+the players, foxes and carrots in it, positions quantized to POS_STEP
+pixels. It is a delta against the newest snapshot the client has
+acknowledged: only entities whose quantized fields changed are sent, and
+of those only the changed fields. Without a usable baseline (first
+snapshot, new room, ack too old) the snapshot is full and also carries the
+room's static layout. Nothing is resent: after a lost packet the next
+delta is simply taken against an older baseline.
+"""
+import math
+import random
+import socket
+import struct
+import time
+import pygame
+
+from session import new_session, step_session, init_headless, read_keyboard
+from session import BTN_LEFT, BTN_RIGHT, BTN_UP, BTN_DOWN, BTN_DASH
+from world import THEME_FOLDERS, find_room, make_walls, make_portals, make_obstacle
+from assets import get_theme
+from settings import WIDTH, HEIGHT, FPS, PLAYER_SPEED, FOX_WIDTH, FOX_HEIGHT, WHITE, BLACK, SPEED_BOOST_MULT_1
+
+PORT = 47047
+SNAPSHOT_EVERY = 3  # simulation steps per snapshot: 20 snapshots/s at 60 FPS
+POS_STEP = 2  # pixels per quantization step
+HISTORY = 32  # snapshots kept as delta baselines
+TIMEOUT = 5.0  # seconds without a packet before a client is dropped
+RESPAWN_SECONDS = 3.0
+STATS_SECONDS = 5.0
+
+# Client -> server: magic, message, sequence, newest snapshot tick received, buttons
+CLIENT_MAGIC = b"BUNC"
+CLIENT_MSG = struct.Struct("<4sBIIB")
+MSG_HELLO, MSG_INPUT, MSG_BYE = 1, 2, 3
+
+# Server -> client, little endian:
+#   SNAPSHOT  magic, tick, baseline tick (0 = full), your player id,
+#             room x, room y, update count, removal count
+#   LAYOUT    (full snapshots only) theme, obstacle count, trap count,
+#             name length; the name; OBSTACLE and TRAP entries
+#   updates   RECORD (kind, id, field mask), then one u16 per field in the mask;
+#             ids are the room's fox_ids / carrot_ids, so a pickup or a fox
+#             leaving only removes that one record
+#   removals  RECORD with mask 0
+SERVER_MAGIC = b"BUNS"
+SNAPSHOT = struct.Struct("<4sIIBhhHH")
+LAYOUT = struct.Struct("<BBBB")
+OBSTACLE = struct.Struct("<BHH")  # prop index in the theme, x, y
+TRAP = struct.Struct("<HH")  # centre
+RECORD = struct.Struct("<BHB")
+FIELD = struct.Struct("<H")
+
+# Entity kinds and their fields (all u16)
+KIND_PLAYER, KIND_FOX, KIND_CARROT = 0, 1, 2
+FIELD_COUNT = {KIND_PLAYER: 5, KIND_FOX: 3, KIND_CARROT: 2}  # x, y, flags, score, lives / x, y, look / x, y
+
+# Player flags
+FLAG_INVULN = 1
+FLAG_TRANSITION = 2
+FLAG_BOOST = 4
+STATES = ("PLAYING", "WON", "LOST")  # bits 4-5
+# bits 8-11: move direction, (ix + 1) * 3 + (iy + 1)
+# bits 12-15: dash cooldown in tenths of a second
+
+
+def _quantize(value) -> int:
+    return max(0, min(0xFFFF, round(value / POS_STEP)))
+
+
+def player_fields(session) -> tuple:
+    ix, iy = session["move"]
+    flags = ((FLAG_INVULN if session["invuln_timer"] > 0 else 0)
+             | (FLAG_TRANSITION if session["is_transitioning"] else 0)
+             | (FLAG_BOOST if session["speed_boost"] > 1.0 else 0)
+             | STATES.index(session["state"]) << 4
+             | (int(ix + 1) * 3 + int(iy + 1)) << 8
+             | min(15, math.ceil(session["dash_cooldown"] * 10)) << 12)
+    x, y = session["player"].center
+    return (_quantize(x), _quantize(y), flags, session["score"], max(0, session["lives"]))
+
+
+def room_fields(room) -> dict:
+    # (kind, id) -> fields of everything in the room but the players
+    states = {}
+    for i, fox in enumerate(room["foxes"]):
+        look = room["fox_frames"][i] | (4 if room["fox_directions"][i] == -1 else 0)
+        states[(KIND_FOX, room["fox_ids"][i])] = (_quantize(fox.centerx), _quantize(fox.centery), look)
+    for carrot_id, carrot in zip(room["carrot_ids"], room["carrots"]):
+        states[(KIND_CARROT, carrot_id)] = (_quantize(carrot.centerx), _quantize(carrot.centery))
+    return states
+
+
+def encode_layout(room) -> bytes:
+    props = get_theme(room["theme"])[1]
+    name = room["name"].encode("utf-8")[:255]
+    obstacles = [ob for ob in room["obstacles"] if ob.get("prop") in props][:255]
+    traps = room["traps"][:255]
+    parts = [LAYOUT.pack(THEME_FOLDERS.index(room["theme"]), len(obstacles), len(traps), len(name)), name]
+    parts += [OBSTACLE.pack(props.index(ob["prop"]), ob["draw_rect"].x, ob["draw_rect"].y) for ob in obstacles]
+    parts += [TRAP.pack(*trap.center) for trap in traps]
+    return b"".join(parts)
+
+
+def encode_delta(states: dict, base: dict) -> tuple:
+    # (records, update count, removal count); only changed fields are written
+    parts = []
+    updates = 0
+    for key, fields in states.items():
+        old = base.get(key)
+        if old == fields:
+            continue
+        mask = 0
+        values = []
+        for i, value in enumerate(fields):
+            if old is None or old[i] != value:
+                mask |= 1 << i
+                values.append(value)
+        parts.append(RECORD.pack(key[0], key[1], mask))
+        parts += [FIELD.pack(v) for v in values]
+        updates += 1
+    removed = [key for key in base if key not in states]
+    parts += [RECORD.pack(kind, i, 0) for kind, i in removed]
+    return b"".join(parts), updates, len(removed)
+
+
+class CoopServer:
+    """The shared world and everyone in it; step() is one simulation frame."""
+
+    def __init__(self, port: int = PORT, host: str = "127.0.0.1", seed=None, room_options=None):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind((host, port))
+        self.sock.setblocking(False)
+        self.rng = random.Random(seed)
+        self.room_options = room_options
+        self.rooms = {}
+        self.clients = {}  # address -> client dict
+        self.next_id = 1
+        self.tick = 0
+        self.clock = 0.0
+        self.stats = {"bytes_in": 0, "bytes_out": 0, "snapshots": 0, "full": 0, "full_bytes": 0,
+                      "joined": 0, "left": 0}
+        self.tick_ms = []  # since the last stats line
+        print(f"[NET] Server on {host}:{self.sock.getsockname()[1]}, {FPS} steps/s, "
+              f"{FPS // SNAPSHOT_EVERY} snapshots/s")
+
+    def new_player_session(self) -> dict:
+        session = new_session(seed=self.rng.randrange(2 ** 32), room_options=self.room_options,
+                              rooms=self.rooms)
+        session["clock"] = self.clock  # the world's rooms are on this clock (lod.py)
+        return session
+
+    def receive(self):
+        now = time.perf_counter()
+        while True:
+            try:
+                data, addr = self.sock.recvfrom(64)
+            except (BlockingIOError, ConnectionResetError):
+                break
+            self.stats["bytes_in"] += len(data)
+            if len(data) != CLIENT_MSG.size:
+                continue
+            magic, msg, sequence, ack, buttons = CLIENT_MSG.unpack(data)
+            if magic != CLIENT_MAGIC:
+                continue
+            client = self.clients.get(addr)
+            if msg == MSG_BYE:
+                if client:
+                    self.drop(addr, "left")
+                continue
+            if client is None:
+                if self.next_id > 255:
+                    continue
+                client = self.clients[addr] = {
+                    "id": self.next_id, "session": self.new_player_session(), "buttons": 0,
+                    "sequence": -1, "ack": 0, "history": {}, "heard": now, "ended": None,
+                }
+                self.next_id += 1
+                self.stats["joined"] += 1
+                print(f"[NET] Player {client['id']} joined from {addr[0]}:{addr[1]}")
+            client["heard"] = now
+            if sequence > client["sequence"]:
+                client["sequence"] = sequence
+                client["buttons"] = buttons
+                client["ack"] = max(client["ack"], ack)
+
+    def drop(self, addr, reason: str):
+        client = self.clients.pop(addr)
+        self.stats["left"] += 1
+        print(f"[NET] Player {client['id']} {reason}")
+
+    def step(self):
+        dt = 1.0 / FPS
+        self.tick += 1
+        self.clock += dt
+        self.receive()
+        now = time.perf_counter()
+        for addr in [a for a, c in self.clients.items() if now - c["heard"] > TIMEOUT]:
+            self.drop(addr, "timed out")
+
+        # Who moves a shared room's foxes rotates, so they chase everyone in it
+        order = list(self.clients.values())
+        if order:
+            shift = self.tick % len(order)
+            order = order[shift:] + order[:shift]
+        moved = set()
+        for client in order:
+            session = client["session"]
+            if session["state"] != "PLAYING":
+                if self.clock - client["ended"] >= RESPAWN_SECONDS:
+                    client["session"] = self.new_player_session()
+                continue
+            leader = session["coords"] not in moved and not session["is_transitioning"]
+            if leader:
+                moved.add(session["coords"])
+            events = step_session(session, client["buttons"], dt, world=leader)
+            if "won" in events or "lost" in events:
+                client["ended"] = self.clock
+
+        if self.tick % SNAPSHOT_EVERY == 0:
+            self.send_snapshots()
+
+    def send_snapshots(self):
+        rooms = {}  # coords -> (room, states without players)
+        players = {}  # coords -> {(KIND_PLAYER, id): fields}
+        for client in self.clients.values():
+            session = client["session"]
+            players.setdefault(session["coords"], {})[(KIND_PLAYER, client["id"])] = player_fields(session)
+
+        for addr, client in self.clients.items():
+            coords = client["session"]["coords"]
+            if coords not in rooms:
+                room = find_room(coords, self.rooms)
+                rooms[coords] = (room, room_fields(room))
+            room, states = rooms[coords]
+            states = {**states, **players[coords]}
+
+            baseline = client["history"].get(client["ack"])
+            if baseline is not None and baseline[0] == coords:
+                base_tick, base, layout = client["ack"], baseline[1], b""
+            else:
+                base_tick, base, layout = 0, {}, encode_layout(room)
+            records, updates, removals = encode_delta(states, base)
+            packet = SNAPSHOT.pack(SERVER_MAGIC, self.tick, base_tick, client["id"],
+                                   coords[0], coords[1], updates, removals) + layout + records
+            try:
+                self.sock.sendto(packet, addr)
+            except OSError:
+                continue
+            self.stats["bytes_out"] += len(packet)
+            self.stats["snapshots"] += 1
+            if not base_tick:
+                self.stats["full"] += 1
+                self.stats["full_bytes"] += len(packet)
+
+            history = client["history"]
+            history[self.tick] = (coords, states)
+            for old in [t for t in history if t <= self.tick - HISTORY * SNAPSHOT_EVERY]:
+                del history[old]
+
+    def get_stats(self) -> dict:
+        stats = dict(self.stats)
+        stats["players"] = len(self.clients)
+        stats["delta_share"] = round(1 - stats["full"] / stats["snapshots"], 3) if stats["snapshots"] else 0.0
+        stats["avg_snapshot_bytes"] = round(stats["bytes_out"] / stats["snapshots"]) if stats["snapshots"] else 0
+        stats["avg_full_bytes"] = round(stats["full_bytes"] / stats["full"]) if stats["full"] else 0
+        return stats
+
+    def run(self, seconds=None):
+        step = 1.0 / FPS
+        start = next_step = last_stats = time.perf_counter()
+        sent = received = 0
+        try:
+            while seconds is None or time.perf_counter() - start < seconds:
+                now = time.perf_counter()
+                if now < next_step:
+                    time.sleep(next_step - now)
+                    continue
+                # Fall behind by more than a few frames and the lost time is skipped
+                next_step = max(next_step + step, now - 4 * step)
+                self.step()
+                self.tick_ms.append((time.perf_counter() - now) * 1000.0)
+
+                if now - last_stats >= STATS_SECONDS:
+                    elapsed = now - last_stats
+                    ticks = sorted(self.tick_ms)
+                    print(f"[NET] {len(self.clients)} players, {len(self.rooms)} rooms | tick "
+                          f"{sum(ticks) / len(ticks):.2f} ms (p99 {ticks[int(len(ticks) * 0.99)]:.2f}, "
+                          f"budget {step * 1000:.1f}) | out {(self.stats['bytes_out'] - sent) / elapsed / 1000:.1f} kB/s, "
+                          f"in {(self.stats['bytes_in'] - received) / elapsed / 1000:.1f} kB/s")
+                    sent, received = self.stats["bytes_out"], self.stats["bytes_in"]
+                    self.tick_ms.clear()
+                    last_stats = now
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.sock.close()
+            print(f"[NET] Server: {self.get_stats()}")
+
+
+class CoopClient:
+    """Sends buttons, decodes snapshots; get_view() is what to draw."""
+
+    def __init__(self, host: str, port: int = PORT, loss: float = 0.0):
+        # loss: fraction of snapshots to throw away, to try out packet loss
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.connect((host, port))
+        self.sock.setblocking(False)
+        self.loss = loss
+        self.rng = random.Random()
+        self.sequence = 0
+        self.player_id = None
+        self.tick = 0  # newest snapshot decoded
+        self.coords = None
+        self.layout = None
+        self.states = {}
+        self.history = {}  # tick -> states, baselines for the server's deltas
+        self.previous = (0.0, {})  # (arrival time, states) of the snapshot before, to interpolate
+        self.arrived = 0.0
+        self.stats = {"snapshots": 0, "full": 0, "bytes_in": 0, "lost": 0, "undecodable": 0}
+        self.started = time.perf_counter()
+        self.send(MSG_HELLO, 0)
+
+    def send(self, msg: int, buttons: int):
+        self.sequence += 1
+        try:
+            self.sock.send(CLIENT_MSG.pack(CLIENT_MAGIC, msg, self.sequence, self.tick, buttons))
+        except OSError:
+            pass  # no server (yet); the next input tries again
+
+    def poll(self) -> bool:
+        """Decode every snapshot that arrived; True if there was a new one."""
+        new = False
+        while True:
+            try:
+                data = self.sock.recv(65536)
+            except (BlockingIOError, ConnectionRefusedError):
+                break
+            if self.loss and self.rng.random() < self.loss:
+                self.stats["lost"] += 1
+                continue
+            self.stats["bytes_in"] += len(data)
+            new = self.decode(data) or new
+        return new
+
+    def decode(self, data: bytes) -> bool:
+        if len(data) < SNAPSHOT.size:
+            return False
+        magic, tick, base_tick, player_id, x, y, updates, removals = SNAPSHOT.unpack_from(data)
+        if magic != SERVER_MAGIC or tick <= self.tick:
+            return False  # late or duplicate
+        if base_tick:
+            base = self.history.get(base_tick)
+            if base is None:
+                self.stats["undecodable"] += 1
+                return False
+            states = dict(base)
+        else:
+            states = {}
+        pos = SNAPSHOT.size
+        layout = self.layout
+        if not base_tick:
+            layout, pos = self.decode_layout(data, pos, (x, y))
+            self.stats["full"] += 1
+
+        for _ in range(updates):
+            kind, i, mask = RECORD.unpack_from(data, pos)
+            pos += RECORD.size
+            fields = list(states.get((kind, i), (0,) * FIELD_COUNT[kind]))
+            for f in range(FIELD_COUNT[kind]):
+                if mask & 1 << f:
+                    (fields[f],) = FIELD.unpack_from(data, pos)
+                    pos += FIELD.size
+            states[(kind, i)] = tuple(fields)
+        for _ in range(removals):
+            kind, i, _ = RECORD.unpack_from(data, pos)
+            pos += RECORD.size
+            states.pop((kind, i), None)
+
+        if (x, y) != self.coords:
+            self.previous = (0.0, {})  # nothing to move from in a new room
+        else:
+            self.previous = (self.arrived, self.states)
+        self.arrived = time.perf_counter()
+        self.player_id, self.tick, self.coords, self.layout, self.states = player_id, tick, (x, y), layout, states
+        self.history[tick] = states
+        for old in [t for t in self.history if t <= tick - HISTORY * SNAPSHOT_EVERY]:
+            del self.history[old]
+        self.stats["snapshots"] += 1
+        return True
+
+    def decode_layout(self, data: bytes, pos: int, coords) -> tuple:
+        theme, obstacles, traps, name_length = LAYOUT.unpack_from(data, pos)
+        pos += LAYOUT.size
+        name = data[pos:pos + name_length].decode("utf-8", "replace")
+        pos += name_length
+        layout = {"coords": coords, "theme": THEME_FOLDERS[theme], "name": name, "obstacles": [], "traps": []}
+        for _ in range(obstacles):
+            layout["obstacles"].append(OBSTACLE.unpack_from(data, pos))
+            pos += OBSTACLE.size
+        for _ in range(traps):
+            layout["traps"].append(TRAP.unpack_from(data, pos))
+            pos += TRAP.size
+        return layout, pos
+
+    def get_room(self) -> dict:
+        # A room dict draw_world understands, built once per layout
+        layout = self.layout
+        if layout.get("room") is None:
+            bg, props = get_theme(layout["theme"])
+            layout["room"] = {
+                "bg_image": bg, "color": (34, 139, 34), "theme": layout["theme"], "name": layout["name"],
+                "blocks": make_walls(), "portals": make_portals(),
+                "obstacles": [make_obstacle(props[i], x, y, "tree") for i, x, y in layout["obstacles"]],
+                "traps": [pygame.Rect(cx - 20, cy - 20, 40, 40) for cx, cy in layout["traps"]],
+            }
+        return layout["room"]
+
+    def get_view(self, now: float) -> tuple:
+        """(room, players) as of `now`, moving things interpolated between snapshots.
+
+        players: player id -> (centre, fields); the room also gets foxes and carrots.
+        """
+        room = self.get_room()
+        since, before = self.previous
+        t = min(1.0, (now - self.arrived) * FPS / SNAPSHOT_EVERY) if since else 1.0
+
+        def centre(key, fields):
+            old = before.get(key)
+            x, y = fields[0], fields[1]
+            if old is not None:
+                x, y = old[0] + (x - old[0]) * t, old[1] + (y - old[1]) * t
+            return x * POS_STEP, y * POS_STEP
+
+        room["foxes"], room["fox_frames"], room["fox_directions"], room["carrots"] = [], [], [], []
+        players = {}
+        for key, fields in sorted(self.states.items()):
+            kind = key[0]
+            if kind == KIND_FOX:
+                fox = pygame.Rect(0, 0, FOX_WIDTH, FOX_HEIGHT)
+                fox.center = centre(key, fields)
+                room["foxes"].append(fox)
+                room["fox_frames"].append(fields[2] & 3)
+                room["fox_directions"].append(-1 if fields[2] & 4 else 1)
+            elif kind == KIND_CARROT:
+                carrot = pygame.Rect(0, 0, 16, 16)
+                carrot.center = (fields[0] * POS_STEP, fields[1] * POS_STEP)
+                room["carrots"].append(carrot)
+            else:
+                players[key[1]] = (centre(key, fields), fields)
+        return room, players
+
+    def get_stats(self) -> dict:
+        stats = dict(self.stats)
+        seconds = time.perf_counter() - self.started
+        stats["kB_per_s"] = round(stats["bytes_in"] / seconds / 1000, 2) if seconds else 0.0
+        stats["avg_snapshot_bytes"] = round(stats["bytes_in"] / stats["snapshots"]) if stats["snapshots"] else 0
+        return stats
+
+    def close(self):
+        self.send(MSG_BYE, 0)
+        self.sock.close()
+        print(f"[NET] Client {self.player_id}: {self.get_stats()}")
+
+
+def wander_buttons(rng: random.Random, state: dict) -> int:
+    # A bot for testing: a random direction every now and then, sometimes a dash
+    if state.get("until", 0) <= time.perf_counter():
+        state["until"] = time.perf_counter() + rng.uniform(0.3, 1.5)
+        state["buttons"] = rng.choice([0, BTN_LEFT, BTN_RIGHT, BTN_UP, BTN_DOWN, BTN_LEFT | BTN_UP,
+                                       BTN_LEFT | BTN_DOWN, BTN_RIGHT | BTN_UP, BTN_RIGHT | BTN_DOWN])
+    dash = BTN_DASH if rng.random() < 0.02 else 0
+    return state["buttons"] | dash
+
+
+def run_server(port: int = PORT, host: str = "127.0.0.1", seed=None, seconds=None):
+    init_headless()  # collision masks need a display mode
+    CoopServer(port, host, seed).run(seconds)
+
+
+def run_client(host: str, port: int = PORT, window: bool = True, bot: bool = False,
+               seconds=None, loss: float = 0.0):
+    if window:
+        from display import open_display, get_canvas, get_scale, present
+        from game import load_game_assets, make_bunny, draw_world, draw_hud
+        from render import RenderQueue, LAYER_ACTORS
+        from assets import get_scaled
+        from ui import load_font, draw_text_outline
+        pygame.init()
+        open_display()
+        pygame.display.set_caption("Bunnies co-op")
+        assets = load_game_assets()
+        queue = RenderQueue()
+        bunnies = {}  # player id -> Bunny
+    else:
+        init_headless()
+
+    client = CoopClient(host, port, loss)
+    clock = pygame.time.Clock()
+    rng = random.Random()
+    bot_state = {}
+    start = time.perf_counter()
+    try:
+        while seconds is None or time.perf_counter() - start < seconds:
+            dt_ms = clock.tick(FPS)
+            if any(event.type == pygame.QUIT for event in pygame.event.get()):
+                break
+            buttons = wander_buttons(rng, bot_state) if bot else read_keyboard()
+            client.send(MSG_INPUT, buttons)
+            client.poll()
+            if not window or client.layout is None:
+                continue
+
+            WIN = get_canvas()
+            room, players = client.get_view(time.perf_counter())
+            if client.player_id not in players:
+                continue
+            scale = get_scale()
+            for pid, ((x, y), fields) in players.items():
+                bunny = bunnies.get(pid)
+                if bunny is None:
+                    bunny = bunnies[pid] = make_bunny(pygame.Rect(x, y, 1, 1))
+                move = fields[2] >> 8 & 15
+                bunny.set_velocity(((move // 3 - 1) * PLAYER_SPEED, (move % 3 - 1) * PLAYER_SPEED))
+                bunny.update(dt_ms)
+                bunny.set_pos((x, y))
+
+            _, me = players[client.player_id]
+            flags = me[2]
+            view = {"invuln_timer": 1.0 if flags & FLAG_INVULN else 0.0, "score": me[3], "lives": me[4],
+                    "speed_boost": SPEED_BOOST_MULT_1 if flags & FLAG_BOOST else 1.0,
+                    "dash_cooldown": (flags >> 12) / 10}
+            draw_world(WIN, room, view, assets, bunnies[client.player_id], time.perf_counter() * 5.0, queue=queue)
+            for pid in players:
+                if pid != client.player_id:
+                    img = get_scaled(bunnies[pid].get_sprite()[0], scale)
+                    x, y = bunnies[pid].get_pos()
+                    queue.add(img, (round(x * scale) - img.get_width() // 2,
+                                    round(y * scale) - img.get_height() // 2), LAYER_ACTORS)
+            queue.flush(WIN)
+            draw_hud(WIN, load_font(30), room, view)
+            state = STATES[flags >> 4 & 3]
+            if state != "PLAYING":
+                msg = "YOU WON CHAMP" if state == "WON" else "YOU LOST LIL BRO"
+                draw_text_outline(WIN, msg, load_font(60), WHITE, BLACK, center=(WIDTH // 2, HEIGHT // 2),
+                                  outline_thickness=4)
+            present()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        client.close()
@@ -0,0 +1,138 @@
+import math
+import numpy as np
+import pygame
+
+from assets import get_scaled
+
+# kind -> colours, size (px), speed (px/s), life (s), gravity (px/s^2), drag (1/s)
+EFFECTS = {
+    "dash": {"colors": [(255, 255, 255), (200, 230, 255)], "size": 6,
+             "speed": (10, 40), "life": (0.25, 0.45), "gravity": 0, "drag": 3.0},
+    "carrot": {"colors": [(255, 140, 0), (255, 190, 60), (60, 170, 40)], "size": 7,
+               "speed": (120, 260), "life": (0.4, 0.7), "gravity": 500, "drag": 1.5},
+    "trap": {"colors": [(170, 170, 180), (110, 110, 120), (220, 60, 40)], "size": 5,
+             "speed": (200, 380), "life": (0.2, 0.45), "gravity": 900, "drag": 2.0},
+    "portal": {"colors": [(0, 230, 230), (160, 255, 255), (120, 80, 255)], "size": 8,
+               "speed": (60, 160), "life": (0.5, 0.9), "gravity": 0, "drag": 0.5},
+}
+FADE_STEPS = 8  # pre-made sprites per colour, from full to almost gone
+CAPACITY = 4096
+
+
+def _make_sprites(color, size: int) -> list:
+    # FADE_STEPS round sprites, each smaller and more transparent than the last
+    sprites = []
+    for step in range(FADE_STEPS):
+        t = 1 - step / FADE_STEPS
+        radius = max(1, round(size / 2 * (0.4 + 0.6 * t)))
+        surf = pygame.Surface((size, size), pygame.SRCALPHA)
+        pygame.draw.circle(surf, (*color, int(255 * t)), (size // 2, size // 2), radius)
+        sprites.append(surf)
+    return sprites
+
+
+class ParticlePool:
+    """Fixed-capacity particle system on preallocated numpy arrays.
+
+    Live particles are kept packed at the front of the arrays; update()
+    moves them all with array math and drops the dead ones in one go, and
+    draw() sends them to the screen with a single Surface.blits call. When
+    the pool is full, new particles are not created (see dropped).
+    """
+
+    def __init__(self, capacity: int = CAPACITY, effects=EFFECTS, seed=None):
+        self.capacity = capacity
+        self.count = 0
+        self.peak = 0
+        self.dropped = 0
+        self.rng = np.random.default_rng(seed)
+        self.pos = np.zeros((capacity, 2), dtype=np.float32)
+        self.vel = np.zeros((capacity, 2), dtype=np.float32)
+        self.life = np.zeros(capacity, dtype=np.float32)
+        self.max_life = np.ones(capacity, dtype=np.float32)
+        self.sprite = np.zeros(capacity, dtype=np.int32)  # first sprite of its colour
+        self.gravity = np.zeros(capacity, dtype=np.float32)
+        self.drag = np.zeros(capacity, dtype=np.float32)
+
+        # All sprites in one list; a colour owns FADE_STEPS consecutive entries.
+        self.sprites = []
+        self.kinds = {}  # kind -> (first sprite of each colour, config)
+        for kind, config in effects.items():
+            starts = []
+            for color in config["colors"]:
+                starts.append(len(self.sprites))
+                self.sprites.extend(_make_sprites(color, config["size"]))
+            self.kinds[kind] = (np.array(starts, dtype=np.int32), config)
+
+    def clear(self):
+        self.count = 0
+
+    def emit(self, kind: str, pos, amount: int, direction=None, spread: float = math.tau):
+        """Spawn `amount` particles of `kind` at `pos`.
+
+        They fly out within `spread` radians around `direction` (radians,
+        0 = right); without a direction they go every way.
+        """
+        n = min(amount, self.capacity - self.count)
+        self.dropped += amount - n
+        if n <= 0:
+            return
+        starts, config = self.kinds[kind]
+        s = slice(self.count, self.count + n)
+        rng = self.rng
+
+        base = rng.uniform(0, math.tau) if direction is None else direction
+        angle = base + rng.uniform(-spread / 2, spread / 2, n)
+        speed = rng.uniform(*config["speed"], n)
+        size = config["size"] / 2
+        self.pos[s] = (pos[0] - size, pos[1] - size)
+        self.pos[s] += rng.uniform(-4, 4, (n, 2))
+        self.vel[s, 0] = np.cos(angle) * speed
+        self.vel[s, 1] = np.sin(angle) * speed
+        self.life[s] = self.max_life[s] = rng.uniform(*config["life"], n)
+        self.sprite[s] = rng.choice(starts, n)
+        self.gravity[s] = config["gravity"]
+        self.drag[s] = config["drag"]
+        self.count += n
+        self.peak = max(self.peak, self.count)
+
+    def get_stats(self) -> dict:
+        return {"alive": self.count, "peak": self.peak, "dropped": self.dropped, "capacity": self.capacity}
+
+    def update(self, dt: float):
+        n = self.count
+        if n == 0:
+            return
+        vel = self.vel[:n]
+        vel *= np.maximum(0.0, 1.0 - self.drag[:n] * dt)[:, None]
+        vel[:, 1] += self.gravity[:n] * dt
+        self.pos[:n] += vel * dt
+        self.life[:n] -= dt
+
+        alive = self.life[:n] > 0
+        if not alive.all():
+            keep = np.flatnonzero(alive)
+            for arr in (self.pos, self.vel, self.life, self.max_life, self.sprite, self.gravity, self.drag):
+                arr[:len(keep)] = arr[keep]
+            self.count = len(keep)
+
+    def get_blits(self, offset=(0, 0), scale: float = 1.0) -> list:
+        # (sprite, top-left) for every live particle, ready for Surface.blits;
+        # positions and sprites are scaled by `scale`
+        n = self.count
+        if n == 0:
+            return []
+        fade = ((1.0 - self.life[:n] / self.max_life[:n]) * FADE_STEPS).astype(np.int32)
+        index = self.sprite[:n] + np.minimum(fade, FADE_STEPS - 1)
+        xy = (self.pos[:n] * scale + offset).astype(np.int32).tolist()
+        sprites = self.sprites
+        if scale != 1:
+            sprites = [get_scaled(sprite, scale) for sprite in sprites]
+        return [(sprites[i], p) for i, p in zip(index.tolist(), xy)]
+
+    def draw(self, surface: pygame.Surface, offset=(0, 0)) -> int:
+        # One blits call for every live particle; returns how many were drawn.
+        sprites = self.get_blits(offset)
+        if sprites:
+            surface.blits(sprites, doreturn=False)
+        return len(sprites)
@@ -0,0 +1,65 @@
+import pygame
+from heapq import heappush, heappop
+from settings import WIDTH, HEIGHT
+
+
+def blocked_cells(obstacles, cell_size) -> set:
+    # Grid cells that touch an obstacle. Blocks never move, so a room can
+    # compute this once and reuse it for every A* call.
+    blocked = set()
+    for x in range(WIDTH // cell_size):
+        for y in range(HEIGHT // cell_size):
+            cell = pygame.Rect(x * cell_size, y * cell_size, cell_size, cell_size)
+            if cell.collidelist(obstacles) != -1:
+                blocked.add((x, y))
+    return blocked
+
+
+def a_star(start, goal, obstacles, cell_size, blocked=None):
+    def heuristic(a, b):
+        return abs(a[0] - b[0]) + abs(a[1] - b[1])
+
+    if blocked is None:
+        blocked = blocked_cells(obstacles, cell_size)
+
+    def get_neighbors(pos):
+        x, y = pos
+        neighbors = [(x+1, y), (x-1, y), (x, y+1), (x, y-1)]
+        return [
+            n for n in neighbors
+            if 0 <= n[0] < (WIDTH // cell_size)
+            and 0 <= n[1] < (HEIGHT // cell_size)
+            and n not in blocked
+        ]
+
+    start_cell = (int(start[0] // cell_size), int(start[1] // cell_size))
+    goal_cell = (int(goal[0] // cell_size), int(goal[1] // cell_size))
+
+    frontier = []
+    heappush(frontier, (0, start_cell))
+    came_from = {start_cell: None}
+    cost_so_far = {start_cell: 0}
+
+    while frontier:
+        _, current = heappop(frontier)
+        if current == goal_cell:
+            break
+        for neighbor in get_neighbors(current):
+            new_cost = cost_so_far[current] + 1
+            if neighbor not in cost_so_far or new_cost < cost_so_far[neighbor]:
+                cost_so_far[neighbor] = new_cost
+                priority = new_cost + heuristic(goal_cell, neighbor)
+                heappush(frontier, (priority, neighbor))
+                came_from[neighbor] = current
+
+    if goal_cell not in came_from:
+        return []
+
+    path = []
+    current = goal_cell
+    while current != start_cell:
+        path.append((current[0] * cell_size + cell_size // 2,
+                     current[1] * cell_size + cell_size // 2))
+        current = came_from[current]
+    path.reverse()
+    return path
@@ -0,0 +1,134 @@
+"""Per-session profiling of the game loop, tagged with the game state.
+
+    python main.py --profile [DIR]                 sampling (default)
+    python main.py --profile DIR --profile-mode cprofile
+
+run_game makes one SessionProfiler per session and tells it every frame
+which state the game is in (PLAYING, PAUSED, TRANSITION, WON, LOST).
+
+"sample": a background thread records the game thread's Python stack
+every SAMPLE_INTERVAL seconds and writes <session>.collapsed, one
+"TAG;frame;frame;... count" line per distinct stack. That is the input
+flamegraph.pl, inferno and speedscope take; the tag is the root frame, so
+each state gets its own tower. Samples are wall-clock time, so the wait
+in Clock.tick shows up as run_game itself. Cheap enough to leave on.
+
+"cprofile": one cProfile.Profile per tag, switched when the tag changes,
+written as <session>.<TAG>.pstats (python -m pstats FILE). Exact call
+counts, but every Python call pays for it.
+"""
+import cProfile
+import os
+import pstats
+import sys
+import threading
+import time
+
+MODES = ("sample", "cprofile")
+SAMPLE_INTERVAL = 0.005  # seconds; the GIL switch interval is 5 ms anyway
+
+
+def profile_path(folder: str, seed: int) -> str:
+    # Output files share this prefix (see replay.recording_path)
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    return os.path.join(folder, f"session-{stamp}-{seed}")
+
+
+def game_tag(session, paused: bool) -> str:
+    if paused:
+        return "PAUSED"
+    if session["is_transitioning"]:
+        return "TRANSITION"
+    return session["state"]
+
+
+def _frame_name(code) -> str:
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SessionProfiler:
+    """Profiles the thread that creates it until close()."""
+
+    def __init__(self, prefix: str, mode: str = "sample", interval: float = SAMPLE_INTERVAL):
+        if mode not in MODES:
+            raise ValueError(f"profile mode must be one of {MODES}")
+        folder = os.path.dirname(prefix)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        self.prefix = prefix
+        self.mode = mode
+        self.tag = None  # nothing is recorded before the first set_tag
+        self.started = time.perf_counter()
+
+        if mode == "sample":
+            self.stacks = {}  # "TAG;outer;...;inner" -> samples
+            self.interval = interval
+            self.target = threading.get_ident()
+            self.running = True
+            self.sampler = threading.Thread(target=self._sample_loop, daemon=True)
+            self.sampler.start()
+        else:
+            self.profiles = {}  # tag -> cProfile.Profile
+            self.profile = None
+
+    def set_tag(self, tag: str):
+        if tag == self.tag:
+            return
+        self.tag = tag
+        if self.mode == "cprofile":
+            if self.profile is not None:
+                self.profile.disable()
+            self.profile = self.profiles.get(tag)
+            if self.profile is None:
+                self.profile = self.profiles[tag] = cProfile.Profile()
+            self.profile.enable()
+
+    def _sample_loop(self):
+        names = {}  # code object -> frame name
+        stacks = self.stacks
+        while self.running:
+            time.sleep(self.interval)
+            frame = sys._current_frames().get(self.target)
+            if self.tag is None:
+                continue
+            parts = []
+            while frame is not None:
+                code = frame.f_code
+                name = names.get(code)
+                if name is None:
+                    name = names[code] = _frame_name(code)
+                parts.append(name)
+                frame = frame.f_back
+            parts.append(self.tag)
+            key = ";".join(reversed(parts))
+            stacks[key] = stacks.get(key, 0) + 1
+
+    def close(self) -> list:
+        """Stop profiling and write the files; returns their paths."""
+        seconds = time.perf_counter() - self.started
+        if self.mode == "sample":
+            self.running = False
+            self.sampler.join()
+            paths = [self.prefix + ".collapsed"]
+            with open(paths[0], "w") as f:
+                for stack, count in sorted(self.stacks.items()):
+                    f.write(f"{stack} {count}\n")
+            per_tag = {}
+            for stack, count in self.stacks.items():
+                tag = stack.split(";", 1)[0]
+                per_tag[tag] = per_tag.get(tag, 0) + count
+        else:
+            if self.profile is not None:
+                self.profile.disable()
+            paths = []
+            per_tag = {}
+            for tag, profile in self.profiles.items():
+                stats = pstats.Stats(profile)
+                if not stats.total_calls:
+                    continue
+                paths.append(f"{self.prefix}.{tag}.pstats")
+                stats.dump_stats(paths[-1])
+                per_tag[tag] = round(stats.total_tt, 2)
+
+        print(f"[PROFILE] {self.mode} {seconds:.1f}s {per_tag} -> {', '.join(paths)}")
+        return paths
@@ -0,0 +1,172 @@
+import math
+from collections import deque
+
+from foxes import nav_blocked
+from pathfinding import a_star
+import settings
+from settings import WIDTH, HEIGHT, BLOCK_SIZE
+import world
+from world import find_room, new_entity_id
+
+# Foxes follow the player through portals. Planning is hierarchical:
+#   rooms   a breadth-first search over explored rooms, outwards from the
+#           player's room, gives every room within PURSUIT_DEPTH the portal
+#           that leads one room closer (cached until the player moves on
+#           or a room is explored)
+#   inside  a fox walks to that portal on an A* path. Foxes that came in
+#           through a portal use a path cached per room and (entry, exit)
+#           pair, so a long chase costs dictionary lookups, not A* runs
+PURSUIT_DEPTH = 2  # rooms away from the player that still give chase
+PURSUIT_SPEED_RATIO = 0.8  # of FOX_SPEED: a little slower than in the player's room
+
+# side -> coords offset, as in world.portal_transition
+PORTAL_OFFSETS = {"top": (0, 1), "bottom": (0, -1), "left": (-1, 0), "right": (1, 0)}
+OPPOSITE = {"top": "bottom", "bottom": "top", "left": "right", "right": "left"}
+
+
+def door_cells(room) -> dict:
+    # The walls block the edge cells, so each portal is reached through the
+    # free cell closest to it (its "door"). Cached on the room.
+    doors = room.get("doors")
+    if doors is None:
+        blocked = nav_blocked(room)
+        free = [(x, y) for x in range(WIDTH // BLOCK_SIZE) for y in range(HEIGHT // BLOCK_SIZE)
+                if (x, y) not in blocked]
+        doors = {}
+        for side, portal in room["portals"].items():
+            px, py = portal.center
+            doors[side] = min(free, key=lambda c: (c[0] * BLOCK_SIZE + BLOCK_SIZE // 2 - px) ** 2
+                              + (c[1] * BLOCK_SIZE + BLOCK_SIZE // 2 - py) ** 2)
+        room["doors"] = doors
+    return doors
+
+
+def door(room, side: str):
+    cx, cy = door_cells(room)[side]
+    return (cx * BLOCK_SIZE + BLOCK_SIZE // 2, cy * BLOCK_SIZE + BLOCK_SIZE // 2)
+
+
+def get_routes(session) -> dict:
+    """{coords: portal side} for explored rooms within PURSUIT_DEPTH of the player.
+
+    Taking that portal brings a fox one room closer to the player. The
+    player's own room is not in the table.
+    """
+    rooms = session.get("rooms")
+    key = (session["coords"], len(world.room_data if rooms is None else rooms))
+    cached = session.get("pursuit_routes")
+    if cached is not None and cached[0] == key:
+        return cached[1]
+
+    routes = {}
+    start = session["coords"]
+    seen = {start}
+    queue = deque([(start, 0)])
+    while queue:
+        (x, y), depth = queue.popleft()
+        if depth == PURSUIT_DEPTH:
+            continue
+        for side, (ox, oy) in PORTAL_OFFSETS.items():
+            coords = (x + ox, y + oy)
+            if coords in seen or find_room(coords, rooms) is None:
+                continue
+            seen.add(coords)
+            routes[coords] = OPPOSITE[side]  # back the way the search came
+            queue.append((coords, depth + 1))
+    session["pursuit_routes"] = (key, routes)
+    return routes
+
+
+def portal_path(room, entry: str, exit_side: str) -> list:
+    # Door-to-door path through a room, computed once per (entry, exit).
+    paths = room.setdefault("portal_paths", {})
+    key = (entry, exit_side)
+    if key not in paths:
+        paths[key] = a_star(door(room, entry), door(room, exit_side),
+                            room["blocks"], BLOCK_SIZE, nav_blocked(room))
+    return paths[key]
+
+
+def _cell(pos):
+    return (int(pos[0] // BLOCK_SIZE), int(pos[1] // BLOCK_SIZE))
+
+
+def _plan(room, i: int, exit_side: str) -> list:
+    fox = room["foxes"][i]
+    goal = door(room, exit_side)
+    path = room["fox_paths"][i]
+    if path and path[-1] == goal:
+        return path
+    cell = _cell(fox.center)
+    # (cell, exit) pairs A* found no path from; retried once the fox moves
+    no_route = room.setdefault("no_route", set())
+    if (cell, exit_side) in no_route:
+        path = []
+    else:
+        for entry, door_cell in door_cells(room).items():
+            if cell == door_cell and entry != exit_side:
+                path = list(portal_path(room, entry, exit_side))
+                break
+        else:
+            path = a_star(fox.center, goal, room["blocks"], BLOCK_SIZE, nav_blocked(room))
+            if not path:
+                no_route.add((cell, exit_side))
+    room["fox_paths"][i] = path
+    return path
+
+
+def _take_fox(room, i: int) -> tuple:
+    room["fox_ids"].pop(i)  # _put_fox gives it one in the next room
+    return (room["foxes"].pop(i), room["fox_frames"].pop(i), room["fox_directions"].pop(i),
+            room["fox_paths"].pop(i), room["fox_anim_timer"].pop(i))
+
+
+def _put_fox(room, fox, frame: int, direction: int, timer: float, side: str):
+    fox.center = door(room, side)
+    room["foxes"].append(fox)
+    room["fox_frames"].append(frame)
+    room["fox_directions"].append(direction)
+    room["fox_paths"].append([])
+    room["fox_anim_timer"].append(timer)
+    room["fox_ids"].append(new_entity_id(room))
+
+
+def pursue(room, coords, exit_side: str, elapsed: float, rooms=None) -> int:
+    """Walk every fox in a room towards `exit_side` for `elapsed` seconds.
+
+    Foxes that reach the portal go through it into the next room, coming
+    out at its door on the opposite side. Returns how many went through.
+    """
+    budget = settings.FOX_SPEED * PURSUIT_SPEED_RATIO * elapsed
+    goal_cell = door_cells(room)[exit_side]
+    leaving = []
+    for i, fox in enumerate(room["foxes"]):
+        path = _plan(room, i, exit_side)
+        x, y = fox.center
+        left = budget
+        while path and left > 0:
+            tx, ty = path[0]
+            distance = math.hypot(tx - x, ty - y)
+            if distance <= left:
+                x, y = tx, ty
+                left -= distance
+                path.pop(0)
+            else:
+                x += (tx - x) / distance * left
+                y += (ty - y) / distance * left
+                left = 0
+        if int(x) != fox.centerx:
+            room["fox_directions"][i] = 1 if x > fox.centerx else -1
+        fox.center = (int(x), int(y))
+        if not path and _cell(fox.center) == goal_cell:
+            leaving.append(i)
+
+    if leaving:
+        ox, oy = PORTAL_OFFSETS[exit_side]
+        target = find_room((coords[0] + ox, coords[1] + oy), rooms)
+        if target is None:
+            return 0
+        for i in reversed(leaving):
+            fox, frame, direction, _, timer = _take_fox(room, i)
+            _put_fox(target, fox, frame, direction, timer, OPPOSITE[exit_side])
+    return len(leaving)
@@ -0,0 +1,59 @@
+import pygame
+
+# Draw layers, back to front. Within LAYER_ACTORS sprites are drawn from the
+# top of the screen down, so whoever stands lower overlaps the others.
+LAYER_PROPS = 0    # obstacles
+LAYER_ITEMS = 1    # traps, carrots
+LAYER_ACTORS = 2   # bunny, foxes
+LAYER_EFFECTS = 3  # particles
+LAYER_COUNT = 4
+Y_SORTED = (LAYER_ACTORS,)
+
+
+def _feet(entry) -> int:
+    surface, (_, y) = entry
+    return y + surface.get_height()
+
+
+class RenderQueue:
+    """Collects (surface, top-left) sprites per layer for one frame.
+
+    flush() sorts what needs sorting and hands each layer to the target in a
+    single Surface.blits call. Statistics cover the last flushed frame.
+    """
+
+    def __init__(self):
+        self.layers = [[] for _ in range(LAYER_COUNT)]
+        self.frames = 0
+        self.last_blits = 0
+        self.last_calls = 0
+        self.total_blits = 0
+
+    def add(self, surface: pygame.Surface, pos, layer: int):
+        self.layers[layer].append((surface, pos))
+
+    def extend(self, layer: int, sprites):
+        # sprites: (surface, top-left) pairs, e.g. ParticlePool.get_blits()
+        self.layers[layer].extend(sprites)
+
+    def flush(self, target: pygame.Surface) -> int:
+        """Draw and empty every layer; returns the number of sprites drawn."""
+        blits = calls = 0
+        for layer, sprites in enumerate(self.layers):
+            if not sprites:
+                continue
+            if layer in Y_SORTED:
+                sprites.sort(key=_feet)
+            target.blits(sprites, doreturn=False)
+            blits += len(sprites)
+            calls += 1
+            sprites.clear()
+        self.frames += 1
+        self.last_blits = blits
+        self.last_calls = calls
+        self.total_blits += blits
+        return blits
+
+    def get_stats(self) -> dict:
+        return {"blits": self.last_blits, "blits_calls": self.last_calls,
+                "blits_per_frame": self.total_blits / self.frames if self.frames else 0.0}
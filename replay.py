@@ -0,0 +1,146 @@
+import os
+import struct
+import time
+import zlib
+import pygame
+
+from session import new_session, step_session, current_room, init_headless
+from settings import WIDTH, HEIGHT, PLAYER_SPEED
+
+# File layout (little endian):
+#   header  "BUNR", version, seed, foxes/obstacles/carrots/traps (-1 = game default)
+#   frames  one (buttons: u8, dt_ms: u16) per simulated frame
+#   footer  frame count, state checksum, "END!"  (missing if the game crashed)
+MAGIC = b"BUNR"
+VERSION = 1
+HEADER = struct.Struct("<4sBQiiii")
+FRAME = struct.Struct("<BH")
+FOOTER = struct.Struct("<II4s")
+FOOTER_MAGIC = b"END!"
+ROOM_OPTION_KEYS = ("foxes", "obstacles", "carrots", "traps")
+
+
+def session_checksum(session) -> int:
+    # Cheap fingerprint of the simulation state, compared after a replay.
+    room = current_room(session)
+    state = (session["frame"], session["score"], session["lives"], session["state"],
+             session["coords"], tuple(session["player"]),
+             tuple(tuple(f) for f in room["foxes"]), len(room["carrots"]))
+    return zlib.crc32(repr(state).encode())
+
+
+class Recorder:
+    """Writes the inputs of one session to disk, frame by frame."""
+
+    def __init__(self, path: str, session):
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        self.path = path
+        self.session = session
+        self.frames = 0
+        self.file = open(path, "wb")
+        options = [session["room_options"].get(k) for k in ROOM_OPTION_KEYS]
+        self.file.write(HEADER.pack(MAGIC, VERSION, session["seed"],
+                                    *[-1 if v is None else v for v in options]))
+
+    def add(self, buttons: int, dt_ms: int):
+        self.file.write(FRAME.pack(buttons, dt_ms))
+        self.frames += 1
+
+    def close(self):
+        if self.file is None:
+            return
+        self.file.write(FOOTER.pack(self.frames, session_checksum(self.session), FOOTER_MAGIC))
+        self.file.close()
+        self.file = None
+        print(f"[REPLAY] Recorded {self.frames} frames to {self.path}")
+
+
+def recording_path(folder: str, seed: int) -> str:
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    return os.path.join(folder, f"session-{stamp}-{seed}.bunrec")
+
+
+def load_recording(path: str) -> dict:
+    with open(path, "rb") as f:
+        data = f.read()
+
+    magic, version, seed, *options = HEADER.unpack_from(data, 0)
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a recording")
+    if version != VERSION:
+        raise ValueError(f"{path} has recording version {version}, expected {VERSION}")
+
+    body = data[HEADER.size:]
+    frame_count = checksum = None
+    if len(body) >= FOOTER.size and body[-4:] == FOOTER_MAGIC:
+        frame_count, checksum, _ = FOOTER.unpack_from(body, len(body) - FOOTER.size)
+        body = body[:-FOOTER.size]
+    body = body[:len(body) - len(body) % FRAME.size]
+
+    return {
+        "seed": seed,
+        "room_options": {k: v for k, v in zip(ROOM_OPTION_KEYS, options) if v != -1},
+        "frames": list(FRAME.iter_unpack(body)),
+        "frame_count": frame_count,
+        "checksum": checksum,
+    }
+
+
+def replay(path: str, window=False):
+    """Play a recording back as fast as possible and check it ends the same way.
+
+    Headless by default; with window=True every frame is drawn too, which is
+    what you want when profiling rendering.
+    """
+    recording = load_recording(path)
+
+    if window:
+        from game import load_game_assets, make_bunny, draw_world, draw_overlays, draw_hud
+        pygame.init()
+        WIN = pygame.display.set_mode((WIDTH, HEIGHT))
+        pygame.display.set_caption("Bunnies replay")
+        FONT = pygame.font.Font(None, 30)
+        assets = load_game_assets()
+    else:
+        init_headless()
+
+    session = new_session(seed=recording["seed"], room_options=recording["room_options"])
+    if window:
+        bunny = make_bunny(session["player"])
+
+    frame_ms = []
+    start = time.perf_counter()
+    for buttons, dt_ms in recording["frames"]:
+        t0 = time.perf_counter()
+        dt = dt_ms / 1000.0
+        step_session(session, buttons, dt)
+        if window:
+            pygame.event.pump()
+            room = current_room(session)
+            ix, iy = session["move"]
+            bunny.set_velocity((ix * PLAYER_SPEED, iy * PLAYER_SPEED))
+            bunny.update(dt_ms)
+            bunny.set_pos(session["player"].center)
+            draw_world(WIN, room, session, assets, bunny, session["frame"] / 12.0)
+            draw_overlays(WIN, session, 0.0)
+            draw_hud(WIN, FONT, room, session)
+            pygame.display.flip()
+        frame_ms.append((time.perf_counter() - t0) * 1000.0)
+    elapsed = time.perf_counter() - start
+
+    from stress import print_frame_report
+    print(f"[REPLAY] {path}: {len(recording['frames'])} frames in {elapsed:.2f}s "
+          f"(seed {recording['seed']})")
+    print(f"[REPLAY] end state: {session['state']}, score {session['score']}, "
+          f"lives {session['lives']}, room {session['coords']}")
+    print_frame_report("[REPLAY] frame time (ms)", {"frame": frame_ms})
+
+    if recording["checksum"] is None:
+        print("[REPLAY] recording has no footer (game did not exit cleanly); not verified")
+        return True
+    same = session_checksum(session) == recording["checksum"]
+    print("[REPLAY] end state matches the recording" if same
+          else "[REPLAY] end state DIFFERS from the recording")
+    return same
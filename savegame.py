@@ -0,0 +1,325 @@
+import mmap
+import os
+import random
+import struct
+import sys
+from array import array
+from itertools import chain
+import numpy as np
+import pygame
+
+import world
+from assets import get_prop, get_theme
+from world import reset_world, set_room_loader
+
+# File layout (little endian), version 2:
+#   HEADER    "BUNS", version, room count
+#   SESSION   score, lives, position, timers, ... (see SESSION below)
+#   RNG       625 x u32 Mersenne Twister state + gauss_next (NaN = None)
+#   STRINGS   u16 count, then (u8 length, utf-8 bytes) each; themes, prop
+#             file names and room names are stored once and referred to by id
+#   INDEX     per room: x, y, byte offset, byte length
+#   ROOMS     per room: ROOM header, then int32 rect arrays, fox state and
+#             the session clock the room was last simulated at (lod.py)
+#
+# Surfaces are never written: obstacles keep the prop's file name and the
+# room keeps its theme, and both are loaded again from images/ on resume.
+# Rooms are decoded from a memory map the first time the player enters them.
+MAGIC = b"BUNS"
+VERSION = 2
+HEADER = struct.Struct("<4sHI")
+SESSION = struct.Struct("<QIii2i4i5dBBBBB4iid")
+RNG_WORDS = 625
+INDEX_ENTRY = struct.Struct("<iiQI")
+ROOM = struct.Struct("<HH3BxHHHHH")
+
+STATES = ["PLAYING", "WON", "LOST"]
+PORTAL_SIDES = ["top", "bottom", "left", "right"]
+ROOM_OPTION_KEYS = ("foxes", "obstacles", "carrots", "traps")
+OBSTACLE_COLUMNS = 10  # asset id, kind id, draw rect, collision rect
+
+
+def _packed(typecode: str, values) -> bytes:
+    # array() packs a flat iterable in one C call; the file is little endian.
+    arr = array(typecode, values)
+    if sys.byteorder == "big":
+        arr.byteswap()
+    return arr.tobytes()
+
+
+class _Strings:
+    def __init__(self):
+        self.ids = {}
+        self.items = []
+
+    def get_id(self, text: str) -> int:
+        if text not in self.ids:
+            self.ids[text] = len(self.items)
+            self.items.append(text)
+        return self.ids[text]
+
+    def to_bytes(self) -> bytes:
+        out = [struct.pack("<H", len(self.items))]
+        for text in self.items:
+            raw = text.encode("utf-8")
+            out.append(struct.pack("<B", len(raw)) + raw)
+        return b"".join(out)
+
+
+# One string table for the whole process, so the static part of a room can
+# be packed once and reused by every later save.
+_strings = _Strings()
+
+
+def _pack_room(room) -> bytes:
+    obstacles = room.get("obstacles", [])
+    foxes = room["foxes"]
+    header = ROOM.pack(_strings.get_id(room["theme"]), _strings.get_id(room["name"]), *room["color"],
+                       len(room["blocks"]), len(obstacles), len(room["traps"]),
+                       len(foxes), len(room["carrots"]))
+
+    # Portals, blocks, obstacles and traps never change after generate_room.
+    static = room.get("packed_static")
+    if static is None:
+        obstacle_rows = chain.from_iterable(
+            (_strings.get_id(ob.get("asset", "")), _strings.get_id(ob["kind"]), *ob["draw_rect"], *ob["coll_rect"])
+            for ob in obstacles)
+        static = _packed("i", chain(
+            chain.from_iterable(room["portals"][side] for side in PORTAL_SIDES),
+            chain.from_iterable(room["blocks"]),
+            obstacle_rows,
+            chain.from_iterable(room["traps"]),
+        ))
+        room["packed_static"] = static
+
+    dynamic = _packed("i", chain(
+        chain.from_iterable(foxes),
+        chain.from_iterable(room["carrots"]),
+        room["fox_frames"],
+        room["fox_directions"],
+    ))
+    # NaN: the room was never simulated since it was generated
+    times = chain(room["fox_anim_timer"], [room.get("lod_time", float("nan"))])
+    return header + static + dynamic + _packed("d", times)
+
+
+def save_game(path: str, session):
+    """Write the session and every explored room to `path`."""
+    # Rooms from an earlier save that were never entered are still on disk;
+    # decode them now so they are not lost when that file is replaced.
+    loader = getattr(world.room_loader, "__self__", None)
+    if isinstance(loader, SaveFile):
+        for coords in loader.pending_coords():
+            world.room_data[coords] = loader.load_room(coords)
+        release_save()  # a mapped file cannot be replaced on Windows
+
+    rooms = [(coords, _pack_room(room)) for coords, room in world.room_data.items()]
+
+    version, mt_state, gauss_next = session["rng"].getstate()
+    options = [session["room_options"].get(k) for k in ROOM_OPTION_KEYS]
+    pending = session["pending_portal_side"]
+    session_bytes = SESSION.pack(
+        session["seed"], session["frame"], session["score"], session["lives"],
+        *session["coords"], *tuple(session["player"]),
+        session["trap_cooldown"], session["invuln_timer"],
+        session["dash_timer"], session["dash_cooldown"], session["speed_boost"],
+        STATES.index(session["state"]), session["transition_alpha"],
+        0 if session["transition_phase"] == "out" else 1,
+        0 if pending is None else PORTAL_SIDES.index(pending) + 1,
+        int(session["is_transitioning"]),
+        *[-1 if v is None else v for v in options],
+        session["fox_frame_count"],
+        session["clock"],
+    )
+    rng_bytes = (_packed("I", mt_state)
+                 + struct.pack("<d", float("nan") if gauss_next is None else gauss_next))
+    string_bytes = _strings.to_bytes()
+
+    offset = (HEADER.size + len(session_bytes) + len(rng_bytes) + len(string_bytes)
+              + INDEX_ENTRY.size * len(rooms))
+    index = []
+    for (x, y), data in rooms:
+        index.append(INDEX_ENTRY.pack(x, y, offset, len(data)))
+        offset += len(data)
+
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(rooms)))
+        f.write(session_bytes)
+        f.write(rng_bytes)
+        f.write(string_bytes)
+        f.write(b"".join(index))
+        f.write(b"".join(data for _, data in rooms))
+    os.replace(tmp, path)
+
+
+class SaveFile:
+    """Memory-mapped save file; rooms are decoded on demand."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, room_count = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a save file")
+        if version != VERSION:
+            raise ValueError(f"{path} has save version {version}, expected {VERSION}")
+
+        pos = HEADER.size
+        self.session_fields = SESSION.unpack_from(self.map, pos)
+        pos += SESSION.size
+        self.mt_state = tuple(np.frombuffer(self.map, dtype="<u4", count=RNG_WORDS, offset=pos).tolist())
+        pos += RNG_WORDS * 4
+        (self.gauss_next,) = struct.unpack_from("<d", self.map, pos)
+        pos += 8
+
+        (count,) = struct.unpack_from("<H", self.map, pos)
+        pos += 2
+        self.strings = []
+        for _ in range(count):
+            length = self.map[pos]
+            self.strings.append(bytes(self.map[pos + 1:pos + 1 + length]).decode("utf-8"))
+            pos += 1 + length
+
+        self.index = {}
+        for _ in range(room_count):
+            x, y, offset, length = INDEX_ENTRY.unpack_from(self.map, pos)
+            self.index[(x, y)] = (offset, length)
+            pos += INDEX_ENTRY.size
+
+    def pending_coords(self):
+        return list(self.index)
+
+    def close(self):
+        # Unmap the file; rooms not decoded yet are gone after this
+        if self.map is not None:
+            self.map.close()
+            self.map = None
+        self.index = {}
+
+    def session(self) -> dict:
+        (seed, frame, score, lives, cx, cy, px, py, pw, ph,
+         trap_cooldown, invuln_timer, dash_timer, dash_cooldown, speed_boost,
+         state, transition_alpha, phase, pending, is_transitioning,
+         *rest) = self.session_fields
+        options, fox_frame_count, clock = rest[:4], rest[4], rest[5]
+
+        rng = random.Random()
+        gauss_next = None if self.gauss_next != self.gauss_next else self.gauss_next  # NaN -> None
+        rng.setstate((3, self.mt_state, gauss_next))
+
+        return {
+            "seed": seed,
+            "rng": rng,
+            "room_options": {k: v for k, v in zip(ROOM_OPTION_KEYS, options) if v != -1},
+            "fox_frame_count": fox_frame_count,
+            "frame": frame,
+            "clock": clock,
+            "player": pygame.Rect(px, py, pw, ph),
+            "coords": (cx, cy),
+            "score": score,
+            "lives": lives,
+            "state": STATES[state],
+            "move": (0.0, 0.0),
+            "trap_cooldown": trap_cooldown,
+            "invuln_timer": invuln_timer,
+            "dash_timer": dash_timer,
+            "dash_cooldown": dash_cooldown,
+            "speed_boost": speed_boost,
+            "transition_alpha": transition_alpha,
+            "is_transitioning": bool(is_transitioning),
+            "transition_phase": "out" if phase == 0 else "in",
+            "pending_portal_side": None if pending == 0 else PORTAL_SIDES[pending - 1],
+        }
+
+    def load_room(self, coords):
+        entry = self.index.pop(coords, None)
+        if entry is None:
+            return None
+        offset, _ = entry
+
+        theme_id, name_id, r, g, b, n_blocks, n_obstacles, n_traps, n_foxes, n_carrots = \
+            ROOM.unpack_from(self.map, offset)
+        pos = offset + ROOM.size
+
+        def ints(count, columns=4):
+            nonlocal pos
+            arr = np.frombuffer(self.map, dtype="<i4", count=count * columns, offset=pos)
+            pos += count * columns * 4
+            return arr.reshape(count, columns).tolist()
+
+        portals = ints(4)
+        blocks = ints(n_blocks)
+        obstacle_rows = ints(n_obstacles, OBSTACLE_COLUMNS)
+        traps = ints(n_traps)
+        foxes = ints(n_foxes)
+        carrots = ints(n_carrots)
+        fox_frames = np.frombuffer(self.map, dtype="<i4", count=n_foxes, offset=pos).tolist()
+        pos += n_foxes * 4
+        fox_directions = np.frombuffer(self.map, dtype="<i4", count=n_foxes, offset=pos).tolist()
+        pos += n_foxes * 4
+        fox_anim_timer = np.frombuffer(self.map, dtype="<f8", count=n_foxes, offset=pos).tolist()
+        pos += n_foxes * 8
+        (lod_time,) = struct.unpack_from("<d", self.map, pos)
+
+        theme = self.strings[theme_id]
+        bg_image = get_theme(theme)[0]
+        obstacles = []
+        for row in obstacle_rows:
+            asset = self.strings[row[0]]
+            prop = get_prop(theme, asset)
+            if prop is None:
+                print(f"[SAVE] Missing prop {theme}/{asset}, skipping it")
+                continue
+            obstacles.append({"img": prop.img, "draw_rect": pygame.Rect(row[2:6]),
+                              "coll_rect": pygame.Rect(row[6:10]),
+                              "kind": self.strings[row[1]], "asset": asset, "prop": prop})
+
+        room = {
+            "blocks": [pygame.Rect(rect) for rect in blocks],
+            "obstacles": obstacles,
+            "traps": [pygame.Rect(rect) for rect in traps],
+            "foxes": [pygame.Rect(rect) for rect in foxes],
+            "carrots": [pygame.Rect(rect) for rect in carrots],
+            "color": (r, g, b),
+            "bg_image": bg_image,
+            "theme": theme,
+            "portals": {side: pygame.Rect(rect) for side, rect in zip(PORTAL_SIDES, portals)},
+            "name": self.strings[name_id],
+            "fox_frames": fox_frames,
+            "fox_directions": fox_directions,
+            "fox_paths": [[] for _ in foxes],
+            "fox_anim_timer": fox_anim_timer,
+            "fox_ids": list(range(n_foxes)),
+            "carrot_ids": list(range(n_foxes, n_foxes + n_carrots)),
+            "next_id": n_foxes + n_carrots,
+        }
+        if lod_time == lod_time:  # not NaN
+            room["lod_time"] = lod_time
+        if not self.index:
+            self.close()  # every room is decoded; let go of the file
+        return room
+
+
+def load_game(path: str) -> dict:
+    """Resume a saved game: returns the session and hooks its rooms into world."""
+    save = SaveFile(path)
+    reset_world()
+    set_room_loader(save.load_room)
+    return save.session()
+
+
+def release_save():
+    """Close the save file load_game resumed from, if it is still open.
+
+    Rooms it still held are dropped; save_game decodes them first.
+    """
+    loader = getattr(world.room_loader, "__self__", None)
+    if isinstance(loader, SaveFile):
+        loader.close()
+    set_room_loader(None)
@@ -0,0 +1,274 @@
+import math
+import os
+import random
+import pygame
+
+from foxes import update_foxes, touching_fox
+from triggers import get_triggers, collect_carrot
+from lod import update_world
+from assets import get_collision_masks
+from world import generate_room, move_with_collision, portal_transition, reset_world, get_block_shapes, new_entity_id
+import settings
+from settings import (
+    WIDTH, HEIGHT,
+    PLAYER_WIDTH, PLAYER_HEIGHT, PLAYER_SPEED,
+    LIVES_START, KNOCKBACK_PIXELS,
+    DASH_SPEED, DASH_DURATION,
+    SPEED_BOOST_SCORE_1, SPEED_BOOST_MULT_1,
+    PRECISE_COLLISION,
+)
+
+# Input buttons, packed into one int per frame
+BTN_LEFT = 1
+BTN_RIGHT = 2
+BTN_UP = 4
+BTN_DOWN = 8
+BTN_DASH = 16
+
+FOX_FRAME_COUNT = 4  # images/fox/walk1..walk4
+TRANSITION_STEP = 15  # fade alpha per frame
+
+
+def init_headless():
+    # Run pygame without a window or sound card. convert_alpha() in
+    # generate_room still needs a display mode, so open a 1x1 dummy one.
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    pygame.init()
+    if pygame.display.get_surface() is None:
+        pygame.display.set_mode((1, 1))
+
+
+def read_keyboard() -> int:
+    keys = pygame.key.get_pressed()
+    buttons = 0
+    if keys[pygame.K_a] or keys[pygame.K_LEFT]:
+        buttons |= BTN_LEFT
+    if keys[pygame.K_d] or keys[pygame.K_RIGHT]:
+        buttons |= BTN_RIGHT
+    if keys[pygame.K_w] or keys[pygame.K_UP]:
+        buttons |= BTN_UP
+    if keys[pygame.K_s] or keys[pygame.K_DOWN]:
+        buttons |= BTN_DOWN
+    if keys[pygame.K_SPACE]:
+        buttons |= BTN_DASH
+    return buttons
+
+
+def new_session(seed=None, room_options=None, fox_frame_count: int = FOX_FRAME_COUNT,
+                rooms=None) -> dict:
+    """Start a fresh game: clears the world and puts the player in room (0, 0).
+
+    All game randomness goes through the session's own Random, so the same
+    seed and the same inputs give the same game. Pass a dict as `rooms` to
+    give the session a world of its own instead of the shared one, so
+    several sessions can run side by side (such sessions are not saved).
+    """
+    if rooms is None:
+        reset_world()
+    if seed is None:
+        seed = random.randrange(2 ** 32)
+    return {
+        "seed": seed,
+        "rng": random.Random(seed),
+        "room_options": dict(room_options or {}),
+        "fox_frame_count": fox_frame_count,
+        "rooms": rooms,
+        "frame": 0,
+        "clock": 0.0,  # seconds of play, for rooms the player is not in (lod.py)
+
+        "player": pygame.Rect(WIDTH // 2, HEIGHT // 2, PLAYER_WIDTH, PLAYER_HEIGHT),
+        "coords": (0, 0),
+        "score": 0,
+        "lives": LIVES_START,
+        "state": "PLAYING",
+        "move": (0.0, 0.0),
+        "event_at": {},  # "carrot" / "trap" -> centres of the ones hit in the last step
+
+        # trap + invincibility
+        "trap_cooldown": 0.0,
+        "invuln_timer": 0.0,
+
+        # dash + speed boost
+        "dash_timer": 0.0,
+        "dash_cooldown": 0.0,
+        "speed_boost": 1.0,
+
+        # room transition fade
+        "transition_alpha": 0,
+        "is_transitioning": False,
+        "transition_phase": "out",
+        "pending_portal_side": None,
+    }
+
+
+def current_room(session) -> dict:
+    return generate_room(session["coords"], session["rng"], rooms=session.get("rooms"),
+                         **session["room_options"])
+
+
+def _knockback(player: pygame.Rect, source_center, blocks, pixels: int, rng=random,
+               mask=None, shapes=None):
+    sx, sy = source_center
+    px, py = player.centerx, player.centery
+    vx, vy = (px - sx), (py - sy)
+
+    if vx == 0 and vy == 0:
+        vx = rng.choice([-1, 1])
+        vy = rng.choice([-1, 1])
+
+    length = math.hypot(vx, vy)
+    nx, ny = vx / length, vy / length
+    move_with_collision(player, blocks, nx * pixels, ny * pixels, mask, shapes)
+
+
+def _lose_life(session, events: list):
+    session["lives"] -= 1
+    if session["lives"] <= 0:
+        session["state"] = "LOST"
+        events.append("lost")
+
+
+def step_session(session, buttons: int, dt: float, world: bool = True) -> list:
+    """Advance the game by one frame and return what happened.
+
+    Events: "portal", "room", "trap", "fox_hit", "carrot", "won", "lost".
+    session["event_at"] then holds where each "carrot" and "trap" event
+    happened, in event order (the collected carrot's or the trap's centre).
+    Call this only while the game is not paused; nothing happens once the
+    session is WON or LOST. With world=False the foxes and the rooms around
+    are left alone (another player sharing the world moved them this frame)
+    and the player is only tested against them.
+    """
+    events = []
+    event_at = session["event_at"] = {}
+    if session["state"] != "PLAYING":
+        return events
+
+    session["frame"] += 1
+    session["clock"] += dt
+    rng = session["rng"]
+    player = session["player"]
+    room = current_room(session)
+
+    # Pixel masks for the narrow phase; None means plain rect collision.
+    masks = get_collision_masks() if PRECISE_COLLISION else None
+    shapes = get_block_shapes(room) if masks else None
+    player_mask = masks["bunny"] if masks else None
+
+    # timers decay
+    for key in ("trap_cooldown", "invuln_timer", "dash_timer", "dash_cooldown"):
+        if session[key] > 0:
+            session[key] = max(0.0, session[key] - dt)
+
+    # rooms around this one move on at a lower level of detail
+    if world:
+        update_world(session, room)
+
+    ix = iy = 0.0
+    if not session["is_transitioning"]:
+        if buttons & BTN_LEFT:
+            ix = -1.0
+        if buttons & BTN_RIGHT:
+            ix = 1.0
+        if buttons & BTN_UP:
+            iy = -1.0
+        if buttons & BTN_DOWN:
+            iy = 1.0
+
+        if buttons & BTN_DASH and session["dash_cooldown"] <= 0 and (ix != 0.0 or iy != 0.0):
+            session["dash_timer"] = DASH_DURATION
+            session["dash_cooldown"] = settings.DASH_COOLDOWN
+
+        session["speed_boost"] = SPEED_BOOST_MULT_1 if session["score"] >= SPEED_BOOST_SCORE_1 else 1.0
+
+        final_speed = (DASH_SPEED if session["dash_timer"] > 0 else PLAYER_SPEED) * session["speed_boost"]
+        move_with_collision(
+            player, room["blocks"], ix * final_speed * dt, iy * final_speed * dt,
+            player_mask, shapes)
+
+        # Portals, traps and carrots are looked up in the room's trigger grid,
+        # which only checks the cells under the player.
+        triggers = get_triggers(room)
+        for kind, _, side in triggers.entered(player):
+            if kind == "portal":
+                session["is_transitioning"] = True
+                session["transition_phase"] = "out"
+                session["transition_alpha"] = 0
+                session["pending_portal_side"] = side
+                events.append("portal")
+                break
+
+        # TRAPS
+        if session["invuln_timer"] <= 0 and session["trap_cooldown"] <= 0:
+            for _, trap, _ in triggers.query(player, "trap"):
+                if masks and not masks["trap"].overlap(player_mask, (player.x - trap.x, player.y - trap.y)):
+                    continue
+                events.append("trap")
+                event_at.setdefault("trap", []).append(trap.center)
+                session["invuln_timer"] = settings.INVINCIBILITY_DURATION
+                _knockback(player, trap.center, room["blocks"], KNOCKBACK_PIXELS, rng,
+                           player_mask, shapes)
+                session["trap_cooldown"] = 0.6
+                _lose_life(session, events)
+                break
+
+        # fox AI (batched update of every fox in the room)
+        if world:
+            hit = update_foxes(room, player, dt, session["fox_frame_count"], rng,
+                               masks, shapes)
+        else:
+            hit = touching_fox(room, player, masks)
+        if hit != -1 and session["invuln_timer"] <= 0 and session["state"] == "PLAYING":
+            fox = room["foxes"][hit]
+            events.append("fox_hit")
+            session["invuln_timer"] = settings.INVINCIBILITY_DURATION
+            _knockback(player, fox.center, room["blocks"], KNOCKBACK_PIXELS, rng,
+                       player_mask, shapes)
+
+            room["foxes"].append(
+                pygame.Rect(
+                    rng.randint(100, 300),
+                    rng.randint(100, 300),
+                    fox.width,
+                    fox.height
+                )
+            )
+            room["fox_frames"].append(0)
+            room["fox_directions"].append(1)
+            room["fox_paths"].append([])
+            room["fox_anim_timer"].append(0.0)
+            room["fox_ids"].append(new_entity_id(room))
+            _lose_life(session, events)
+
+        # carrots
+        for _, carrot, _ in triggers.query(player, "carrot"):
+            collect_carrot(room, carrot)
+            events.append("carrot")
+            event_at.setdefault("carrot", []).append(carrot.center)
+            session["score"] += 1
+            if session["score"] >= settings.TARGET_SCORE and session["state"] == "PLAYING":
+                session["state"] = "WON"
+                events.append("won")
+
+    session["move"] = (ix, iy)
+
+    # ---------------- TRANSITION UPDATE ----------------
+    if session["is_transitioning"] and session["state"] == "PLAYING":
+        if session["transition_phase"] == "out":
+            session["transition_alpha"] += TRANSITION_STEP
+            if session["transition_alpha"] >= 255:
+                session["transition_alpha"] = 255
+                if session["pending_portal_side"] is not None:
+                    session["coords"] = portal_transition(
+                        session["pending_portal_side"], session["coords"], player)
+                    events.append("room")
+                session["pending_portal_side"] = None
+                session["transition_phase"] = "in"
+        else:
+            session["transition_alpha"] -= TRANSITION_STEP
+            if session["transition_alpha"] <= 0:
+                session["transition_alpha"] = 0
+                session["is_transitioning"] = False
+
+    return events
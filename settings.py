@@ -3,6 +3,17 @@ import pygame
 # Window
 WIDTH, HEIGHT = 1280, 720
 FPS = 60
+# Menus and the pause screen sleep until input arrives, waking at least this often
+IDLE_TIMEOUT_MS = 250
+# Internal render resolution as a fraction of the window's; lower is faster
+# and blurrier (display.py scales the frame up to the window)
+RENDER_SCALE = 1.0
+# Pre-scaled raw assets made by `python assetpack.py`; without it the game
+# loads images/ and sound/ directly
+ASSET_PACK = "assets.pack"
+# Memory budgets in MB (see memory.py); going over is reported in the
+# memory log line. "traced" only applies with tracemalloc running.
+MEMORY_BUDGETS_MB = {"surfaces": 256, "sounds": 64, "rooms": 16, "traced": 128}
 
 # Player / enemies
 PLAYER_WIDTH, PLAYER_HEIGHT = 70, 70
@@ -47,4 +58,7 @@ DASH_COOLDOWN = 1.5
 
 # Speed boost milestones (like Jon)
 SPEED_BOOST_SCORE_1 = 5
-SPEED_BOOST_MULT_1 = 1.25
\ No newline at end of file
+SPEED_BOOST_MULT_1 = 1.25
+
+# Pixel-accurate collision with props, traps and foxes (rects stay the broad phase)
+PRECISE_COLLISION = True
@@ -0,0 +1,105 @@
+import pygame
+import assetpack
+
+# Sound effects: name -> (file, volume, priority, min seconds between plays).
+# A higher priority may cut off a lower one when every channel is busy.
+EFFECTS = {
+    "win": ("sound/win.mp3", 0.9, 5, 1.0),
+    "fox_hit": ("sound/foxkill.mp3", 0.8, 4, 0.15),
+    "trap": ("sound/beartrap.mp3", 0.8, 3, 0.15),
+    "carrot": ("sound/chew.mp3", 0.7, 2, 0.08),
+    "portal": ("sound/portal.mp3", 0.9, 1, 0.25),
+}
+POOL_CHANNELS = 4
+
+
+class SoundPool:
+    """Sound effects on a fixed set of reserved mixer channels.
+
+    Channels 0..channels-1 are reserved, so nothing else (e.g. a bare
+    Sound.play()) can take them. When all of them are busy a new sound
+    replaces the lowest-priority one that is below it, oldest first, or
+    is dropped. Replaying the same effect faster than its min interval is
+    skipped. get_stats() counts played, stolen, dropped and limited plays.
+    """
+
+    def __init__(self, effects=EFFECTS, channels: int = POOL_CHANNELS):
+        self.sounds = {}  # name -> (Sound, priority, min interval)
+        self.channels = []
+        self.playing = {}  # channel index -> (name, priority, start ms)
+        self.last_played = {}  # name -> ms
+        self.stats = {"played": 0, "stolen": 0, "dropped": 0, "limited": 0}
+
+        try:
+            if not pygame.mixer.get_init():
+                pygame.mixer.init()
+        except Exception as e:
+            print("[AUDIO] Mixer failed, no sound effects:", e)
+            return
+
+        if pygame.mixer.get_num_channels() < channels:
+            pygame.mixer.set_num_channels(channels)
+        pygame.mixer.set_reserved(channels)
+        self.channels = [pygame.mixer.Channel(i) for i in range(channels)]
+
+        for name, (path, volume, priority, min_interval) in effects.items():
+            try:
+                sound = assetpack.sound(path, lambda: pygame.mixer.Sound(path))
+            except Exception as e:
+                print(f"[AUDIO] Sound {name} failed:", e)
+                continue
+            sound.set_volume(volume)
+            self.sounds[name] = (sound, priority, int(min_interval * 1000))
+
+    def _pick_channel(self, priority: int):
+        # A free channel, else the weakest lower-priority one (oldest first).
+        victim = None
+        for i, channel in enumerate(self.channels):
+            if not channel.get_busy():
+                return i, False
+            _, other, started = self.playing.get(i, (None, -1, 0))
+            if other < priority and (victim is None or (other, started) < victim[1:]):
+                victim = (i, other, started)
+        if victim is None:
+            return None, False
+        return victim[0], True
+
+    def play(self, name: str) -> bool:
+        entry = self.sounds.get(name)
+        if entry is None:
+            return False
+        sound, priority, min_interval = entry
+
+        now = pygame.time.get_ticks()
+        last = self.last_played.get(name)
+        if last is not None and now - last < min_interval:
+            self.stats["limited"] += 1
+            return False
+
+        index, steal = self._pick_channel(priority)
+        if index is None:
+            self.stats["dropped"] += 1
+            return False
+        if steal:
+            self.channels[index].stop()
+            self.stats["stolen"] += 1
+
+        self.channels[index].play(sound)
+        self.playing[index] = (name, priority, now)
+        self.last_played[name] = now
+        self.stats["played"] += 1
+        return True
+
+    def stop(self, name: str):
+        for i, (playing_name, _, _) in list(self.playing.items()):
+            if playing_name == name:
+                self.channels[i].stop()
+                del self.playing[i]
+
+    def stop_all(self):
+        for channel in self.channels:
+            channel.stop()
+        self.playing.clear()
+
+    def get_stats(self) -> dict:
+        return dict(self.stats)
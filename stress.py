@@ -0,0 +1,111 @@
+import time
+import pygame
+
+from bot import ScriptedPlayer
+from game import load_game_assets, make_bunny, draw_world, draw_overlays, draw_hud
+from memory import memory_report, log_line
+from render import RenderQueue
+from session import new_session, step_session, current_room, init_headless
+from settings import WIDTH, HEIGHT, FPS, PLAYER_SPEED
+
+
+def percentile(values, pct: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    k = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * (len(ordered) - 1)))))
+    return ordered[k]
+
+
+def print_frame_report(title: str, columns: dict):
+    # columns: name -> list of frame times in ms
+    print(title)
+    print(f"  {'phase':<8} {'mean':>8} {'p50':>8} {'p90':>8} {'p99':>8} {'max':>8}")
+    for name, times in columns.items():
+        mean = sum(times) / len(times) if times else 0.0
+        print(f"  {name:<8} {mean:>8.2f} {percentile(times, 50):>8.2f} {percentile(times, 90):>8.2f} "
+              f"{percentile(times, 99):>8.2f} {max(times, default=0.0):>8.2f}")
+
+
+def run_stress(foxes=200, obstacles=30, carrots=50, traps=20, frames=1200,
+               seed=1, window=False, render=True):
+    """Play a scripted session in crowded rooms and report frame-time percentiles.
+
+    Every room the bot walks into is generated with the given amounts. Runs
+    uncapped with a fixed timestep, so the numbers are pure engine cost.
+    """
+    if window:
+        pygame.init()
+        WIN = pygame.display.set_mode((WIDTH, HEIGHT))
+        pygame.display.set_caption("Bunnies stress test")
+    else:
+        init_headless()
+        WIN = pygame.Surface((WIDTH, HEIGHT))
+
+    FONT = pygame.font.Font(None, 30)
+    assets = load_game_assets()
+    room_options = {"foxes": foxes, "obstacles": obstacles, "carrots": carrots, "traps": traps}
+    dt = 1.0 / FPS
+
+    def start():
+        s = new_session(seed=seed, room_options=room_options,
+                        fox_frame_count=len(assets["fox_images"]))
+        # The bot should keep walking through rooms, not die after three hits.
+        s["lives"] = 10 ** 9
+        return s
+
+    session = start()
+    bot = ScriptedPlayer()
+    bunny = make_bunny(session["player"])
+    queue = RenderQueue()
+
+    update_ms, draw_ms, frame_ms = [], [], []
+    rooms_visited = 1
+    restarts = 0
+
+    for _ in range(frames):
+        if window:
+            pygame.event.pump()
+
+        t0 = time.perf_counter()
+        events = step_session(session, bot.get_buttons(session), dt)
+        room = current_room(session)
+        t1 = time.perf_counter()
+
+        if render:
+            ix, iy = session["move"]
+            bunny.set_velocity((ix * PLAYER_SPEED, iy * PLAYER_SPEED))
+            bunny.update(dt * 1000.0)
+            bunny.set_pos(session["player"].center)
+            draw_world(WIN, room, session, assets, bunny, 0.0, queue=queue)
+            queue.flush(WIN)
+            draw_overlays(WIN, session, 0.0)
+            draw_hud(WIN, FONT, room, session)
+            if window:
+                pygame.display.flip()
+        t2 = time.perf_counter()
+
+        update_ms.append((t1 - t0) * 1000.0)
+        draw_ms.append((t2 - t1) * 1000.0)
+        frame_ms.append((t2 - t0) * 1000.0)
+
+        rooms_visited += events.count("room")
+        if session["state"] != "PLAYING":
+            restarts += 1
+            session = start()
+            bot = ScriptedPlayer()
+
+    room = current_room(session)
+    print(f"[STRESS] {frames} frames, seed {seed}, {rooms_visited} rooms visited, {restarts} restarts")
+    print(f"[STRESS] per room: {foxes} foxes, {obstacles} obstacles, {carrots} carrots, {traps} traps "
+          f"(last room has {len(room['foxes'])} foxes, {len(room['obstacles'])} obstacles placed)")
+    print_frame_report("[STRESS] frame time (ms)",
+                       {"update": update_ms, "draw": draw_ms, "frame": frame_ms})
+    budget = 1000.0 / FPS
+    over = sum(1 for t in frame_ms if t > budget)
+    print(f"[STRESS] {over}/{frames} frames over the {budget:.1f} ms budget")
+    if render:
+        print(f"[STRESS] {queue.get_stats()['blits_per_frame']:.0f} sprites/frame, "
+              f"one Surface.blits call per layer")
+    print(log_line(memory_report(session, {"game": assets, "bunny": bunny})))
+    return frame_ms
@@ -0,0 +1,138 @@
+"""Difficulty sweep: headless bot sessions over a grid of balancing values.
+
+    python sweep.py --FOX_SPEED 150,190,230 --DASH_COOLDOWN 1,1.5 --sessions 500
+
+Every combination of the given values plays `sessions` seeded games with
+bot.ScriptedPlayer, spread over a ProcessPoolExecutor, and the report
+shows win rate, time-to-win and fox count per combination.
+"""
+import argparse
+import csv
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import settings
+from bot import ScriptedPlayer
+from session import init_headless, new_session, step_session
+from stress import percentile
+
+# Values a sweep may change. The game reads them as settings.NAME when it
+# uses them, so setting them on the settings module is enough.
+TUNABLE = ("FOX_SPEED", "DASH_COOLDOWN", "INVINCIBILITY_DURATION", "TARGET_SCORE")
+
+
+def apply_settings(params: dict):
+    for name, value in params.items():
+        setattr(settings, name, value)
+
+
+def play_session(params: dict, seed: int, max_time: float, dt: float) -> tuple:
+    """One bot game with `params` applied: (state, seconds played, score, foxes in the last room)."""
+    apply_settings(params)
+    game = new_session(seed, rooms={})
+    bot = ScriptedPlayer()
+    for _ in range(int(max_time / dt)):
+        step_session(game, bot.get_buttons(game), dt)
+        if game["state"] != "PLAYING":
+            break
+    room = game["rooms"][game["coords"]]
+    return game["state"], game["frame"] * dt, game["score"], len(room["foxes"])
+
+
+def _run_task(task):
+    combo, params, seed, max_time, dt = task
+    return (combo,) + play_session(params, seed, max_time, dt)
+
+
+def summarize(results) -> dict:
+    # results: [(state, seconds, score, foxes), ...] for one combination
+    n = len(results)
+    win_times = [t for state, t, _, _ in results if state == "WON"]
+    fox_counts = [f for _, _, _, f in results]
+    return {
+        "sessions": n,
+        "win_rate": len(win_times) / n,
+        "loss_rate": sum(1 for r in results if r[0] == "LOST") / n,
+        "win_p50": percentile(win_times, 50) if win_times else None,
+        "win_p90": percentile(win_times, 90) if win_times else None,
+        "score_mean": sum(r[2] for r in results) / n,
+        "foxes_p50": percentile(fox_counts, 50),
+        "foxes_p90": percentile(fox_counts, 90),
+        "foxes_max": max(fox_counts),
+    }
+
+
+def run_sweep(grid: dict, sessions: int = 100, seed: int = 0, max_time: float = 180.0,
+              dt: float = 1 / settings.FPS, workers=None, csv_path=None) -> list:
+    """Play every combination of `grid` (name -> list of values) and report.
+
+    Session k of every combination uses seed `seed + k`, so combinations are
+    compared on the same worlds. Returns one summary dict per combination.
+    """
+    names = list(grid)
+    combos = [dict(zip(names, values)) for values in itertools.product(*grid.values())]
+    tasks = [(i, params, seed + k, max_time, dt)
+             for i, params in enumerate(combos) for k in range(sessions)]
+    workers = workers or os.cpu_count() or 1
+
+    print(f"[SWEEP] {len(combos)} combinations x {sessions} sessions = {len(tasks)} games "
+          f"on {workers} workers")
+    results = [[] for _ in combos]
+    t0 = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_headless) as pool:
+        chunk = max(1, len(tasks) // (workers * 8))
+        for done, (combo, *result) in enumerate(pool.map(_run_task, tasks, chunksize=chunk), 1):
+            results[combo].append(tuple(result))
+            if done % max(1, len(tasks) // 10) == 0:
+                print(f"[SWEEP] {done}/{len(tasks)} games, {time.perf_counter() - t0:.0f}s")
+    elapsed = time.perf_counter() - t0
+
+    report = [dict(params, **summarize(res)) for params, res in zip(combos, results)]
+    print(f"[SWEEP] done in {elapsed:.1f}s ({len(tasks) / elapsed:.1f} games/s)")
+    print_report(names, report)
+    if csv_path:
+        with open(csv_path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(report[0]))
+            writer.writeheader()
+            writer.writerows(report)
+        print(f"[SWEEP] wrote {csv_path}")
+    return report
+
+
+def print_report(names, report):
+    header = "".join(f"{n:>24}" for n in names)
+    print(f"{header} {'win%':>6} {'lost%':>6} {'win s p50':>10} {'p90':>7} {'score':>6} "
+          f"{'foxes p50':>10} {'p90':>5} {'max':>5}")
+    for row in report:
+        values = "".join(f"{row[n]:>24}" for n in names)
+        p50, p90 = (("-" if row[k] is None else f"{row[k]:.1f}") for k in ("win_p50", "win_p90"))
+        print(f"{values} {row['win_rate'] * 100:>6.1f} {row['loss_rate'] * 100:>6.1f} "
+              f"{p50:>10} {p90:>7} {row['score_mean']:>6.1f} "
+              f"{row['foxes_p50']:>10} {row['foxes_p90']:>5} {row['foxes_max']:>5}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Bunnies difficulty sweep")
+    for name in TUNABLE:
+        parser.add_argument(f"--{name}", metavar="V1,V2,...",
+                            help=f"values to try (default: settings.{name})")
+    parser.add_argument("--sessions", type=int, default=100, help="games per combination")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first game")
+    parser.add_argument("--max-time", type=float, default=180.0, help="seconds before a game counts as unfinished")
+    parser.add_argument("--dt", type=float, default=1 / settings.FPS, help="simulation step in seconds")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: all cores)")
+    parser.add_argument("--csv", metavar="FILE", help="also write the report as CSV")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    grid = {}
+    for name in TUNABLE:
+        raw = getattr(args, name)
+        kind = type(getattr(settings, name))
+        grid[name] = [kind(v) for v in raw.split(",")] if raw else [getattr(settings, name)]
+    run_sweep(grid, sessions=args.sessions, seed=args.seed, max_time=args.max_time,
+              dt=args.dt, workers=args.workers, csv_path=args.csv)
@@ -0,0 +1,81 @@
+from settings import BLOCK_SIZE
+
+CELL_SIZE = BLOCK_SIZE  # a 70x70 player touches at most 2x2 cells
+
+
+class TriggerGrid:
+    """Spatial hash of the trigger volumes in one room (portals, traps, carrots).
+
+    Queries only look at the grid cells under the player, so their cost does
+    not depend on how many triggers the room holds.
+    """
+
+    def __init__(self, cell_size: int = CELL_SIZE):
+        self.cell_size = cell_size
+        self.cells = {}  # kind -> {cell: [(kind, rect, payload), ...]}
+        self.inside = set()  # ids of the triggers the player touched last time
+
+    def get_cells(self, rect):
+        size = self.cell_size
+        for cx in range(rect.left // size, (rect.right - 1) // size + 1):
+            for cy in range(rect.top // size, (rect.bottom - 1) // size + 1):
+                yield (cx, cy)
+
+    def add(self, kind: str, rect, payload=None):
+        entry = (kind, rect, payload)
+        cells = self.cells.setdefault(kind, {})
+        for cell in self.get_cells(rect):
+            cells.setdefault(cell, []).append(entry)
+
+    def remove(self, rect):
+        # Rects are found by identity: two carrots may share a position.
+        for cells in self.cells.values():
+            for cell in self.get_cells(rect):
+                entries = cells.get(cell)
+                if entries:
+                    entries[:] = [e for e in entries if e[1] is not rect]
+        self.inside.discard(id(rect))
+
+    def query(self, rect, kind=None) -> list:
+        found = {}
+        kinds = self.cells.values() if kind is None else [self.cells.get(kind, {})]
+        for cells in kinds:
+            for cell in self.get_cells(rect):
+                for entry in cells.get(cell, ()):
+                    if rect.colliderect(entry[1]):
+                        found[id(entry[1])] = entry
+        return list(found.values())
+
+    def entered(self, rect) -> list:
+        # Triggers touched now but not on the previous call.
+        touching = self.query(rect)
+        now = {id(entry[1]) for entry in touching}
+        new = [entry for entry in touching if id(entry[1]) not in self.inside]
+        self.inside = now
+        return new
+
+
+def get_triggers(room) -> TriggerGrid:
+    # Built the first time the room is played and kept on the room; carrots
+    # must be taken out with collect_carrot so both stay in sync.
+    grid = room.get("triggers")
+    if grid is None:
+        grid = TriggerGrid()
+        for side, rect in room["portals"].items():
+            grid.add("portal", rect, side)
+        for rect in room.get("traps", []):
+            grid.add("trap", rect)
+        for rect in room["carrots"]:
+            grid.add("carrot", rect)
+        room["triggers"] = grid
+    return grid
+
+
+def collect_carrot(room, carrot):
+    carrots = room["carrots"]
+    for i, c in enumerate(carrots):
+        if c is carrot:
+            del carrots[i]
+            del room["carrot_ids"][i]
+            break
+    get_triggers(room).remove(carrot)
@@ -1,6 +1,11 @@
 
 import pygame
+import assetpack
 from settings import WIDTH, HEIGHT
+from assets import get_scaled, load_png
+from display import get_scale, to_world
+
+_fonts = {}  # (size, pixel size) -> Font
 
 
 def scale_to_width(image: pygame.Surface, target_width: int, *, smooth: bool = False) -> pygame.Surface:
@@ -13,9 +18,9 @@ def scale_to_width(image: pygame.Surface, target_width: int, *, smooth: bool = F
 
 
 def safe_load_bg(path: str, fallback_color=(40, 80, 40)) -> pygame.Surface:
+    # Full size; draw it with draw_bg so it is scaled once per canvas size
     try:
-        img = pygame.image.load(path).convert()
-        return pygame.transform.scale(img, (WIDTH, HEIGHT))
+        return assetpack.image(path, lambda: pygame.image.load(path).convert(), alpha=False)
     except Exception as e:
         print(f"[UI] Failed to load background {path}: {e}")
         surf = pygame.Surface((WIDTH, HEIGHT))
@@ -23,10 +28,32 @@ def safe_load_bg(path: str, fallback_color=(40, 80, 40)) -> pygame.Surface:
         return surf
 
 
+def load_button(path: str, width: int, *, smooth: bool = False) -> pygame.Surface:
+    # Button image scaled to `width`; baked that way in the asset pack
+    key = f"{path}@w{width}" + ("s" if smooth else "")
+    return assetpack.image(key, lambda: scale_to_width(safe_load_png(path), width, smooth=smooth))
+
+
+def draw_bg(surface: pygame.Surface, bg: pygame.Surface):
+    surface.blit(get_scaled(bg, get_scale(), surface.get_size()), (0, 0))
+
+
+def load_font(size: int) -> pygame.font.Font:
+    # font.ttf at `size` world pixels, i.e. scaled to the canvas; cached
+    px = max(1, round(size * get_scale()))
+    font = _fonts.get((size, px))
+    if font is None:
+        try:
+            font = pygame.font.Font("font.ttf", px)
+        except:
+            font = pygame.font.SysFont(None, px, bold=True)
+        _fonts[(size, px)] = font
+    return font
+
 
 def safe_load_png(path: str) -> pygame.Surface:
     try:
-        return pygame.image.load(path).convert_alpha()
+        return load_png(path)
     except Exception as e:
         print(f"[UI] Failed to load png {path}: {e}")
         # Transparent placeholder
@@ -35,18 +62,36 @@ def safe_load_png(path: str) -> pygame.Surface:
         return surf
 
 
+# Window events after which a static screen has to be drawn again
+REDRAW_EVENTS = (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED, pygame.WINDOWRESTORED,
+                 pygame.WINDOWSIZECHANGED)
+
+
+def wait_events(timeout_ms: int) -> list:
+    # Sleep until an event arrives (or timeout_ms passes), then return
+    # everything queued. Static screens use this instead of ticking at FPS.
+    first = pygame.event.wait(timeout_ms)
+    if first.type == pygame.NOEVENT:
+        return []
+    return [first] + pygame.event.get()
+
+
 def draw_text_outline(surface: pygame.Surface, text: str, font: pygame.font.Font,
                       text_color, outline_color, *, center=None, pos=None, outline_thickness: int = 2):
+    # center / pos are world coordinates, the font comes from load_font
     base = font.render(text, True, text_color)
     outline = font.render(text, True, outline_color)
+    scale = get_scale()
+    if scale != 1:
+        outline_thickness = max(1, round(outline_thickness * scale))
 
     if center is not None:
-        rect = base.get_rect(center=center)
+        rect = base.get_rect(center=(round(center[0] * scale), round(center[1] * scale)))
         x, y = rect.topleft
     else:
         if pos is None:
             raise ValueError("Provide either center=(x,y) or pos=(x,y)")
-        x, y = pos
+        x, y = round(pos[0] * scale), round(pos[1] * scale)
 
     for dx in range(-outline_thickness, outline_thickness + 1):
         for dy in range(-outline_thickness, outline_thickness + 1):
@@ -56,14 +101,17 @@ def draw_text_outline(surface: pygame.Surface, text: str, font: pygame.font.Font
 
 
 class ImageButton:
+    # rect is in world coordinates; draw() scales to the canvas
     def __init__(self, image: pygame.Surface, center):
         self.image = image
         self.rect = self.image.get_rect(center=center)
 
     def draw(self, surface: pygame.Surface):
-        surface.blit(self.image, self.rect)
+        scale = get_scale()
+        surface.blit(get_scaled(self.image, scale),
+                     (round(self.rect.x * scale), round(self.rect.y * scale)))
 
     def clicked(self, event: pygame.event.Event) -> bool:
         return (event.type == pygame.MOUSEBUTTONDOWN
                 and event.button == 1
-                and self.rect.collidepoint(event.pos))
\ No newline at end of file
+                and self.rect.collidepoint(to_world(event.pos)))
\ No newline at end of file
@@ -1,7 +1,7 @@
 import random
 import pygame
-import os
 from settings import WIDTH, HEIGHT, BLOCK_SIZE, PORTAL_SIZE, FOX_WIDTH, FOX_HEIGHT
+from assets import PropAsset, get_theme
 
 ADJECTIVES = ["Stinky", "Glorious", "Slippery", "Angry", "Cabbage-Scented",
               "Mildly Annoying", "Shiny", "Suspicious", "Fluffy", "Extreme"]
@@ -9,54 +9,61 @@ NOUNS = ["Armpit", "Basement", "Toilet", "Paradise",
          "Doom", "Garden", "Lair", "Swamp", "Elevator", "Buffet"]
 
 
-def get_funny_name() -> str:
-    return f"{random.choice(ADJECTIVES)} {random.choice(NOUNS)}"
+def get_funny_name(rng=random) -> str:
+    return f"{rng.choice(ADJECTIVES)} {rng.choice(NOUNS)}"
 
 
 room_data = {}
 
+THEME_FOLDERS = ["grassanddirt", "mudandgloomy", "meadow"]
+
+# Rooms from a save file are decoded lazily: generate_room asks this
+# callable (coords -> room dict or None) before creating a new room.
+room_loader = None
+
+
+def set_room_loader(loader):
+    global room_loader
+    room_loader = loader
+
+
+def find_room(coords, rooms=None):
+    # A room that already exists (decoding it from the save file if it is
+    # still there), or None. Never generates a new room.
+    if rooms is None:
+        rooms = room_data
+    if coords not in rooms and rooms is room_data and room_loader is not None:
+        saved = room_loader(coords)
+        if saved is not None:
+            rooms[coords] = saved
+    return rooms.get(coords)
+
+
 # --- ADD THIS AT THE TOP OF world.py ---
 
 # ... (keep your existing imports and helper functions like safe_load_png, scale_to_max, make_obstacle) ...
 
 
-def generate_room(coords):
-    if coords not in room_data:
+def generate_room(coords, rng=random, *, foxes=None, obstacles=None, carrots=None, traps=None,
+                  rooms=None):
+    # foxes / obstacles / carrots / traps override the random amount per room
+    # (used by the stress test); None keeps the normal game ranges.
+    # rooms: a dict holding a separate world (e.g. one per env.BunnyEnv);
+    # None uses the shared room_data, which is what saving and loading use.
+    fox_count, obstacle_count, carrot_count, trap_count = foxes, obstacles, carrots, traps
+    if rooms is None:
+        rooms = room_data
+    if find_room(coords, rooms) is None:
 
         # 1. SETUP: Default values
         bg_colors = [(34, 139, 34), (101, 67, 33), (20, 80, 80)]
 
         # 2. PICK THEME & LOAD FOLDER IMAGES
-        theme_folders = ["grassanddirt", "mudandgloomy", "meadow"]
-        selected_theme = random.choice(theme_folders)
-        theme_path = os.path.join("images", selected_theme)
-
-        bg_image = None
-        asset_images = []
-
-        # Scan the chosen folder
-        if os.path.exists(theme_path):
-            for filename in os.listdir(theme_path):
-                if filename.endswith(".png"):
-                    full_path = os.path.join(theme_path, filename)
-                    img = safe_load_png(full_path)
-
-                    if img:
-                        if filename.endswith("_bg.png"):
-                            # It's a background
-                            bg_image = pygame.transform.scale(
-                                img, (WIDTH, HEIGHT))
-                        else:
-                            # It's a tree/bush/rock -> Scale it so it fits
-                            img = scale_to_max(
-                                img, max_w=150 if selected_theme == "meadow" else 100, max_h=150 if selected_theme == "meadow" else 100)
-                            asset_images.append(img)
-        if not bg_image:
-            bg_image = pygame.Surface((WIDTH, HEIGHT))
-            bg_image.fill((34, 139, 34))  # fallback
+        selected_theme = rng.choice(THEME_FOLDERS)
+        bg_image, asset_images = get_theme(selected_theme)
 
         # Fallback if no background found
-        bg_color = random.choice(bg_colors)
+        bg_color = rng.choice(bg_colors)
 
         # 3. SETUP ROOM ESSENTIALS (Portals, Walls, Safe Zone)
         blocks = []
@@ -67,27 +74,16 @@ def generate_room(coords):
         safe_zone = pygame.Rect(WIDTH//2 - 150, HEIGHT//2 - 150, 300, 300)
 
         # Boundary walls
-        walls = [
-            pygame.Rect(0, 0, WIDTH, 20),
-            pygame.Rect(0, HEIGHT-20, WIDTH, 20),
-            pygame.Rect(0, 0, 20, HEIGHT),
-            pygame.Rect(WIDTH-20, 0, 20, HEIGHT),
-        ]
-        blocks.extend(walls)
+        blocks.extend(make_walls())
 
         # -- KEEPING PORTALS EXACTLY AS THEY WERE --
-        portals = {
-            "top": pygame.Rect(WIDTH//2 - PORTAL_SIZE//2, 0, PORTAL_SIZE, 30),
-            "bottom": pygame.Rect(WIDTH//2 - PORTAL_SIZE//2, HEIGHT-30, PORTAL_SIZE, 30),
-            "left": pygame.Rect(0, HEIGHT//2 - PORTAL_SIZE//2, 30, PORTAL_SIZE),
-            "right": pygame.Rect(WIDTH-30, HEIGHT//2 - PORTAL_SIZE//2, 30, PORTAL_SIZE),
-        }
+        portals = make_portals()
 
         # 4. GENERATE OBSTACLES (Using the assets from the folder)
         # Random generic blocks (optional, you can remove this loop if you only want pictures)
-        for _ in range(random.randint(4, 8)):
-            bx = (random.randint(2, (WIDTH // BLOCK_SIZE) - 3)) * BLOCK_SIZE
-            by = (random.randint(2, (HEIGHT // BLOCK_SIZE) - 3)) * BLOCK_SIZE
+        for _ in range(rng.randint(4, 8)):
+            bx = (rng.randint(2, (WIDTH // BLOCK_SIZE) - 3)) * BLOCK_SIZE
+            by = (rng.randint(2, (HEIGHT // BLOCK_SIZE) - 3)) * BLOCK_SIZE
             block_rect = pygame.Rect(bx, by, BLOCK_SIZE, BLOCK_SIZE)
             # Don't block safe zone or portals
             if not block_rect.colliderect(safe_zone) and not any(block_rect.colliderect(p) for p in portals.values()):
@@ -97,17 +93,16 @@ def generate_room(coords):
         # Place the picture assets (Trees/Bushes from folder)
         if asset_images:
             # Try to place 5 to 10 items
-            for _ in range(random.randint(5, 10)):
-                img = random.choice(asset_images)
+            for _ in range(rng.randint(5, 10) if obstacle_count is None else obstacle_count):
+                prop = rng.choice(asset_images)
 
                 # Try 100 times to find a valid spot for this item
                 for attempt in range(100):
-                    x = random.randint(60, WIDTH - 60 - img.get_width())
-                    y = random.randint(120, HEIGHT - 80 - img.get_height())
+                    x = rng.randint(60, WIDTH - 60 - prop.width)
+                    y = rng.randint(120, HEIGHT - 80 - prop.height)
 
                     # We use "tree" as a generic type for hitboxes
-                    ob = make_obstacle(img, x, y, "tree")
-                    coll = ob["coll_rect"]
+                    coll = prop.get_coll_rect(x, y, "tree")
 
                     # Check collisions
                     if coll.colliderect(safe_zone):
@@ -120,21 +115,23 @@ def generate_room(coords):
                         continue
 
                     # If safe, add it
-                    obstacles.append(ob)
+                    obstacles.append(make_obstacle(prop, x, y, "tree"))
                     blocks.append(coll)
                     break
 
         # 5. ENTITIES (Foxes, Carrots, Traps)
-        foxes = [pygame.Rect(random.randint(100, 300),
-                             random.randint(100, 600), FOX_WIDTH, FOX_HEIGHT)]
+        foxes = [pygame.Rect(rng.randint(100, 300),
+                             rng.randint(100, 600), FOX_WIDTH, FOX_HEIGHT)
+                 for _ in range(1 if fox_count is None else fox_count)]
 
         # Carrots
         carrots = []
         tries = 0
-        while len(carrots) < random.randint(3, 6) and tries < 400:
+        max_tries = 400 if carrot_count is None else max(400, carrot_count * 100)
+        while len(carrots) < (rng.randint(3, 6) if carrot_count is None else carrot_count) and tries < max_tries:
             tries += 1
-            cx = random.randint(80, WIDTH - 80)
-            cy = random.randint(120, HEIGHT - 80)
+            cx = rng.randint(80, WIDTH - 80)
+            cy = rng.randint(120, HEIGHT - 80)
             carrot = pygame.Rect(cx, cy, 16, 16)
 
             if carrot.colliderect(safe_zone):
@@ -156,12 +153,12 @@ def generate_room(coords):
         # --- traps (red circles) ---
         # These are hazards, NOT walls, so do NOT add them to blocks.
         # Traps
-        for _ in range(random.randint(2, 5)):
+        for _ in range(rng.randint(2, 5) if trap_count is None else trap_count):
             tries = 0
             while tries < 200:
                 tries += 1
-                tx = random.randint(80, WIDTH - 80)
-                ty = random.randint(120, HEIGHT - 80)
+                tx = rng.randint(80, WIDTH - 80)
+                ty = rng.randint(120, HEIGHT - 80)
                 tr = pygame.Rect(tx - 20, ty - 20, 40, 40)
 
                 if tr.colliderect(safe_zone):
@@ -179,7 +176,7 @@ def generate_room(coords):
                 break
 
         # 6. SAVE DATA
-        room_data[coords] = {
+        rooms[coords] = {
             "blocks": blocks,
             "obstacles": obstacles,
             "traps": traps,
@@ -189,49 +186,58 @@ def generate_room(coords):
             "bg_image": bg_image,
             "theme": selected_theme,
             "portals": portals,
-            "name": get_funny_name(),
+            "name": get_funny_name(rng),
             "fox_frames": [0] * len(foxes),
             "fox_directions": [1] * len(foxes),
             "fox_paths": [[] for _ in foxes],
             "fox_anim_timer": [0.0] * len(foxes),
+            "fox_ids": list(range(len(foxes))),
+            "carrot_ids": list(range(len(foxes), len(foxes) + len(carrots))),
+            "next_id": len(foxes) + len(carrots),
         }
-    return room_data[coords]
+    return rooms[coords]
 
 
-def reset_world():
-    room_data.clear()
+def new_entity_id(room) -> int:
+    # Foxes and carrots keep their id for as long as they are in the room
+    # (netplay.py sends them by id); a fox that comes in gets a new one.
+    entity_id = room["next_id"]
+    room["next_id"] = (entity_id + 1) & 0xFFFF
+    return entity_id
 
 
-def safe_load_png(path: str):
-    try:
-        return pygame.image.load(path).convert_alpha()
-    except:
-        return None
+def make_walls() -> list:
+    # The same in every room
+    return [
+        pygame.Rect(0, 0, WIDTH, 20),
+        pygame.Rect(0, HEIGHT-20, WIDTH, 20),
+        pygame.Rect(0, 0, 20, HEIGHT),
+        pygame.Rect(WIDTH-20, 0, 20, HEIGHT),
+    ]
 
 
-def scale_to_max(img: pygame.Surface, max_w: int, max_h: int) -> pygame.Surface:
-    w, h = img.get_size()
-    if w == 0 or h == 0:
-        return img
-    scale = min(max_w / w, max_h / h)
-    new_size = (max(1, int(w * scale)), max(1, int(h * scale)))
-    return pygame.transform.smoothscale(img, new_size)
+def make_portals() -> dict:
+    # The same in every room
+    return {
+        "top": pygame.Rect(WIDTH//2 - PORTAL_SIZE//2, 0, PORTAL_SIZE, 30),
+        "bottom": pygame.Rect(WIDTH//2 - PORTAL_SIZE//2, HEIGHT-30, PORTAL_SIZE, 30),
+        "left": pygame.Rect(0, HEIGHT//2 - PORTAL_SIZE//2, 30, PORTAL_SIZE),
+        "right": pygame.Rect(WIDTH-30, HEIGHT//2 - PORTAL_SIZE//2, 30, PORTAL_SIZE),
+    }
 
 
-def make_obstacle(img: pygame.Surface, x: int, y: int, kind: str):
-    draw_rect = img.get_rect(topleft=(x, y))
+def reset_world():
+    room_data.clear()
+    set_room_loader(None)
 
-    if kind == "tree":
-        bbox = img.get_bounding_rect()
-        coll = pygame.Rect(x + bbox.x, y + bbox.y, bbox.width, bbox.height)
-    else:
-        cw = int(draw_rect.width * 0.70)
-        ch = int(draw_rect.height * 0.45)
-        cx = draw_rect.centerx - cw // 2
-        cy = draw_rect.bottom - ch
-        coll = pygame.Rect(cx, cy, cw, ch)
 
-    return {"img": img, "draw_rect": draw_rect, "coll_rect": coll, "kind": kind}
+def make_obstacle(prop: PropAsset, x: int, y: int, kind: str):
+    # The prop carries the image and its precomputed hitboxes; the obstacle
+    # only adds where it stands.
+    draw_rect = pygame.Rect(x, y, prop.width, prop.height)
+    coll = prop.get_coll_rect(x, y, kind)
+    return {"img": prop.img, "draw_rect": draw_rect, "coll_rect": coll, "kind": kind,
+            "asset": prop.name, "prop": prop}
 
 
 def theme_index(coords):
@@ -239,18 +245,68 @@ def theme_index(coords):
     return abs(x * 31 + y * 17) % 3  # 0..2
 
 
-def move_with_collision(rect: pygame.Rect, blocks, dx: float, dy: float):
+def get_block_shapes(room) -> dict:
+    # tuple(coll_rect) -> (prop mask, draw position) for every block that is
+    # a picture prop; plain blocks and walls are solid rects. Cached on the room.
+    shapes = room.get("block_shapes")
+    if shapes is None:
+        shapes = {}
+        for ob in room.get("obstacles", []):
+            prop = ob.get("prop")
+            if prop is not None:
+                shapes[tuple(ob["coll_rect"])] = (prop.get_mask(), ob["draw_rect"].topleft)
+        room["block_shapes"] = shapes
+    return shapes
+
+
+def _mask_hits(rect: pygame.Rect, mask, shape) -> bool:
+    prop_mask, (ox, oy) = shape
+    return prop_mask.overlap(mask, (rect.x - ox, rect.y - oy)) is not None
+
+
+def _push_out(rect: pygame.Rect, mask, shape, axis: int, start: int):
+    # Step back towards the start of this move until the masks stop touching.
+    # Something that already overlapped at the start (e.g. a fox whose new
+    # animation frame reaches into a bush) is let through so it can walk out.
+    pos = [rect.x, rect.y]
+    end = pos[axis]
+    pos[axis] = start
+    if _mask_hits(pygame.Rect(pos, rect.size), mask, shape):
+        return
+    step = 1 if start > end else -1
+    pos[axis] = end
+    while pos[axis] != start:
+        if not _mask_hits(pygame.Rect(pos, rect.size), mask, shape):
+            break
+        pos[axis] += step
+    rect.topleft = pos
+
+
+def move_with_collision(rect: pygame.Rect, blocks, dx: float, dy: float, mask=None, shapes=None):
+    # With a mask (aligned with rect) and the room's block shapes, blocks
+    # that are picture props only stop the mover where pixels really touch.
+    # The rect test stays the broad phase: masks are only compared on overlap.
+    start = rect.x
     rect.x += int(dx)
     for block in blocks:
         if rect.colliderect(block):
+            shape = shapes.get(tuple(block)) if mask is not None and shapes else None
+            if shape is not None:
+                _push_out(rect, mask, shape, 0, start)
+                continue
             if dx > 0:
                 rect.right = block.left
             if dx < 0:
                 rect.left = block.right
 
+    start = rect.y
     rect.y += int(dy)
     for block in blocks:
         if rect.colliderect(block):
+            shape = shapes.get(tuple(block)) if mask is not None and shapes else None
+            if shape is not None:
+                _push_out(rect, mask, shape, 1, start)
+                continue
             if dy > 0:
                 rect.bottom = block.top
             if dy < 0: